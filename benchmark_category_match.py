@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark for free-text category matching
+
+Creates a throwaway user with hundreds of expense categories and compares the
+previous lookup (query every category, lowercase each name, substring test)
+with the cached per-user Aho-Corasick matcher on voice-like phrases. Requires
+the configured database.
+
+Usage:
+  python benchmark_category_match.py --categories 300
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.database.session import get_session
+from src.models import User, Category
+from src.models.category import CategoryType
+from src.utils.category_matcher import category_matchers
+
+BENCH_TELEGRAM_ID = -999000444
+PHRASES = (
+    "купил лекарства для здоровья 300 гривен",
+    "вчера потратил 250 на продукты в сильпо",
+    "поездка на такси в аэропорт 400",
+    "оплатил интернет и мобильную связь",
+    "какой-то текст без категории 100",
+)
+REPEAT = 200
+
+
+def legacy_scan(db, user_id: int, language: str, text: str):
+    """The lookup TransactionHandler.find_expense_category_by_text used before the compiled matcher"""
+    text_norm = text.lower()
+    categories = db.query(Category).filter(
+        Category.user_id == user_id,
+        Category.category_type == CategoryType.EXPENSE,
+        Category.is_active == True
+    ).all()
+    for category in categories:
+        name = category.get_name(language).lower()
+        if name and name in text_norm:
+            return category
+    return None
+
+
+def compiled_match(db, user_id: int, text: str):
+    category_id = category_matchers.get(db, user_id).match(text, CategoryType.EXPENSE.value)
+    return db.get(Category, category_id) if category_id else None
+
+
+def timed(func, *args):
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = func(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return result, statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--categories", type=int, default=300)
+    args = parser.parse_args()
+
+    db = get_session()
+    user = User(telegram_id=BENCH_TELEGRAM_ID, username="bench-match", preferred_language="ru")
+    db.add(user)
+    db.commit()
+    names = [("Health", "Здоровье"), ("Food", "Продукты"), ("Transport", "Такси"), ("Internet", "Интернет")]
+    names += [(f"Category {i}", f"Категория номер {i}") for i in range(args.categories - len(names))]
+    db.add_all([
+        Category(name_en=en, name_ru=ru, category_type=CategoryType.EXPENSE, user_id=user.id)
+        for en, ru in names
+    ])
+    db.commit()
+
+    try:
+        started = time.perf_counter()
+        category_matchers.invalidate(user.id)
+        category_matchers.get(db, user.id)
+        print(f"{args.categories} categories, matcher built in {(time.perf_counter() - started) * 1000:.1f}ms")
+        for phrase in PHRASES:
+            legacy, legacy_p50, legacy_p99 = timed(legacy_scan, db, user.id, "ru", phrase)
+            compiled, compiled_p50, compiled_p99 = timed(compiled_match, db, user.id, phrase)
+            print(f"{phrase[:38]:38} legacy={legacy.name_ru if legacy else '-':9} p50={legacy_p50:6.3f}ms p99={legacy_p99:6.3f}ms"
+                  f" | compiled={compiled.name_ru if compiled else '-':9} p50={compiled_p50:6.3f}ms p99={compiled_p99:6.3f}ms")
+    finally:
+        db.rollback()
+        db.query(Category).filter(Category.user_id == user.id).delete()
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Load test for concurrent update processing
+
+Feeds synthetic updates from many chats through ChatOrderedUpdateProcessor the
+way Application does (one task per update) and reports throughput for several
+concurrency limits. Handlers simulate I/O-bound work (Telegram API calls,
+database round trips) with a share of slow updates standing in for voice
+transcriptions and yearly reports. Each chat's updates are checked to have run
+in arrival order.
+
+The second part fires a burst of heavy updates (voice, exports, charts) while
+other chats keep tapping the keypad, and reports tap latency with and without
+the heavy lane. Needs no bot token or database.
+
+Usage:
+  python benchmark_concurrency.py --chats 200 --updates 2000 --limits 1,4,16,64
+  python benchmark_concurrency.py --limits 32 --heavy-burst 200 --heavy-workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from telegram import Update
+from src.utils.update_processor import ChatOrderedUpdateProcessor
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    return Update.de_json({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "bench"},
+            "text": str(update_id),
+        },
+    }, None)
+
+
+async def run(limit: int, updates, fast: float, slow: float, slow_share: float):
+    processor = ChatOrderedUpdateProcessor(limit)
+    seen = {}
+    rng = random.Random(limit)
+
+    async def handle(update: Update):
+        await asyncio.sleep(slow if rng.random() < slow_share else fast)
+        seen.setdefault(update.effective_chat.id, []).append(update.update_id)
+
+    started = time.perf_counter()
+    async with processor:
+        await asyncio.gather(*(
+            asyncio.create_task(processor.process_update(update, handle(update))) for update in updates
+        ))
+    elapsed = time.perf_counter() - started
+    ordered = all(ids == sorted(ids) for ids in seen.values())
+    return elapsed, ordered, processor.stats()
+
+
+async def run_burst(limit: int, heavy_workers: int, heavy_burst: int, heavy_seconds: float,
+                    taps: int, tap_seconds: float):
+    """Tap latency percentiles (ms) while ``heavy_burst`` heavy updates are queued at once"""
+    processor = ChatOrderedUpdateProcessor(
+        limit, heavy_workers=heavy_workers, heavy_queue_size=heavy_burst,
+        is_heavy=lambda update: update.update_id < heavy_burst,
+    )
+    latencies = []
+
+    async def heavy(update: Update):
+        await asyncio.sleep(heavy_seconds)
+
+    async def tap(update: Update, sent: float):
+        await asyncio.sleep(tap_seconds)
+        latencies.append((time.perf_counter() - sent) * 1000)
+
+    async with processor:
+        tasks = [
+            asyncio.create_task(processor.process_update(make_update(i, i), heavy(None)))
+            for i in range(heavy_burst)
+        ]
+        for i in range(taps):
+            # Taps from chats that sent no heavy update, spread over the burst
+            update = make_update(heavy_burst + i, 10_000_000 + i % 50)
+            tasks.append(asyncio.create_task(processor.process_update(update, tap(update, time.perf_counter()))))
+            await asyncio.sleep(0.005)
+        await asyncio.gather(*tasks)
+        while processor.heavy_stats()["queued"] or processor.heavy_stats()["running"]:
+            await asyncio.sleep(0.05)
+        heavy_stats = processor.heavy_stats()
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1], heavy_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--limits", default="1,4,16,64")
+    parser.add_argument("--fast-ms", type=float, default=20)
+    parser.add_argument("--slow-ms", type=float, default=500)
+    parser.add_argument("--slow-share", type=float, default=0.05)
+    parser.add_argument("--heavy-burst", type=int, default=0, help="heavy updates fired at once (0 skips the lane test)")
+    parser.add_argument("--heavy-workers", type=int, default=4)
+    parser.add_argument("--heavy-ms", type=float, default=1000)
+    parser.add_argument("--taps", type=int, default=400)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    updates = [make_update(i, rng.randrange(args.chats)) for i in range(args.updates)]
+    print(f"{args.updates} updates from {args.chats} chats, {args.fast_ms:.0f}ms per update, "
+          f"{args.slow_share:.0%} take {args.slow_ms:.0f}ms")
+    for limit in (int(value) for value in args.limits.split(",")):
+        elapsed, ordered, stats = asyncio.run(run(
+            limit, updates, args.fast_ms / 1000, args.slow_ms / 1000, args.slow_share
+        ))
+        print(f"limit={limit:4d}  {elapsed:7.2f}s  {args.updates / elapsed:8.1f} updates/s  "
+              f"per-chat order {'kept' if ordered else 'BROKEN'}  {stats}")
+
+    if not args.heavy_burst:
+        return
+    print(f"\n{args.heavy_burst} heavy updates of {args.heavy_ms:.0f}ms at once, {args.taps} keypad taps "
+          f"of {args.fast_ms:.0f}ms from other chats")
+    for limit in (int(value) for value in args.limits.split(",")):
+        for workers in (0, args.heavy_workers):
+            p50, p99, heavy_stats = asyncio.run(run_burst(
+                limit, workers, args.heavy_burst, args.heavy_ms / 1000, args.taps, args.fast_ms / 1000
+            ))
+            lane = f"heavy lane ({workers} workers)" if workers else "single lane"
+            print(f"limit={limit:4d}  {lane:24}  tap p50={p50:8.1f}ms  p99={p99:8.1f}ms  heavy={heavy_stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the bank statement import
+
+Writes a synthetic CSV statement, imports it for a throwaway user through the
+COPY + merge path and imports it again to show that every row is deduplicated.
+Requires the configured PostgreSQL database.
+
+Usage:
+  python benchmark_import.py --rows 100000
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.database.session import get_session
+from src.database.init_db import create_default_categories
+from src.models import User, Category
+from src.utils.category_matcher import category_matchers
+from src.utils.statement_import import import_statement
+
+BENCH_TELEGRAM_ID = -999000222
+DESCRIPTIONS = ("SILPO grocery food", "UBER trip transportation", "Salary ACME", "Netflix entertainment", "Pharmacy health", "Card transfer")
+
+
+def write_statement(path: str, rows: int):
+    start = datetime(2020, 1, 1)
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle, delimiter=";")
+        writer.writerow(("Date", "Description", "Amount", "Currency"))
+        for i in range(rows):
+            amount = f"{(i % 5000) / 100 + 1:.2f}"
+            description = DESCRIPTIONS[i % len(DESCRIPTIONS)]
+            writer.writerow(((start + timedelta(minutes=i)).strftime("%d.%m.%Y"), description, amount if "Salary" in description else f"-{amount}", "UAH"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    db = get_session()
+    user = db.query(User).filter(User.telegram_id == BENCH_TELEGRAM_ID).first()
+    if user:
+        db.delete(user)
+        db.commit()
+    user = User(telegram_id=BENCH_TELEGRAM_ID, username="bench-import", preferred_currency="UAH")
+    db.add(user)
+    db.commit()
+    create_default_categories(db, user.id)
+    categories = [(c.id, c.name_en, c.name_ru, c.category_type) for c in db.query(Category).filter(Category.user_id == user.id)]
+    matcher = category_matchers.get(db, user.id)
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        write_statement(path, args.rows)
+        for attempt in ("first import", "re-import"):
+            started = time.perf_counter()
+            result = import_statement(db, path, "csv", user.id, "UAH", categories, matcher)
+            elapsed = time.perf_counter() - started
+            print(f"{attempt:13} {result} in {elapsed:.2f}s ({result.parsed / elapsed:,.0f} rows/s)")
+    finally:
+        os.unlink(path)
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
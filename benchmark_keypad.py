@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the amount keypad callback path
+
+Drives TransactionHandler.handle_amount_input with synthetic digit/backspace
+callbacks (Telegram calls are stubbed out) and reports p50/p99 handler latency,
+SQL statements issued per keystroke and edits skipped as unchanged.
+
+Usage:
+  DATABASE_URL=sqlite:////tmp/keypad.db python benchmark_keypad.py --taps 5000
+  python benchmark_keypad.py --taps 5000       # against the configured database
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+from src.database.connection import engine, Base
+from src.models import User, Category
+from src.models.category import CategoryType
+from src.handlers.transaction import TransactionHandler
+from src.utils.render import message_renderer
+
+BENCH_TELEGRAM_ID = -999000111
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+def make_update(data: str):
+    query = SimpleNamespace(data=data, answer=_noop, edit_message_text=_noop, message=SimpleNamespace(chat_id=BENCH_TELEGRAM_ID, message_id=1, reply_text=_noop))
+    return SimpleNamespace(
+        callback_query=query,
+        message=None,
+        effective_chat=SimpleNamespace(id=BENCH_TELEGRAM_ID, type="private", title=None),
+        effective_user=SimpleNamespace(id=BENCH_TELEGRAM_ID, username="bench", first_name="bench", last_name=None, language_code="en")
+    )
+
+
+def ensure_fixture(db):
+    user = db.query(User).filter(User.telegram_id == BENCH_TELEGRAM_ID).first()
+    if not user:
+        user = User(telegram_id=BENCH_TELEGRAM_ID, username="bench", preferred_language="en", preferred_currency="USD")
+        db.add(user)
+        db.commit()
+    category = db.query(Category).filter(Category.user_id == user.id).first()
+    if not category:
+        category = Category(name_en="Food", name_ru="Еда", icon="🍽️", category_type=CategoryType.EXPENSE, user_id=user.id)
+        db.add(category)
+        db.commit()
+    return category
+
+
+async def run(taps: int):
+    Base.metadata.create_all(engine, tables=[Category.__table__, User.__table__])
+    handler = TransactionHandler()
+    category = ensure_fixture(handler.db)
+
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+
+    context = SimpleNamespace(user_data={})
+    context.user_data['selected_category_id'] = category.id
+    context.user_data['selected_currency'] = "USD"
+    await handler.handle_select_date(make_update("select_date_today"), context)
+
+    keys = ["amount_1", "amount_2", "amount_3", "amount_backspace", "amount_backspace", "amount_backspace"]
+    samples = []
+    statements = 0
+    for i in range(taps):
+        update = make_update(keys[i % len(keys)])
+        started = time.perf_counter()
+        await handler.handle_amount_input(update, context)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    samples.sort()
+    print(f"keystrokes:      {taps}")
+    print(f"SQL/keystroke:   {statements / taps:.2f}")
+    print(f"p50 latency:     {statistics.median(samples):.3f} ms")
+    print(f"p99 latency:     {samples[int(len(samples) * 0.99) - 1]:.3f} ms")
+    print(f"message edits:   {message_renderer.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--taps", type=int, default=5000, help="number of keypad callbacks to simulate")
+    args = parser.parse_args()
+    asyncio.run(run(args.taps))
+
+
+if __name__ == "__main__":
+    main()
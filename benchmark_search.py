@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark for /search
+
+Fills the transactions table with synthetic rows spread over many throwaway
+users, then times description searches for one of them: a common word, a rare
+word, a prefix, a two-word query and a keyset "next page". Requires the
+configured PostgreSQL database with migrations applied.
+
+Usage:
+  python benchmark_search.py --rows 2000000 --users 200
+  python benchmark_search.py --rows 2000000 --users 2    # ~1M rows per user
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+from src.database.session import get_session
+from src.database.init_db import create_default_categories
+from src.models import User, Category
+from src.utils.search import search_transactions
+
+BENCH_TELEGRAM_ID = -999000333
+WORDS = ("silpo", "grocery", "uber", "taxi", "airport", "netflix", "pharmacy", "coffee", "lunch", "rent",
+         "такси", "аэропорт", "продукты", "кофе", "аптека", "обед", "зарплата", "подарок", "бензин", "кино")
+QUERIES = ("taxi", "аэропорт", "такс", "uber airport", "zzzrare")
+REPEAT = 50
+
+
+def fill(db, user_ids, category_id, rows):
+    """Insert ``rows`` transactions round-robin over ``user_ids`` with 3-5 word descriptions"""
+    words = "ARRAY[" + ",".join(f"'{w}'" for w in WORDS) + "]"
+    db.execute(text(f"""
+        INSERT INTO transactions (amount, currency, description, transaction_date, user_id, category_id)
+        SELECT (i % 5000) / 100.0 + 1, 'UAH',
+               ({words})[1 + i % 20] || ' ' || ({words})[1 + (i / 20) % 20] || ' ' || ({words})[1 + (i / 400) % 20]
+                   || CASE WHEN i % 100000 = 0 THEN ' zzzrare' ELSE '' END,
+               now() - random() * interval '1000 hours',
+               (:user_ids)[1 + i % cardinality(:user_ids)], :category_id
+        FROM generate_series(1, :rows) AS i
+    """), {"user_ids": user_ids, "category_id": category_id, "rows": rows})
+    db.commit()
+    db.execute(text("ANALYZE transactions"))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    db = get_session()
+    users = [User(telegram_id=BENCH_TELEGRAM_ID - i, username=f"bench-search-{i}") for i in range(args.users)]
+    db.add_all(users)
+    db.commit()
+    user_ids = [user.id for user in users]
+    create_default_categories(db, user_ids[0])
+    category_id = db.query(Category.id).filter(Category.user_id == user_ids[0]).first()[0]
+
+    try:
+        started = time.perf_counter()
+        fill(db, user_ids, category_id, args.rows)
+        print(f"inserted {args.rows:,} rows for {args.users} users in {time.perf_counter() - started:.1f}s")
+
+        for query in QUERIES + ("page 2",):
+            timings = []
+            for _ in range(REPEAT):
+                started = time.perf_counter()
+                if query == "page 2":
+                    _, cursor = search_transactions(db, user_ids[0], "taxi")
+                    started = time.perf_counter()
+                    hits, _ = search_transactions(db, user_ids[0], "taxi", after=cursor)
+                else:
+                    hits, cursor = search_transactions(db, user_ids[0], query)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            print(f"{query!r:16} hits={len(hits):2d} p50={statistics.median(timings):6.2f}ms p99={timings[int(len(timings) * 0.99) - 1]:6.2f}ms")
+    finally:
+        db.rollback()
+        db.execute(text("DELETE FROM transactions WHERE user_id = ANY(:user_ids)"), {"user_ids": user_ids})
+        db.execute(text("DELETE FROM categories WHERE user_id = ANY(:user_ids)"), {"user_ids": user_ids})
+        db.execute(text("DELETE FROM users WHERE id = ANY(:user_ids)"), {"user_ids": user_ids})
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import hashlib
 import os
 from dotenv import load_dotenv
 
@@ -18,6 +19,8 @@ class Settings:
     # Application
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # "text" or "json"
+    LOG_DEBUG_SAMPLE_RATE = int(os.getenv("LOG_DEBUG_SAMPLE_RATE", "20"))  # keep 1 in N DEBUG lines per call site
     
     # Google Cloud Speech-to-Text
     ENABLE_VOICE_INPUT = os.getenv("ENABLE_VOICE_INPUT", "False").lower() == "true"
@@ -25,7 +28,82 @@ class Settings:
     GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "")
     SPEECH_RECOGNITION_LANGUAGES = os.getenv("SPEECH_RECOGNITION_LANGUAGES", "ru-RU,en-US,uk-UA")
     SPEECH_TARGET_LANGUAGE = os.getenv("SPEECH_TARGET_LANGUAGE", "ru-RU")
-    
+
+    # Charts (rendered in a process pool)
+    ENABLE_CHARTS = os.getenv("ENABLE_CHARTS", "True").lower() == "true"
+    CHART_WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+    CHART_QUEUE_SIZE = int(os.getenv("CHART_QUEUE_SIZE", "16"))
+    CHART_RENDER_TIMEOUT = float(os.getenv("CHART_RENDER_TIMEOUT", "20"))
+    CHART_PER_USER_LIMIT = int(os.getenv("CHART_PER_USER_LIMIT", "1"))
+
+    # Generated file cache (charts, exports): on-disk LRU plus Telegram file_id reuse
+    FILE_CACHE_DIR = os.getenv("FILE_CACHE_DIR", "cache/files")
+    FILE_CACHE_MAX_BYTES = int(os.getenv("FILE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+    # Scheduled digests (weekly on Mondays, monthly on the 1st)
+    DIGEST_TIME = os.getenv("DIGEST_TIME", "09:00")
+    DIGEST_SEND_RATE = float(os.getenv("DIGEST_SEND_RATE", "25"))
+
+    # Recurring transactions (materialized once a day)
+    RECURRING_TIME = os.getenv("RECURRING_TIME", "00:05")
+
+    # Exchange rates refresh (job on the leader replica)
+    EXCHANGE_RATES_INTERVAL_MINUTES = float(os.getenv("EXCHANGE_RATES_INTERVAL_MINUTES", "60"))
+
+    # Scheduled jobs run on one replica, elected via a Postgres advisory lock checked this often (seconds)
+    LEADER_CHECK_INTERVAL = float(os.getenv("LEADER_CHECK_INTERVAL", "5"))
+
+    # Conversation state (context.user_data) is written to the database in batches this often (seconds);
+    # flows untouched for the TTL are dropped
+    PERSISTENCE_FLUSH_INTERVAL = float(os.getenv("PERSISTENCE_FLUSH_INTERVAL", "0.3"))
+    CONVERSATION_TTL_MINUTES = float(os.getenv("CONVERSATION_TTL_MINUTES", "120"))
+
+    # Identical transactions (user, amount, category, currency) within this window are dropped as duplicates
+    DEDUP_WINDOW_SECONDS = float(os.getenv("DEDUP_WINDOW_SECONDS", "10"))
+
+    # Updates processed at the same time; one chat's updates always run in order
+    CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "32"))
+    # Heavy lane (voice, exports, imports, charts): its own workers and a bounded queue
+    HEAVY_WORKERS = int(os.getenv("HEAVY_WORKERS", "4"))
+    HEAVY_QUEUE_SIZE = int(os.getenv("HEAVY_QUEUE_SIZE", "64"))
+
+    # Outbound Bot API calls: rate limits (Telegram: ~30 msg/s overall, ~1 msg/s per chat, 20 msg/min per group)
+    RATE_LIMIT_GLOBAL_PER_SECOND = float(os.getenv("RATE_LIMIT_GLOBAL_PER_SECOND", "30"))
+    RATE_LIMIT_CHAT_PER_SECOND = float(os.getenv("RATE_LIMIT_CHAT_PER_SECOND", "1"))
+    RATE_LIMIT_CHAT_BURST = int(os.getenv("RATE_LIMIT_CHAT_BURST", "10"))
+    RATE_LIMIT_GROUP_PER_MINUTE = float(os.getenv("RATE_LIMIT_GROUP_PER_MINUTE", "20"))
+    RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+    # HTTP connection pool and timeouts (seconds) for Bot API calls
+    TELEGRAM_POOL_SIZE = int(os.getenv("TELEGRAM_POOL_SIZE", "64"))
+    TELEGRAM_CONNECT_TIMEOUT = float(os.getenv("TELEGRAM_CONNECT_TIMEOUT", "5"))
+    TELEGRAM_READ_TIMEOUT = float(os.getenv("TELEGRAM_READ_TIMEOUT", "10"))
+    TELEGRAM_WRITE_TIMEOUT = float(os.getenv("TELEGRAM_WRITE_TIMEOUT", "30"))
+    TELEGRAM_POOL_TIMEOUT = float(os.getenv("TELEGRAM_POOL_TIMEOUT", "5"))
+
+    # Update delivery: "polling" (getUpdates), "webhook" (embedded aiohttp server behind WEBHOOK_URL),
+    # "dispatcher" (webhook front end sharding chats across workers) or "worker" (one shard)
+    BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+    WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+    WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+    WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+    WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+    WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8000"))
+    WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+
+    # BOT_MODE=dispatcher: route updates by chat_id to SHARD_WORKERS worker processes
+    # (spawned locally on SHARD_BASE_PORT+i, or already running at SHARD_WORKER_URLS)
+    SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "1"))
+    SHARD_WORKER_URLS = os.getenv("SHARD_WORKER_URLS", "")
+    SHARD_BASE_PORT = int(os.getenv("SHARD_BASE_PORT", "8100"))
+    SHARD_INDEX = int(os.getenv("SHARD_INDEX", "0"))  # set for each worker (BOT_MODE=worker)
+
+    @property
+    def webhook_secret(self):
+        """Secret Telegram echoes in every webhook request; derived from the bot token unless set"""
+        if self.WEBHOOK_SECRET:
+            return self.WEBHOOK_SECRET
+        return hashlib.sha256(f"webhook:{self.TELEGRAM_BOT_TOKEN}".encode()).hexdigest()
+
     @property
     def database_url(self):
         if self.DATABASE_URL:
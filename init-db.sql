@@ -9,6 +9,7 @@ GRANT ALL PRIVILEGES ON DATABASE expense_tracker TO expense_user;
 
 -- Create extensions if needed
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS btree_gin;  -- composite (user_id, description_tsv) search index
 
 -- Set timezone
 SET timezone = 'UTC';
@@ -10,7 +10,8 @@ import os
 # Add src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.bot.bot import main
-
 if __name__ == "__main__":
+    # Imported under the guard so chart worker processes (spawned, they re-import
+    # this module) do not pull in the bot, handlers and database engine
+    from src.bot.bot import main
     main()
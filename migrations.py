@@ -23,6 +23,7 @@ from src.models.user import User  # noqa: F401
 from src.models.category import Category  # noqa: F401
 from src.models.transaction import Transaction  # noqa: F401
 from src.models.exchange_rates import ExchangeRate  # noqa: F401
+from src.models.recurring import RecurringRule  # noqa: F401
 
 
 def _run_sql_migrations():
@@ -0,0 +1,8 @@
+ALTER TABLE users
+ADD COLUMN IF NOT EXISTS digest_weekly BOOLEAN DEFAULT FALSE,
+ADD COLUMN IF NOT EXISTS digest_monthly BOOLEAN DEFAULT FALSE;
+
+UPDATE users
+SET digest_weekly = COALESCE(digest_weekly, FALSE),
+    digest_monthly = COALESCE(digest_monthly, FALSE)
+WHERE digest_weekly IS NULL OR digest_monthly IS NULL;
@@ -0,0 +1,6 @@
+ALTER TABLE transactions
+ADD COLUMN IF NOT EXISTS external_id VARCHAR(64);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_transactions_user_external_id
+ON transactions (user_id, external_id)
+WHERE external_id IS NOT NULL;
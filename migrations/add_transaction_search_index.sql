@@ -0,0 +1,13 @@
+ALTER TABLE transactions
+ADD COLUMN IF NOT EXISTS description_tsv tsvector
+GENERATED ALWAYS AS (to_tsvector('simple', coalesce(description, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_date
+ON transactions (user_id, transaction_date);
+
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+DROP INDEX IF EXISTS idx_transactions_description_tsv;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_description_tsv
+ON transactions USING gin (user_id, description_tsv);
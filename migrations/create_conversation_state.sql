@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS conversation_state (
+    scope VARCHAR(16) NOT NULL DEFAULT '',
+    telegram_id BIGINT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (scope, telegram_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_state_updated ON conversation_state (updated_at);
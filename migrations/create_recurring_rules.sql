@@ -0,0 +1,24 @@
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'recurrencefrequency') THEN
+        CREATE TYPE recurrencefrequency AS ENUM ('DAILY', 'WEEKLY', 'MONTHLY');
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS recurring_rules (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+    amount NUMERIC(10, 2) NOT NULL,
+    currency VARCHAR(10) NOT NULL DEFAULT 'USD',
+    description TEXT,
+    frequency recurrencefrequency NOT NULL,
+    day_of_week INTEGER,
+    day_of_month INTEGER,
+    start_date DATE NOT NULL,
+    last_run_date DATE,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_recurring_rules_user ON recurring_rules (user_id);
@@ -1,8 +1,10 @@
+import asyncio
 import logging
 import os
 import re
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time
 from telegram import Update
+from telegram.request import HTTPXRequest
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
 from config.settings import settings
 from src.handlers.user import UserHandler
@@ -10,44 +12,138 @@ from src.handlers.category import CategoryHandler
 from src.handlers.transaction import TransactionHandler
 from src.handlers.report import ReportHandler
 from src.handlers.settings import SettingsHandler
+from src.handlers.export import ExportHandler
+from src.handlers.statement import StatementHandler
+from src.handlers.recurring import RecurringHandler
+from src.handlers.search import SearchHandler, parse_search_cursor
 from src.utils.speech import transcribe_bytes
+from src.utils.charts import chart_renderer
+from src.utils.digests import send_due_digests
+from src.utils.recurring import materialize_recurring
+from src.utils.exchange_rates import refresh_exchange_rates
+from src.utils.leader import leader_election
+from src.utils.invalidation import cache_invalidation
+from src.utils.render import message_renderer
+from src.utils.logging_pipeline import setup_logging
+from src.utils.translations import get_translation
+from src.utils.callback_router import CallbackRouter
+from src.utils.update_processor import ChatOrderedUpdateProcessor
+from src.utils.rate_limiter import TelegramRateLimiter
+from src.utils.persistence import CONVERSATION, EXPIRY_SWEEP_INTERVAL, DatabasePersistence
+from src.bot.webhook import WebhookServer, allowed_updates_for, run_webhook
+from src.bot.dispatcher import run_dispatcher
+from src.utils.recent_transactions import recent_transactions
 from telegram import InlineKeyboardMarkup, InlineKeyboardButton
 from src.models.category import CategoryType
 
-class TokenFilter(logging.Filter):
-    """Filter to hide bot token from logs"""
-    def filter(self, record):
-        if hasattr(record, 'msg'):
-            # Hide bot token from URLs
-            record.msg = re.sub(r'bot\d+:[A-Za-z0-9_-]+', 'bot***TOKEN***', str(record.msg))
-            record.msg = re.sub(r'bot8223285085:[A-Za-z0-9_-]+', 'bot***TOKEN***', str(record.msg))
-        return True
-
-# Configure logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=getattr(logging, settings.LOG_LEVEL)
-)
-
-# Add token filter to all loggers and set httpx to WARNING level
-for logger_name in ['httpx', 'telegram', 'telegram.ext']:
-    logger_obj = logging.getLogger(logger_name)
-    logger_obj.addFilter(TokenFilter())
-    if logger_name == 'httpx':
-        logger_obj.setLevel(logging.WARNING)
+# Configure logging (queued, redacted; see src/utils/logging_pipeline.py)
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
+# Updates that go to the heavy lane (see src/utils/update_processor.py)
+HEAVY_COMMANDS = {"/export"}
+HEAVY_CALLBACKS = {"monthly_chart", "yearly_chart", "balance_chart"}
+
 class ExpenseTrackerBot:
     def __init__(self):
-        self.application = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).build()
+        self.update_processor = ChatOrderedUpdateProcessor(
+            settings.CONCURRENT_UPDATES,
+            heavy_workers=settings.HEAVY_WORKERS,
+            heavy_queue_size=settings.HEAVY_QUEUE_SIZE,
+            is_heavy=self._is_heavy_update,
+            on_rejected=self._reject_heavy_update,
+        )
+        # Shards share the bot's global Telegram limit
+        shards = settings.SHARD_WORKERS if settings.BOT_MODE == "worker" else 1
+        self.rate_limiter = TelegramRateLimiter(
+            global_rate=settings.RATE_LIMIT_GLOBAL_PER_SECOND / shards,
+            chat_rate=settings.RATE_LIMIT_CHAT_PER_SECOND,
+            chat_burst=settings.RATE_LIMIT_CHAT_BURST,
+            group_rate_per_minute=settings.RATE_LIMIT_GROUP_PER_MINUTE,
+            max_retries=settings.RATE_LIMIT_MAX_RETRIES,
+        )
+        # A shard only owns the conversations of the chats routed to it
+        scope = f"{settings.SHARD_INDEX}/{settings.SHARD_WORKERS}" if settings.BOT_MODE == "worker" else ""
+        self.persistence = DatabasePersistence(
+            flush_interval=settings.PERSISTENCE_FLUSH_INTERVAL,
+            ttl=settings.CONVERSATION_TTL_MINUTES * 60,
+            scope=scope,
+        )
+        cache_invalidation.on(CONVERSATION, self.persistence.mark_stale)
+        self.application = (
+            Application.builder()
+            .token(settings.TELEGRAM_BOT_TOKEN)
+            .concurrent_updates(self.update_processor)
+            .rate_limiter(self.rate_limiter)
+            .persistence(self.persistence)
+            .request(HTTPXRequest(
+                connection_pool_size=settings.TELEGRAM_POOL_SIZE,
+                connect_timeout=settings.TELEGRAM_CONNECT_TIMEOUT,
+                read_timeout=settings.TELEGRAM_READ_TIMEOUT,
+                write_timeout=settings.TELEGRAM_WRITE_TIMEOUT,
+                pool_timeout=settings.TELEGRAM_POOL_TIMEOUT,
+            ))
+            .post_init(self._post_init)
+            .post_shutdown(self._post_shutdown)
+            .build()
+        )
         self.user_handler = UserHandler()
         self.category_handler = CategoryHandler()
         self.transaction_handler = TransactionHandler()
         self.report_handler = ReportHandler()
         self.settings_handler = SettingsHandler()
+        self.export_handler = ExportHandler()
+        self.statement_handler = StatementHandler()
+        self.recurring_handler = RecurringHandler()
+        self.search_handler = SearchHandler()
         
+        self.router = CallbackRouter()
+        self._setup_routes()
         self._setup_handlers()
+        self._setup_jobs()
+    
+    @staticmethod
+    def _is_heavy_update(update: Update) -> bool:
+        """Voice, statement imports, exports and charts run in the heavy lane"""
+        if update.callback_query is not None:
+            return update.callback_query.data in HEAVY_CALLBACKS
+        message = update.message
+        if message is None:
+            return False
+        if message.voice or message.audio or message.document:
+            return True
+        command = (message.text or "").partition(" ")[0].split("@")[0]
+        return command in HEAVY_COMMANDS
+    
+    async def _reject_heavy_update(self, update: Update):
+        """Tell the user a heavy request was dropped because the heavy lane is full"""
+        language_code = update.effective_user.language_code if update.effective_user else None
+        language = "ru" if (language_code or "").startswith(("ru", "uk")) else "en"
+        text = get_translation("heavy_lane_busy", language)
+        if update.callback_query is not None:
+            await update.callback_query.answer(text, show_alert=True)
+        elif update.effective_message is not None:
+            await update.effective_message.reply_text(text)
+    
+    def _setup_jobs(self):
+        """Schedule background jobs"""
+        job_queue = self.application.job_queue
+        if job_queue is None:
+            logger.warning("JobQueue unavailable (install python-telegram-bot[job-queue]); digests and recurring transactions disabled")
+            return
+        # Every replica forgets its own abandoned flows
+        job_queue.run_repeating(self.persistence.expire_flows, interval=EXPIRY_SWEEP_INTERVAL, name="conversation_expiry")
+        # Every replica schedules the jobs; only the elected leader runs them
+        leader_only = leader_election.leader_only
+        job_queue.run_repeating(leader_election.run_check, interval=settings.LEADER_CHECK_INTERVAL, first=0, name="leader_election")
+        hour, minute = (int(part) for part in settings.DIGEST_TIME.split(":"))
+        # Runs daily; the callback decides whether weekly (Monday) or monthly (1st) digests are due
+        job_queue.run_daily(leader_only(send_due_digests), time=time(hour=hour, minute=minute), name="digests")
+        hour, minute = (int(part) for part in settings.RECURRING_TIME.split(":"))
+        job_queue.run_daily(leader_only(materialize_recurring), time=time(hour=hour, minute=minute), name="recurring")
+        job_queue.run_repeating(leader_only(refresh_exchange_rates), interval=settings.EXCHANGE_RATES_INTERVAL_MINUTES * 60,
+                                first=settings.LEADER_CHECK_INTERVAL * 2, name="exchange_rates")
     
     def _setup_handlers(self):
         """Setup all bot handlers"""
@@ -58,6 +154,10 @@ class ExpenseTrackerBot:
         self.application.add_handler(CommandHandler("test", self._handle_test_command))
         self.application.add_handler(CommandHandler("help", self.user_handler.handle_help))
         self.application.add_handler(CommandHandler("balance", self.user_handler.handle_balance))
+        self.application.add_handler(CommandHandler("export", self.export_handler.handle_export_command))
+        self.application.add_handler(CommandHandler("recurring", self.recurring_handler.handle_recurring_command))
+        self.application.add_handler(CommandHandler("search", self.search_handler.handle_search_command))
+        self.application.add_handler(CommandHandler("alias", self.category_handler.handle_alias_command))
         
         # Callback query handlers
         self.application.add_handler(CallbackQueryHandler(self._handle_callback_query))
@@ -65,6 +165,14 @@ class ExpenseTrackerBot:
         # Message handlers for text input
         self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_text_message))
         
+        # Bank statement import (CSV / OFX documents)
+        statement_filter = (
+            filters.Document.FileExtension("csv")
+            | filters.Document.FileExtension("ofx")
+            | filters.Document.FileExtension("qfx")
+        )
+        self.application.add_handler(MessageHandler(statement_filter, self.statement_handler.handle_document))
+        
         # Voice/audio handler (only if enabled)
         if settings.ENABLE_VOICE_INPUT:
             self.application.add_handler(MessageHandler((filters.VOICE | filters.AUDIO) & ~filters.COMMAND, self._handle_voice_message))
@@ -75,9 +183,81 @@ class ExpenseTrackerBot:
         # Debug handler for all messages
         self.application.add_handler(MessageHandler(filters.ALL, self._handle_debug_message))
     
+    def _setup_routes(self):
+        """Map callback_data values to handlers; prefixed routes get the rest of the value as a typed argument"""
+        r = self.router
+        
+        # Main menu handlers
+        r.exact("main_menu", self.user_handler.handle_start)
+        
+        # Transaction handlers
+        r.exact("add_transaction", self.transaction_handler.handle_add_transaction)
+        r.exact("add_income", self.transaction_handler.handle_add_income)
+        r.exact("add_expense", self.transaction_handler.handle_add_expense)
+        r.exact("recent_transactions", self.transaction_handler.handle_recent_transactions)
+        r.exact("manage_transactions", self.transaction_handler.handle_manage_transactions)
+        r.prefix("manage_transactions_", self.transaction_handler.handle_manage_transactions_period)
+        r.prefix("manage_transaction_", self.transaction_handler.handle_manage_specific_transaction, "transaction_id", int)
+        r.prefix("edit_transaction_", self.transaction_handler.handle_edit_transaction, "transaction_id", int)
+        for action in ("amount", "category", "date", "description"):
+            r.prefix(f"edit_transaction_{action}_", self.transaction_handler.handle_edit_transaction, "transaction_id", int, action=action)
+        r.prefix("delete_transaction_", self.transaction_handler.handle_delete_transaction, "transaction_id", int)
+        r.prefix("select_category_", self.transaction_handler.handle_select_category, "category_id", int)
+        # Currency selection removed from add flow; currency changes only via manage/edit
+        r.prefix("select_date_", self.transaction_handler.handle_select_date)
+        
+        # Amount input keyboard handlers
+        r.prefix("amount_", self.transaction_handler.handle_amount_input)
+        
+        # Category handlers
+        r.exact("manage_categories", self.category_handler.handle_manage_categories)
+        r.exact("add_category", self.category_handler.handle_add_category)
+        r.exact("add_income_category", self.category_handler.handle_add_income_category)
+        r.exact("add_expense_category", self.category_handler.handle_add_expense_category)
+        r.exact("view_categories", self.category_handler.handle_view_categories)
+        r.exact("edit_category", self.category_handler.handle_edit_category)
+        r.exact("delete_category", self.category_handler.handle_delete_category)
+        r.prefix("edit_category_", self.category_handler.handle_edit_specific_category, "category_id", int)
+        r.prefix("delete_category_", self.category_handler.handle_delete_specific_category, "category_id", int)
+        r.prefix("edit_name_en_", self.category_handler.handle_edit_name_en, "category_id", int)
+        r.prefix("edit_name_ru_", self.category_handler.handle_edit_name_ru, "category_id", int)
+        r.prefix("edit_icon_", self.category_handler.handle_edit_icon, "category_id", int)
+        r.prefix("edit_color_", self.category_handler.handle_edit_color, "category_id", int)
+        
+        # Report handlers
+        r.exact("view_reports", self.report_handler.handle_view_reports)
+        r.exact("weekly_report", self.report_handler.handle_weekly_report)
+        r.exact("balance_report", self.report_handler.handle_balance_report)
+        r.exact("monthly_report", self.report_handler.handle_monthly_report)
+        r.exact("yearly_report", self.report_handler.handle_yearly_report)
+        r.exact("category_breakdown", self.report_handler.handle_category_breakdown)
+        r.exact("analytics", self.report_handler.handle_analytics)
+        r.exact("custom_period", self.report_handler.handle_custom_period_report)
+        r.exact("compare_report", self.report_handler.handle_compare_report)
+        r.exact("compare_month", self.report_handler.handle_compare_period, period="month")
+        r.exact("compare_year", self.report_handler.handle_compare_period, period="year")
+        r.exact("monthly_chart", self.report_handler.handle_monthly_chart)
+        r.exact("yearly_chart", self.report_handler.handle_yearly_chart)
+        r.exact("balance_chart", self.report_handler.handle_balance_chart)
+        
+        # Settings handlers
+        r.exact("settings", self.settings_handler.handle_settings_menu)
+        r.exact("language_settings", self.settings_handler.handle_language_settings)
+        r.exact("currency_settings", self.settings_handler.handle_currency_settings)
+        r.exact("balance_settings", self.settings_handler.handle_balance_settings)
+        r.prefix("set_primary_income_", self.settings_handler.handle_set_primary_income, "category_id", int)
+        r.exact("digest_settings", self.settings_handler.handle_digest_settings)
+        r.prefix("toggle_digest_", self.settings_handler.handle_toggle_digest, "kind")
+        r.prefix("set_language_", self.settings_handler.handle_set_language, "language_code")
+        r.prefix("set_currency_", self.settings_handler.handle_set_currency, "currency_code")
+        
+        # Search and recurring transactions
+        r.prefix("search_more_", self.search_handler.handle_search_more, "cursor", parse_search_cursor)
+        r.prefix("delete_recurring_", self.recurring_handler.handle_delete_recurring, "rule_id", int)
+    
     async def _handle_start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command for both users and groups"""
-        logger.info(f"Start command received: chat_id={update.message.chat.id}, type={update.message.chat.type}, title={update.message.chat.title}")
+        logger.info("Start command received: chat_id=%s, type=%s", update.message.chat.id, update.message.chat.type)
         
         # Route to user handler (now handles both users and groups)
         await self.user_handler.handle_start(update, context)
@@ -85,7 +265,7 @@ class ExpenseTrackerBot:
     async def _handle_test_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /test command for debugging"""
         chat = update.message.chat
-        logger.info(f"Test command received: chat_id={chat.id}, type={chat.type}, title={chat.title}")
+        logger.info("Test command received: chat_id=%s, type=%s", chat.id, chat.type)
         
         response = f"✅ **Тест успешен!**\n\n"
         response += f"📊 **Информация о чате:**\n"
@@ -106,8 +286,8 @@ class ExpenseTrackerBot:
         """Debug handler for all messages"""
         if update.message:
             chat = update.message.chat
-            print(f"DEBUG: Message received: chat_id={chat.id}, type={chat.type}, title={chat.title}, text='{update.message.text}'")
-            logger.info(f"Message received: chat_id={chat.id}, type={chat.type}, title={chat.title}, text='{update.message.text}'")
+            logger.debug("Message received: chat_id=%s, type=%s, text length=%s",
+                         chat.id, chat.type, len(update.message.text or ""))
     
     async def _handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle callback queries from inline keyboards"""
@@ -117,108 +297,12 @@ class ExpenseTrackerBot:
         callback_data = query.data
         
         try:
-            # Main menu handlers
-            if callback_data == "main_menu":
-                await self.user_handler.handle_start(update, context)
-            
-            # Transaction handlers
-            elif callback_data == "add_transaction":
-                await self.transaction_handler.handle_add_transaction(update, context)
-            elif callback_data == "add_income":
-                await self.transaction_handler.handle_add_income(update, context)
-            elif callback_data == "add_expense":
-                await self.transaction_handler.handle_add_expense(update, context)
-            elif callback_data == "recent_transactions":
-                await self.transaction_handler.handle_recent_transactions(update, context)
-            elif callback_data == "manage_transactions":
-                await self.transaction_handler.handle_manage_transactions(update, context)
-            elif callback_data.startswith("manage_transactions_"):
-                await self.transaction_handler.handle_manage_transactions_period(update, context)
-            elif callback_data.startswith("manage_transaction_"):
-                await self.transaction_handler.handle_manage_specific_transaction(update, context)
-            elif callback_data.startswith("edit_transaction_"):
-                await self.transaction_handler.handle_edit_transaction(update, context)
-            elif callback_data.startswith("delete_transaction_"):
-                await self.transaction_handler.handle_delete_transaction(update, context)
-            elif callback_data.startswith("select_category_"):
-                await self.transaction_handler.handle_select_category(update, context)
-            # Currency selection removed from add flow; currency changes only via manage/edit
-            elif callback_data.startswith("select_date_"):
-                await self.transaction_handler.handle_select_date(update, context)
-            
-            # Amount input keyboard handlers
-            elif callback_data.startswith("amount_"):
-                await self.transaction_handler.handle_amount_input(update, context)
-            
-            # Category handlers
-            elif callback_data == "manage_categories":
-                await self.category_handler.handle_manage_categories(update, context)
-            elif callback_data == "add_category":
-                await self.category_handler.handle_add_category(update, context)
-            elif callback_data == "add_income_category":
-                await self.category_handler.handle_add_income_category(update, context)
-            elif callback_data == "add_expense_category":
-                await self.category_handler.handle_add_expense_category(update, context)
-            elif callback_data == "view_categories":
-                await self.category_handler.handle_view_categories(update, context)
-            elif callback_data == "edit_category":
-                await self.category_handler.handle_edit_category(update, context)
-            elif callback_data == "delete_category":
-                await self.category_handler.handle_delete_category(update, context)
-            elif callback_data.startswith("edit_category_"):
-                await self.category_handler.handle_edit_specific_category(update, context)
-            elif callback_data.startswith("delete_category_"):
-                await self.category_handler.handle_delete_specific_category(update, context)
-            elif callback_data.startswith("edit_name_en_"):
-                await self.category_handler.handle_edit_name_en(update, context)
-            elif callback_data.startswith("edit_name_ru_"):
-                await self.category_handler.handle_edit_name_ru(update, context)
-            elif callback_data.startswith("edit_icon_"):
-                await self.category_handler.handle_edit_icon(update, context)
-            elif callback_data.startswith("edit_color_"):
-                await self.category_handler.handle_edit_color(update, context)
-            
-            # Report handlers
-            elif callback_data == "view_reports":
-                await self.report_handler.handle_view_reports(update, context)
-            elif callback_data == "weekly_report":
-                await self.report_handler.handle_weekly_report(update, context)
-            elif callback_data == "balance_report":
-                await self.report_handler.handle_balance_report(update, context)
-            elif callback_data == "monthly_report":
-                await self.report_handler.handle_monthly_report(update, context)
-            elif callback_data == "yearly_report":
-                await self.report_handler.handle_yearly_report(update, context)
-            elif callback_data == "category_breakdown":
-                await self.report_handler.handle_category_breakdown(update, context)
-            elif callback_data == "analytics":
-                await self.report_handler.handle_analytics(update, context)
-            elif callback_data == "custom_period":
-                await self.report_handler.handle_custom_period_report(update, context)
-            
-            # Settings handlers
-            elif callback_data == "settings":
-                await self.settings_handler.handle_settings_menu(update, context)
-            elif callback_data == "language_settings":
-                await self.settings_handler.handle_language_settings(update, context)
-            elif callback_data == "currency_settings":
-                await self.settings_handler.handle_currency_settings(update, context)
-            elif callback_data == "balance_settings":
-                await self.settings_handler.handle_balance_settings(update, context)
-            elif callback_data.startswith("set_primary_income_"):
-                await self.settings_handler.handle_set_primary_income(update, context)
-            elif callback_data.startswith("set_language_"):
-                await self.settings_handler.handle_set_language(update, context)
-            elif callback_data.startswith("set_currency_"):
-                await self.settings_handler.handle_set_currency(update, context)
-            
-            
-            else:
-                await query.edit_message_text("Unknown command. Please use /start to see the main menu.")
+            if not await self.router.dispatch(update, context):
+                await message_renderer.edit(query, "Unknown command. Please use /start to see the main menu.")
         
         except Exception as e:
             logger.error(f"Error handling callback query {callback_data}: {e}")
-            await query.edit_message_text("An error occurred. Please try again or use /start to restart.")
+            await message_renderer.edit(query, "An error occurred. Please try again or use /start to restart.")
     
     async def _handle_text_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle text messages (for category names, amounts, etc.)"""
@@ -243,9 +327,9 @@ class ExpenseTrackerBot:
                 await self.transaction_handler.handle_custom_date_input(update, context)
             
             else:
-                # Ignore all other text messages - don't respond
-                # This prevents the bot from responding to random text
-                pass
+                # Lines like "food 120" / "taxi 45 yesterday" add transactions in one go;
+                # any other text is ignored so the bot does not respond to random chatter
+                await self.transaction_handler.handle_batch_text(update, context)
         
         except Exception as e:
             logger.error(f"Error handling text message: {e}")
@@ -269,13 +353,14 @@ class ExpenseTrackerBot:
             languages = [s.strip() for s in langs_env.split(',') if s.strip()]
             target_lang = os.getenv("SPEECH_TARGET_LANGUAGE", "ru-RU")
 
-            text = transcribe_bytes(bytes(file_bytes), languages, target_lang)
+            # Blocking Google call; run it off the event loop so other chats keep being served
+            text = await asyncio.to_thread(transcribe_bytes, bytes(file_bytes), languages, target_lang)
             if not text:
                 await update.message.reply_text("Не удалось распознать голосовое сообщение.")
                 return
             # Log recognized text for diagnostics
             try:
-                logger.info(f"Voice recognized (chat_id={update.message.chat.id}): {text}")
+                logger.debug("Voice recognized (chat_id=%s): %s", update.message.chat.id, text)
             except Exception:
                 pass
 
@@ -293,7 +378,7 @@ class ExpenseTrackerBot:
                 normalized_num = re.sub(r"[\s\u00A0]", "", raw_num).replace(",", ".")
                 try:
                     amount_value_detected = float(normalized_num) * 1000.0
-                    logger.info(f"Voice amount: detected thousand marker, multiplied -> {amount_value_detected}")
+                    logger.debug("Voice amount: detected thousand marker, multiplied -> %s", amount_value_detected)
                 except Exception:
                     amount_value_detected = None
             if amount_value_detected is None:
@@ -364,16 +449,57 @@ class ExpenseTrackerBot:
             logger.error(f"Error handling voice message: {e}")
             await update.message.reply_text("Произошла ошибка при распознавании. Попробуйте еще раз.")
     
+    async def _post_init(self, application: Application):
+        # Evict per-user caches when another replica writes
+        await cache_invalidation.start()
+
+    async def _post_shutdown(self, application: Application):
+        await cache_invalidation.stop()
+
     def run(self):
         """Run the bot"""
-        logger.info("Starting Expense Tracker Bot...")
-        self.application.run_polling(allowed_updates=Update.ALL_TYPES)
+        allowed_updates = allowed_updates_for(self.application)
+        logger.info(f"Starting Expense Tracker Bot ({settings.BOT_MODE}, updates: {', '.join(allowed_updates)})...")
+        webhook_server = None
+        try:
+            if settings.BOT_MODE in ("webhook", "worker"):
+                webhook_server = WebhookServer(self.application, settings.webhook_secret, metrics={
+                    "updates": self.update_processor.stats,
+                    "outbound": self.rate_limiter.stats,
+                    "leader": leader_election.stats,
+                    "cache_invalidation": cache_invalidation.stats,
+                    "persistence": self.persistence.stats,
+                    "callback_routes": self.router.stats,
+                })
+                # Workers sit behind the dispatcher; shard 0 registers the dispatcher's URL
+                register = settings.BOT_MODE == "webhook" or settings.SHARD_INDEX == 0
+                asyncio.run(run_webhook(self.application, webhook_server, allowed_updates, register=register))
+            else:
+                self.application.run_polling(allowed_updates=allowed_updates)
+        finally:
+            leader_election.resign()
+            if webhook_server is not None:
+                logger.info(f"Webhook requests: {webhook_server.stats()}")
+            chart_renderer.shutdown()
+            logger.info(f"Message edits: {message_renderer.stats()}")
+            logger.info(f"Recent transactions buffer: {recent_transactions.stats()}")
+            logger.info(f"Cache invalidations: {cache_invalidation.stats()}")
+            logger.info(f"Conversation state: {self.persistence.stats()}")
+            logger.info(f"Callback routes: {self.router.stats()}")
+            logger.info(f"Update processing: {self.update_processor.stats()}")
+            logger.info(f"Outbound Bot API calls: {self.rate_limiter.stats()}")
 
 def main():
     """Main function to run the bot"""
     if not settings.TELEGRAM_BOT_TOKEN:
         logger.error("TELEGRAM_BOT_TOKEN not found in environment variables!")
         return
+    if settings.BOT_MODE in ("webhook", "dispatcher", "worker") and not settings.WEBHOOK_URL:
+        logger.error(f"BOT_MODE={settings.BOT_MODE} requires WEBHOOK_URL (public https base URL Telegram posts to)")
+        return
+    if settings.BOT_MODE == "dispatcher":
+        asyncio.run(run_dispatcher())
+        return
     
     bot = ExpenseTrackerBot()
     bot.run()
@@ -0,0 +1,216 @@
+"""
+Shard dispatcher for the Expense Tracker Bot
+
+With BOT_MODE=dispatcher the bot runs as several worker processes behind a
+small aiohttp front end. Telegram posts every update to the dispatcher, which
+routes it to a worker by chat_id, so all updates of a chat land on the same
+worker in arrival order. Per-chat ordering, conversation state in user_data
+and the per-user caches therefore stay local to one process, while the
+workers together use every core. Durable state is in Postgres.
+
+Workers are either spawned here (SHARD_WORKERS local processes listening on
+127.0.0.1:SHARD_BASE_PORT+i) or run elsewhere and listed in
+SHARD_WORKER_URLS. A worker is the normal bot in BOT_MODE=worker; shard 0
+registers the webhook (pointing at the dispatcher) on startup.
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+from typing import List, Optional
+import aiohttp
+from aiohttp import web
+from config.settings import settings
+from src.bot.webhook import SECRET_HEADER
+
+logger = logging.getLogger(__name__)
+
+SUPERVISE_INTERVAL = 2.0
+FORWARD_TIMEOUT = 10.0
+
+
+def update_chat_id(update: dict) -> Optional[int]:
+    """chat_id (or sender id) of a raw update, without building telegram objects"""
+    for key, value in update.items():
+        if not isinstance(value, dict):
+            continue
+        message = value.get("message") if key == "callback_query" else value
+        if isinstance(message, dict) and isinstance(message.get("chat"), dict):
+            return message["chat"].get("id")
+        sender = value.get("from")
+        if isinstance(sender, dict):
+            return sender.get("id")
+    return None
+
+
+def shard_for(chat_id: Optional[int], shards: int) -> int:
+    return chat_id % shards if chat_id is not None else 0
+
+
+class ShardDispatcher:
+    def __init__(self, worker_urls: List[str], secret_token: str):
+        self.worker_urls = worker_urls
+        self.secret_token = secret_token
+        # Forwarding to a shard is serialized so its updates arrive in the order Telegram sent them
+        self._locks = [asyncio.Lock() for _ in worker_urls]
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.forwarded = [0] * len(worker_urls)
+        self.failed = [0] * len(worker_urls)
+        self.rejected = 0
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(settings.WEBHOOK_PATH, self.handle_update)
+        app.router.add_get("/healthz", self.handle_health)
+        app.router.add_get("/readyz", self.handle_ready)
+        app.router.add_get("/metrics", self.handle_metrics)
+        return app
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode(), self.secret_token.encode()):
+            self.rejected += 1
+            return web.Response(status=403)
+        body = await request.read()
+        try:
+            update = json.loads(body)
+        except json.JSONDecodeError:
+            self.rejected += 1
+            return web.Response(status=400)
+
+        shard = shard_for(update_chat_id(update), len(self.worker_urls))
+        async with self._locks[shard]:
+            try:
+                async with self._session.post(
+                    self.worker_urls[shard] + settings.WEBHOOK_PATH, data=body,
+                    headers={SECRET_HEADER: self.secret_token, "Content-Type": "application/json"},
+                ) as response:
+                    status = response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Shard {shard} unreachable: {e}")
+                status = 503
+        if status != 200:
+            # A non-2xx answer makes Telegram redeliver the update later
+            self.failed[shard] += 1
+            return web.Response(status=502)
+        self.forwarded[shard] += 1
+        return web.Response()
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    async def handle_ready(self, request: web.Request) -> web.Response:
+        """Ready when every worker reports ready"""
+        results = await asyncio.gather(*(self._worker_ready(url) for url in self.worker_urls))
+        if not all(results):
+            down = [shard for shard, ready in enumerate(results) if not ready]
+            return web.Response(status=503, text=f"shards not ready: {down}")
+        return web.Response(text="ok")
+
+    async def _worker_ready(self, url: str) -> bool:
+        try:
+            async with self._session.get(url + "/readyz") as response:
+                return response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    async def start(self, host: str, port: int):
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=FORWARD_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit_per_host=settings.WEBHOOK_MAX_CONNECTIONS),
+        )
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Dispatcher listening on {host}:{port}{settings.WEBHOOK_PATH}, {len(self.worker_urls)} shards")
+
+    async def stop(self):
+        await self._runner.cleanup()
+        await self._session.close()
+
+    def stats(self) -> dict:
+        return {"forwarded": self.forwarded, "failed": self.failed, "rejected": self.rejected}
+
+
+class LocalWorkers:
+    """Spawns and restarts the local worker processes"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self._processes: List[Optional[subprocess.Popen]] = [None] * count
+        self.restarts = 0
+
+    @staticmethod
+    def url(index: int) -> str:
+        return f"http://127.0.0.1:{settings.SHARD_BASE_PORT + index}"
+
+    def _spawn(self, index: int) -> subprocess.Popen:
+        env = dict(
+            os.environ,
+            BOT_MODE="worker",
+            SHARD_INDEX=str(index),
+            SHARD_WORKERS=str(self.count),
+            WEBHOOK_LISTEN="127.0.0.1",
+            WEBHOOK_PORT=str(settings.SHARD_BASE_PORT + index),
+        )
+        return subprocess.Popen([sys.executable, os.path.abspath(sys.argv[0])], env=env)
+
+    def start(self):
+        for index in range(self.count):
+            self._processes[index] = self._spawn(index)
+
+    async def supervise(self):
+        while True:
+            await asyncio.sleep(SUPERVISE_INTERVAL)
+            for index, process in enumerate(self._processes):
+                if process.poll() is not None:
+                    logger.error(f"Shard {index} exited with {process.returncode}, restarting")
+                    self.restarts += 1
+                    self._processes[index] = self._spawn(index)
+
+    def stop(self):
+        for process in self._processes:
+            if process is not None and process.poll() is None:
+                process.terminate()
+        for process in self._processes:
+            if process is not None:
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+async def run_dispatcher():
+    """Serve the dispatcher (and supervise local workers) until SIGINT/SIGTERM"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    workers = None
+    worker_urls = [url.strip().rstrip("/") for url in settings.SHARD_WORKER_URLS.split(",") if url.strip()]
+    if not worker_urls:
+        workers = LocalWorkers(settings.SHARD_WORKERS)
+        workers.start()
+        worker_urls = [workers.url(index) for index in range(workers.count)]
+
+    dispatcher = ShardDispatcher(worker_urls, settings.webhook_secret)
+    await dispatcher.start(settings.WEBHOOK_LISTEN, settings.WEBHOOK_PORT)
+    supervisor = asyncio.create_task(workers.supervise()) if workers else None
+    try:
+        await stop.wait()
+    finally:
+        if supervisor is not None:
+            supervisor.cancel()
+        await dispatcher.stop()
+        if workers is not None:
+            workers.stop()
+        logger.info(f"Dispatcher: {dispatcher.stats()}")
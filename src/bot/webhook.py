@@ -0,0 +1,161 @@
+"""
+Webhook server for the Expense Tracker Bot
+
+In webhook mode Telegram pushes updates to an embedded aiohttp server instead
+of the bot long-polling getUpdates. The server:
+
+- accepts POST <WEBHOOK_PATH> only with the X-Telegram-Bot-Api-Secret-Token
+  header Telegram sends back (set via setWebhook), and hands the update to the
+  application's update queue without waiting for it to be processed;
+- answers GET /healthz (process is up and the application is running) and
+  GET /readyz (also checks the database) for load balancers and Docker;
+- serves GET /metrics, a JSON snapshot of the counters passed in ``metrics``.
+
+Both modes request only the update types the registered handlers can use,
+see allowed_updates_for().
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import signal
+from typing import Callable, Dict, List, Optional
+from aiohttp import web
+from sqlalchemy import text
+from telegram import Update
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, MessageHandler
+from config.settings import settings
+from src.database.connection import engine
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# Update types each handler class consumes. MessageHandler and CommandHandler
+# would also accept edited messages and channel posts, but the bot treats every
+# message as new input, so those are deliberately not requested.
+HANDLER_UPDATE_TYPES = {
+    CommandHandler: (Update.MESSAGE,),
+    MessageHandler: (Update.MESSAGE,),
+    CallbackQueryHandler: (Update.CALLBACK_QUERY,),
+}
+
+
+def allowed_updates_for(application: Application) -> List[str]:
+    """Update types the application's registered handlers consume"""
+    allowed = set()
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            for handler_type, update_types in HANDLER_UPDATE_TYPES.items():
+                if isinstance(handler, handler_type):
+                    allowed.update(update_types)
+                    break
+            else:
+                logger.warning(f"No update types known for {type(handler).__name__}; requesting all")
+                return list(Update.ALL_TYPES)
+    return sorted(allowed)
+
+
+class WebhookServer:
+    def __init__(self, application: Application, secret_token: str,
+                 metrics: Optional[Dict[str, Callable[[], dict]]] = None):
+        self.application = application
+        self.secret_token = secret_token
+        self.metrics = metrics or {}
+        self.received = 0
+        self.rejected = 0
+        self._runner = None
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(settings.WEBHOOK_PATH, self.handle_update)
+        app.router.add_get("/healthz", self.handle_health)
+        app.router.add_get("/readyz", self.handle_ready)
+        app.router.add_get("/metrics", self.handle_metrics)
+        return app
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode(), self.secret_token.encode()):
+            self.rejected += 1
+            return web.Response(status=403)
+        try:
+            update = Update.de_json(await request.json(), self.application.bot)
+        except (json.JSONDecodeError, TypeError, KeyError):
+            self.rejected += 1
+            return web.Response(status=400)
+        self.received += 1
+        # Acknowledge right away; handlers run from the update queue
+        await self.application.update_queue.put(update)
+        return web.Response()
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        if not self.application.running:
+            return web.Response(status=503, text="stopped")
+        return web.Response(text="ok")
+
+    async def handle_ready(self, request: web.Request) -> web.Response:
+        if not self.application.running:
+            return web.Response(status=503, text="stopped")
+        try:
+            await asyncio.to_thread(self._ping_database)
+        except Exception as e:
+            logger.warning(f"Readiness check failed: {e}")
+            return web.Response(status=503, text="database unavailable")
+        return web.Response(text="ok")
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        snapshot = {"webhook": self.stats()}
+        snapshot.update({name: collect() for name, collect in self.metrics.items()})
+        return web.json_response(snapshot)
+
+    @staticmethod
+    def _ping_database():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    async def start(self, host: str, port: int):
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Webhook server listening on {host}:{port}{settings.WEBHOOK_PATH}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def stats(self) -> dict:
+        return {"received": self.received, "rejected": self.rejected}
+
+
+async def run_webhook(application: Application, server: WebhookServer, allowed_updates: List[str],
+                      register: bool = True):
+    """Register the webhook (unless ``register`` is False), serve until SIGINT/SIGTERM, then shut down"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    async with application:
+        # run_polling/run_webhook call these hooks themselves; this lifecycle is ours
+        if application.post_init:
+            await application.post_init(application)
+        if register:
+            await application.bot.set_webhook(
+                url=settings.WEBHOOK_URL.rstrip("/") + settings.WEBHOOK_PATH,
+                allowed_updates=allowed_updates,
+                secret_token=server.secret_token,
+                max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+            )
+        await application.start()
+        await server.start(settings.WEBHOOK_LISTEN, settings.WEBHOOK_PORT)
+        try:
+            await stop.wait()
+        finally:
+            # The webhook stays registered: other replicas behind the load balancer keep serving it
+            await server.stop()
+            await application.stop()
+    if application.post_shutdown:
+        await application.post_shutdown(application)
@@ -11,11 +11,12 @@ def create_tables():
     from src.models.category import Category  # noqa: F401
     from src.models.transaction import Transaction  # noqa: F401
     from src.models.exchange_rates import ExchangeRate  # noqa: F401
+    from src.models.recurring import RecurringRule  # noqa: F401
     inspector = inspect(engine)
     existing = set(inspector.get_table_names(schema='public'))
     # Create tables one by one if missing
-    # Create in dependency-safe order: categories -> users -> transactions -> exchange_rates
-    tables = [Category.__table__, User.__table__, Transaction.__table__, ExchangeRate.__table__]
+    # Create in dependency-safe order: categories -> users -> transactions -> exchange_rates -> recurring_rules
+    tables = [Category.__table__, User.__table__, Transaction.__table__, ExchangeRate.__table__, RecurringRule.__table__]
     for table in tables:
         if table.name not in existing:
             try:
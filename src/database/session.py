@@ -1,8 +1,26 @@
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy.orm import scoped_session, sessionmaker
 from .connection import engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Updates are handled concurrently, so each one gets its own session: the
+# scope is set per update by update_session() and shared by everything the
+# update awaits. Code outside an update (jobs, scripts) shares the None scope.
+_update_scope: ContextVar = ContextVar("update_session_scope", default=None)
+update_db = scoped_session(SessionLocal, scopefunc=_update_scope.get)
+
 def get_session():
     """Get a database session"""
     return SessionLocal()
+
+@contextmanager
+def update_session():
+    """Give the update handled inside the block its own ``update_db`` session, closed at the end"""
+    token = _update_scope.set(object())
+    try:
+        yield
+    finally:
+        update_db.remove()
+        _update_scope.reset(token)
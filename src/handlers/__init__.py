@@ -3,5 +3,9 @@ from .user import UserHandler
 from .category import CategoryHandler
 from .transaction import TransactionHandler
 from .report import ReportHandler
+from .export import ExportHandler
+from .statement import StatementHandler
+from .recurring import RecurringHandler
+from .search import SearchHandler
 
-__all__ = ["BaseHandler", "UserHandler", "CategoryHandler", "TransactionHandler", "ReportHandler"]
+__all__ = ["BaseHandler", "UserHandler", "CategoryHandler", "TransactionHandler", "ReportHandler", "ExportHandler", "StatementHandler", "RecurringHandler", "SearchHandler"]
@@ -2,20 +2,23 @@ from abc import ABC, abstractmethod
 from telegram import Update
 from telegram.ext import ContextTypes
 from sqlalchemy.orm import Session
-from src.database.session import get_session
+from src.database.session import update_db
+from src.utils.render import message_renderer
 
 class BaseHandler(ABC):
-    def __init__(self):
-        self.db: Session = get_session()
-    
-    def __del__(self):
-        if hasattr(self, 'db'):
-            self.db.close()
+    @property
+    def db(self) -> Session:
+        """Session of the update being handled (see src/database/session.py)"""
+        return update_db()
     
     @abstractmethod
     async def handle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         pass
     
+    async def edit_message(self, update: Update, text: str, **kwargs) -> bool:
+        """Edit the callback's message, skipping the API call when nothing would change"""
+        return await message_renderer.edit(update.callback_query, text, **kwargs)
+    
     def get_user_from_update(self, update: Update):
         """Extract user information from Telegram update"""
         user = update.effective_user
@@ -5,6 +5,8 @@ from src.models.user import User
 from src.models.category import Category, CategoryType
 from src.models.transaction import Transaction
 from src.utils.translations import get_translation
+from src.utils.category_matcher import category_matchers, split_aliases
+from src.utils.recent_transactions import recent_transactions
 from .base import BaseHandler
 
 class CategoryHandler(BaseHandler):
@@ -51,7 +53,8 @@ class CategoryHandler(BaseHandler):
         if not menu_text.strip():
             menu_text = "🏷️ Category Management"
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             menu_text,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -79,7 +82,8 @@ class CategoryHandler(BaseHandler):
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("add_category_menu", language),
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -94,7 +98,8 @@ class CategoryHandler(BaseHandler):
         context.user_data['category_type'] = CategoryType.INCOME
         context.user_data['category_step'] = 'name_en'
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("enter_category_name_en", language),
             parse_mode='Markdown'
         )
@@ -109,7 +114,8 @@ class CategoryHandler(BaseHandler):
         context.user_data['category_type'] = CategoryType.EXPENSE
         context.user_data['category_step'] = 'name_en'
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("enter_category_name_en", language),
             parse_mode='Markdown'
         )
@@ -176,6 +182,7 @@ class CategoryHandler(BaseHandler):
         
         self.db.add(new_category)
         self.db.commit()
+        category_matchers.invalidate(user.id)
         
         # Clear user data
         context.user_data.pop('waiting_for_category_name', None)
@@ -193,6 +200,51 @@ class CategoryHandler(BaseHandler):
             f"{type_emoji} {success_message}\n\n{get_translation('use_start_to_return', language)}"
         )
     
+    async def handle_alias_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """/alias lists aliases; /alias <category> = <word>, <word> replaces a category's aliases"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+
+        if not user:
+            await update.message.reply_text(get_translation("user_not_found", "en"))
+            return
+
+        language = user.preferred_language if user else "en"
+        args = " ".join(context.args or [])
+
+        if "=" not in args:
+            categories = self.db.query(Category).filter(
+                Category.user_id == user.id,
+                Category.is_active == True,
+                Category.aliases.isnot(None),
+                Category.aliases != ""
+            ).order_by(Category.id).all()
+            message = f"🏷️ **{get_translation('aliases_title', language)}**\n\n"
+            for category in categories:
+                message += f"{category.icon} {category.get_name(language)}: {', '.join(split_aliases(category.aliases))}\n"
+            if not categories:
+                message += f"{get_translation('aliases_empty', language)}\n"
+            message += f"\n{get_translation('aliases_usage', language)}"
+            await update.message.reply_text(message, parse_mode='Markdown')
+            return
+
+        category_text, aliases_text = args.split("=", 1)
+        category_id = category_matchers.get(self.db, user.id).match(category_text)
+        category = self.db.get(Category, category_id) if category_id else None
+        if not category:
+            await update.message.reply_text(get_translation("category_not_found", language))
+            return
+
+        category.aliases = ", ".join(split_aliases(aliases_text)) or None
+        self.db.commit()
+        category_matchers.invalidate(user.id)
+
+        await update.message.reply_text(get_translation(
+            "aliases_updated", language,
+            category_name=category.get_name(language),
+            aliases=category.aliases or "—"
+        ))
+
     async def handle_view_categories(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle view categories"""
         user_data = self.get_context_from_update(update)
@@ -248,7 +300,8 @@ class CategoryHandler(BaseHandler):
         )]]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -272,7 +325,8 @@ class CategoryHandler(BaseHandler):
         ).all()
         
         if not categories:
-            await update.callback_query.edit_message_text(
+            await self.edit_message(
+                update,
                 get_translation("no_categories_found", language),
                 parse_mode='Markdown'
             )
@@ -295,7 +349,8 @@ class CategoryHandler(BaseHandler):
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("select_category_to_edit", language),
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -319,7 +374,8 @@ class CategoryHandler(BaseHandler):
         ).all()
         
         if not categories:
-            await update.callback_query.edit_message_text(
+            await self.edit_message(
+                update,
                 get_translation("no_categories_found", language),
                 parse_mode='Markdown'
             )
@@ -342,13 +398,14 @@ class CategoryHandler(BaseHandler):
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("select_category_to_delete", language),
             reply_markup=reply_markup,
             parse_mode='Markdown'
         )
     
-    async def handle_edit_specific_category(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_edit_specific_category(self, update: Update, context: ContextTypes.DEFAULT_TYPE, category_id: int):
         """Handle editing a specific category"""
         user_data = self.get_context_from_update(update)
         user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
@@ -359,10 +416,6 @@ class CategoryHandler(BaseHandler):
         
         language = user.preferred_language if user else "en"
         
-        # Extract category ID from callback data
-        callback_data = update.callback_query.data
-        category_id = int(callback_data.split("_")[-1])
-        
         # Get the category
         category = self.db.query(Category).filter(
             Category.id == category_id,
@@ -400,7 +453,8 @@ class CategoryHandler(BaseHandler):
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("edit_category_name", language).format(
                 category_name=localized_name
             ),
@@ -408,7 +462,7 @@ class CategoryHandler(BaseHandler):
             parse_mode='Markdown'
         )
     
-    async def handle_delete_specific_category(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_delete_specific_category(self, update: Update, context: ContextTypes.DEFAULT_TYPE, category_id: int):
         """Handle deleting a specific category"""
         user_data = self.get_context_from_update(update)
         user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
@@ -419,10 +473,6 @@ class CategoryHandler(BaseHandler):
         
         language = user.preferred_language if user else "en"
         
-        # Extract category ID from callback data
-        callback_data = update.callback_query.data
-        category_id = int(callback_data.split("_")[-1])
-        
         # Get the category
         category = self.db.query(Category).filter(
             Category.id == category_id,
@@ -439,7 +489,8 @@ class CategoryHandler(BaseHandler):
         ).count()
         
         if transaction_count > 0:
-            await update.callback_query.edit_message_text(
+            await self.edit_message(
+                update,
                 get_translation("cannot_delete_category_with_transactions", language).format(
                     category_name=category.get_name(language),
                     transaction_count=transaction_count
@@ -451,18 +502,18 @@ class CategoryHandler(BaseHandler):
         # Delete the category
         self.db.delete(category)
         self.db.commit()
+        category_matchers.invalidate(user.id)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("category_deleted", language).format(
                 category_name=category.get_name(language)
             ),
             parse_mode='Markdown'
         )
     
-    async def handle_edit_name_en(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_edit_name_en(self, update: Update, context: ContextTypes.DEFAULT_TYPE, category_id: int):
         """Handle editing English name of category"""
-        callback_data = update.callback_query.data
-        category_id = int(callback_data.split("_")[-1])
         
         context.user_data['waiting_for_category_edit'] = True
         context.user_data['edit_category_id'] = category_id
@@ -477,16 +528,15 @@ class CategoryHandler(BaseHandler):
             [InlineKeyboardButton(get_translation('back_to_main', language), callback_data="main_menu")]
         ]
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("enter_new_name_en", language),
             reply_markup=InlineKeyboardMarkup(keyboard),
             parse_mode='Markdown'
         )
     
-    async def handle_edit_name_ru(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_edit_name_ru(self, update: Update, context: ContextTypes.DEFAULT_TYPE, category_id: int):
         """Handle editing Russian name of category"""
-        callback_data = update.callback_query.data
-        category_id = int(callback_data.split("_")[-1])
         
         context.user_data['waiting_for_category_edit'] = True
         context.user_data['edit_category_id'] = category_id
@@ -501,16 +551,15 @@ class CategoryHandler(BaseHandler):
             [InlineKeyboardButton(get_translation('back_to_main', language), callback_data="main_menu")]
         ]
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("enter_new_name_ru", language),
             reply_markup=InlineKeyboardMarkup(keyboard),
             parse_mode='Markdown'
         )
     
-    async def handle_edit_icon(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_edit_icon(self, update: Update, context: ContextTypes.DEFAULT_TYPE, category_id: int):
         """Handle editing icon of category"""
-        callback_data = update.callback_query.data
-        category_id = int(callback_data.split("_")[-1])
         
         context.user_data['waiting_for_category_edit'] = True
         context.user_data['edit_category_id'] = category_id
@@ -525,16 +574,15 @@ class CategoryHandler(BaseHandler):
             [InlineKeyboardButton(get_translation('back_to_main', language), callback_data="main_menu")]
         ]
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("enter_new_icon", language),
             reply_markup=InlineKeyboardMarkup(keyboard),
             parse_mode='Markdown'
         )
     
-    async def handle_edit_color(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_edit_color(self, update: Update, context: ContextTypes.DEFAULT_TYPE, category_id: int):
         """Handle editing color of category"""
-        callback_data = update.callback_query.data
-        category_id = int(callback_data.split("_")[-1])
         
         context.user_data['waiting_for_category_edit'] = True
         context.user_data['edit_category_id'] = category_id
@@ -549,7 +597,8 @@ class CategoryHandler(BaseHandler):
             [InlineKeyboardButton(get_translation('back_to_main', language), callback_data="main_menu")]
         ]
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("enter_new_color", language),
             reply_markup=InlineKeyboardMarkup(keyboard),
             parse_mode='Markdown'
@@ -596,6 +645,8 @@ class CategoryHandler(BaseHandler):
             category.color = new_value
         
         self.db.commit()
+        category_matchers.invalidate(user.id)
+        recent_transactions.invalidate(user.telegram_id)
         
         # Clear the waiting state
         context.user_data.pop('waiting_for_category_edit', None)
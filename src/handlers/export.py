@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import BinaryIO, Optional
+from telegram import Update
+from telegram.ext import ContextTypes
+from src.models.user import User
+from src.database.session import get_session
+from src.utils.translations import get_translation
+from src.utils.file_cache import file_cache, make_cache_key
+from src.utils.export import (
+    EXPORT_PERIODS,
+    EXPORT_FORMATS,
+    MAX_UPLOAD_BYTES,
+    get_period_range,
+    get_export_fingerprint,
+    iter_transaction_rows,
+    build_export,
+    xlsx_available
+)
+from .base import BaseHandler
+
+logger = logging.getLogger(__name__)
+
+class ExportHandler(BaseHandler):
+    async def handle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Default handle method - not used in this handler"""
+        pass
+    
+    async def handle_export_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /export [period] [format] command"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+        
+        if not user:
+            await update.message.reply_text(get_translation("user_not_found", "en"))
+            return
+        
+        language = user.preferred_language if user else "en"
+        
+        args = [arg.lower() for arg in (context.args or [])]
+        period = next((arg for arg in args if arg in EXPORT_PERIODS), "month")
+        fmt = next((arg for arg in args if arg in EXPORT_FORMATS), "csv")
+        if any(arg not in EXPORT_PERIODS and arg not in EXPORT_FORMATS for arg in args):
+            await update.message.reply_text(get_translation("export_usage", language), parse_mode='Markdown')
+            return
+        
+        if fmt == "xlsx" and not xlsx_available():
+            await update.message.reply_text(get_translation("export_xlsx_unavailable", language))
+            return
+        
+        start, end = get_period_range(period)
+        fingerprint = get_export_fingerprint(self.db, user.id, start, end)
+        row_count = fingerprint[0]
+        if not row_count:
+            await update.message.reply_text(get_translation("no_transactions_in_period", language))
+            return
+        
+        key = make_cache_key("export", user.id, period, fmt, language, start, end, *fingerprint)
+        filename = f"transactions_{period}_{datetime.now().strftime('%Y%m%d')}.{fmt}"
+        caption = get_translation("export_caption", language, count=row_count, period=period)
+        
+        async def render():
+            return await asyncio.to_thread(self._render_export, user.id, start, end, language, fmt)
+        
+        sent = await file_cache.send_document(update.message, key, render, filename=filename, caption=caption)
+        if not sent:
+            await update.message.reply_text(get_translation("export_failed", language))
+    
+    def _render_export(self, user_id: int, start, end, language: str, fmt: str) -> Optional[BinaryIO]:
+        """Build the export file (runs in a worker thread with its own DB session)
+
+        Returns the spooled file rewound to its start; the file cache uploads
+        and closes it, so a large export is never copied into memory.
+        """
+        db = get_session()
+        try:
+            started = datetime.now()
+            spooled, count = build_export(iter_transaction_rows(db, user_id, start, end, language), fmt)
+        finally:
+            db.close()
+        
+        size = spooled.seek(0, 2)
+        elapsed = (datetime.now() - started).total_seconds()
+        logger.info(f"Export for user {user_id}: {count} rows, {size} bytes, {count / elapsed if elapsed else count:.0f} rows/s")
+        if size > MAX_UPLOAD_BYTES:
+            logger.warning(f"Export for user {user_id} is {size} bytes, above the Telegram upload limit")
+            spooled.close()
+            return None
+        # python-telegram-bot reads the name of a file it is given, which an in-memory spool lacks
+        spooled.rollover()
+        spooled.seek(0)
+        return spooled
@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes
+from src.models.user import User
+from src.models.category import Category
+from src.models.recurring import RecurringRule, RecurrenceFrequency
+from src.utils.translations import get_translation, get_currency_symbol
+from src.utils.batch_entry import AMOUNT_RE
+from src.utils.category_matcher import category_matchers
+from src.utils.recurring import materialize_in_session
+from src.utils.recent_transactions import recent_transactions
+from .base import BaseHandler
+
+FREQUENCY_WORDS = {
+    "daily": RecurrenceFrequency.DAILY, "ежедневно": RecurrenceFrequency.DAILY, "щодня": RecurrenceFrequency.DAILY,
+    "weekly": RecurrenceFrequency.WEEKLY, "еженедельно": RecurrenceFrequency.WEEKLY, "щотижня": RecurrenceFrequency.WEEKLY,
+    "monthly": RecurrenceFrequency.MONTHLY, "ежемесячно": RecurrenceFrequency.MONTHLY, "щомісяця": RecurrenceFrequency.MONTHLY,
+}
+WEEKDAY_WORDS = {
+    "mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6,
+    "пн": 0, "вт": 1, "ср": 2, "чт": 3, "пт": 4, "сб": 5, "вс": 6, "нд": 6,
+}
+
+class RecurringHandler(BaseHandler):
+    async def handle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Default handle method - not used in this handler"""
+        pass
+
+    async def handle_recurring_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """/recurring lists rules; /recurring <category> <amount> <daily|weekly [day]|monthly [day]> adds one"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+
+        if not user:
+            await update.message.reply_text(get_translation("user_not_found", "en"))
+            return
+
+        language = user.preferred_language if user else "en"
+
+        if context.args:
+            rule = self._parse_rule(user, [arg.lower() for arg in context.args])
+            if rule is None:
+                await update.message.reply_text(get_translation("recurring_usage", language), parse_mode='Markdown')
+                return
+            self.db.add(rule)
+            self.db.commit()
+            # Materialize this rule's due occurrences right away instead of waiting for tomorrow's job
+            await asyncio.to_thread(materialize_in_session, rule.id)
+            recent_transactions.invalidate(user.telegram_id)
+            await update.message.reply_text(
+                get_translation("recurring_added", language, rule=self._describe(rule, language))
+            )
+            return
+
+        message, reply_markup = self._render_rules(user, language)
+        await update.message.reply_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+
+    async def handle_delete_recurring(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_id: int):
+        """Deactivate a recurring rule (already created transactions are kept)"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+        if not user:
+            await update.callback_query.answer(get_translation("user_not_found", "en"))
+            return
+        language = user.preferred_language or "en"
+
+        rule = self.db.query(RecurringRule).filter(RecurringRule.id == rule_id, RecurringRule.user_id == user.id).first()
+        if rule:
+            rule.is_active = False
+            self.db.commit()
+
+        message, reply_markup = self._render_rules(user, language)
+        await self.edit_message(update, message, reply_markup=reply_markup, parse_mode='Markdown')
+
+    def _render_rules(self, user: User, language: str):
+        rules = self.db.query(RecurringRule).filter(
+            RecurringRule.user_id == user.id,
+            RecurringRule.is_active == True
+        ).order_by(RecurringRule.id).all()
+
+        message = f"🔁 **{get_translation('recurring_title', language)}**\n\n"
+        keyboard = []
+        if rules:
+            for rule in rules:
+                message += f"• {self._describe(rule, language)}\n"
+                keyboard.append([InlineKeyboardButton(
+                    f"🗑️ {rule.category.icon} {rule.category.get_name(language)} {rule.amount:,.2f}",
+                    callback_data=f"delete_recurring_{rule.id}"
+                )])
+            message += "\n"
+        else:
+            message += f"{get_translation('recurring_empty', language)}\n\n"
+        message += get_translation("recurring_usage", language)
+        return message, InlineKeyboardMarkup(keyboard) if keyboard else None
+
+    def _describe(self, rule: RecurringRule, language: str) -> str:
+        if rule.frequency == RecurrenceFrequency.WEEKLY:
+            schedule = get_translation("recurring_weekly", language, day=get_translation(f"weekday_{rule.day_of_week}", language))
+        elif rule.frequency == RecurrenceFrequency.MONTHLY:
+            schedule = get_translation("recurring_monthly", language, day=rule.day_of_month)
+        else:
+            schedule = get_translation("recurring_daily", language)
+        return f"{rule.category.icon} {rule.category.get_name(language)}: {get_currency_symbol(rule.currency)} {rule.amount:,.2f}, {schedule}"
+
+    def _parse_rule(self, user: User, args):
+        """Build an unsaved RecurringRule from command arguments, or None if they don't parse"""
+        amount = None
+        frequency = None
+        day = None
+        words = []
+        for token in args:
+            if amount is None and AMOUNT_RE.match(token):
+                amount = float(token.replace(",", "."))
+            elif frequency is None and token in FREQUENCY_WORDS:
+                frequency = FREQUENCY_WORDS[token]
+            elif frequency is not None and day is None and token[:3] in WEEKDAY_WORDS and frequency == RecurrenceFrequency.WEEKLY:
+                day = WEEKDAY_WORDS[token[:3]]
+            elif frequency == RecurrenceFrequency.MONTHLY and day is None and token.isdigit() and 1 <= int(token) <= 31:
+                day = int(token)
+            else:
+                words.append(token)
+        if not amount or amount <= 0 or frequency is None or not words:
+            return None
+
+        category_id = category_matchers.get(self.db, user.id).match(" ".join(words))
+        if category_id is None:
+            return None
+
+        today = datetime.now().date()
+        if frequency == RecurrenceFrequency.WEEKLY and day is None:
+            day = today.weekday()
+        if frequency == RecurrenceFrequency.MONTHLY and day is None:
+            day = today.day
+        rule = RecurringRule(
+            user_id=user.id,
+            category_id=category_id,
+            amount=amount,
+            currency=user.preferred_currency or "USD",
+            description=" ".join(args),
+            frequency=frequency,
+            day_of_week=day if frequency == RecurrenceFrequency.WEEKLY else None,
+            day_of_month=day if frequency == RecurrenceFrequency.MONTHLY else None,
+            start_date=today,
+            is_active=True
+        )
+        rule.category = self.db.query(Category).filter(Category.id == category_id).first()
+        return rule
@@ -1,12 +1,16 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, extract
+from sqlalchemy import func, desc, extract, case
 from datetime import datetime, timedelta
 from src.models.user import User
 from src.models.category import Category, CategoryType
 from src.models.transaction import Transaction
 from src.utils.translations import get_translation
+from src.utils.charts import chart_renderer, render_category_pie, render_income_expense_bars, render_balance_trend
+from src.utils.file_cache import file_cache, make_cache_key
+from src.utils.keyboards import get_reports_menu_keyboard
+from config.settings import settings
 from .base import BaseHandler
 
 class ReportHandler(BaseHandler):
@@ -25,43 +29,10 @@ class ReportHandler(BaseHandler):
         
         language = user.preferred_language if user else "en"
         
-        keyboard = [
-            [InlineKeyboardButton(
-                get_translation('balance', language), 
-                callback_data="balance_report"
-            )],
-            [InlineKeyboardButton(
-                get_translation('analytics', language), 
-                callback_data="analytics"
-            )],
-            [InlineKeyboardButton(
-                get_translation('weekly_report', language), 
-                callback_data="weekly_report"
-            )],
-            [InlineKeyboardButton(
-                get_translation('monthly_report', language), 
-                callback_data="monthly_report"
-            )],
-            [InlineKeyboardButton(
-                get_translation('yearly_report', language), 
-                callback_data="yearly_report"
-            )],
-            [InlineKeyboardButton(
-                get_translation('category_breakdown', language), 
-                callback_data="category_breakdown"
-            )],
-            [InlineKeyboardButton(
-                get_translation('custom_period', language), 
-                callback_data="custom_period"
-            )],
-            [InlineKeyboardButton(
-                get_translation('back_to_main', language), 
-                callback_data="main_menu"
-            )]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = get_reports_menu_keyboard(language)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("reports_menu", language),
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -123,9 +94,12 @@ class ReportHandler(BaseHandler):
             message += get_translation('no_transactions', language)
         
         keyboard = [[InlineKeyboardButton(get_translation('back_to_reports', language), callback_data='view_reports')]]
+        if settings.ENABLE_CHARTS:
+            keyboard.insert(0, [InlineKeyboardButton(get_translation('show_chart', language), callback_data='balance_chart')])
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -184,9 +158,12 @@ class ReportHandler(BaseHandler):
                 message += f"• {icon} {localized_name}: {user_currency} {total:,.2f} ({percentage:.1f}%)\n"
         
         keyboard = [[InlineKeyboardButton("🔙 Back", callback_data="view_reports")]]
+        if settings.ENABLE_CHARTS:
+            keyboard.insert(0, [InlineKeyboardButton(get_translation('show_chart', language), callback_data="monthly_chart")])
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -241,9 +218,12 @@ class ReportHandler(BaseHandler):
                 message += f"• {int(month_num):02d}: {user_currency} {total:,.2f}\n"
         
         keyboard = [[InlineKeyboardButton("🔙 Back", callback_data="view_reports")]]
+        if settings.ENABLE_CHARTS:
+            keyboard.insert(0, [InlineKeyboardButton(get_translation('show_chart', language), callback_data="yearly_chart")])
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -269,7 +249,8 @@ class ReportHandler(BaseHandler):
         ).group_by(Category.id, Category.name_en, Category.name_ru, Category.category_type, Category.icon).all()
         
         if not category_totals:
-            await update.callback_query.edit_message_text(
+            await self.edit_message(
+                update,
                 f"{get_translation('category_breakdown', language)}\n\n{get_translation('no_transactions', language)}",
                 reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton(get_translation('back_to_reports', language), callback_data="view_reports")]]),
                 parse_mode='Markdown'
@@ -298,7 +279,8 @@ class ReportHandler(BaseHandler):
         keyboard = [[InlineKeyboardButton(get_translation('back_to_reports', language), callback_data="view_reports")]]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -324,7 +306,8 @@ class ReportHandler(BaseHandler):
         )]]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -475,7 +458,8 @@ class ReportHandler(BaseHandler):
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -517,7 +501,8 @@ class ReportHandler(BaseHandler):
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
             
-            await update.callback_query.edit_message_text(
+            await self.edit_message(
+                update,
                 message,
                 reply_markup=reply_markup,
                 parse_mode='Markdown'
@@ -565,8 +550,254 @@ class ReportHandler(BaseHandler):
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
         )
+
+    async def handle_compare_report(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle period comparison menu"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+        
+        if not user:
+            await update.callback_query.answer(get_translation("user_not_found", "en"))
+            return
+        
+        language = user.preferred_language if user else "en"
+        
+        keyboard = [
+            [InlineKeyboardButton(get_translation('compare_month', language), callback_data="compare_month")],
+            [InlineKeyboardButton(get_translation('compare_year', language), callback_data="compare_year")],
+            [InlineKeyboardButton(get_translation('back_to_reports', language), callback_data="view_reports")]
+        ]
+        
+        await self.edit_message(
+            update,
+            get_translation("compare_periods", language),
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            parse_mode='Markdown'
+        )
+    
+    async def handle_compare_period(self, update: Update, context: ContextTypes.DEFAULT_TYPE, period: str):
+        """Compare this month/year with the previous one per category, biggest movers first"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+        
+        if not user:
+            await update.callback_query.answer(get_translation("user_not_found", "en"))
+            return
+        
+        language = user.preferred_language if user else "en"
+        user_currency = user.preferred_currency if user else "USD"
+        
+        now = datetime.now()
+        if period == "year":
+            current_start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+            previous_start = current_start.replace(year=current_start.year - 1)
+            current_label, previous_label = str(current_start.year), str(previous_start.year)
+        else:
+            current_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            previous_start = (current_start - timedelta(days=1)).replace(day=1)
+            current_label, previous_label = current_start.strftime("%Y-%m"), previous_start.strftime("%Y-%m")
+        
+        # One pass over both periods: each row lands in the current or previous bucket
+        is_current = Transaction.transaction_date >= current_start
+        rows = self.db.query(
+            Category.name_en,
+            Category.name_ru,
+            Category.icon,
+            Category.category_type,
+            func.sum(case((is_current, Transaction.amount), else_=0)).label('current'),
+            func.sum(case((is_current, 0), else_=Transaction.amount)).label('previous')
+        ).join(Transaction).filter(
+            Transaction.user_id == user.id,
+            Transaction.transaction_date >= previous_start
+        ).group_by(
+            Category.id, Category.name_en, Category.name_ru, Category.icon, Category.category_type
+        ).all()
+        
+        keyboard = [[InlineKeyboardButton(get_translation('back', language), callback_data="compare_report")]]
+        
+        if not rows:
+            await self.edit_message(
+                update,
+                get_translation("compare_no_data", language),
+                reply_markup=InlineKeyboardMarkup(keyboard),
+                parse_mode='Markdown'
+            )
+            return
+        
+        totals = {CategoryType.INCOME: [0.0, 0.0], CategoryType.EXPENSE: [0.0, 0.0]}
+        movers = []
+        for name_en, name_ru, icon, category_type, current, previous in rows:
+            current, previous = float(current or 0), float(previous or 0)
+            totals[category_type][0] += current
+            totals[category_type][1] += previous
+            if current != previous:
+                movers.append((abs(current - previous), icon, name_ru if language == "ru" else name_en, current, previous))
+        movers.sort(key=lambda m: m[0], reverse=True)
+        
+        message = f"**{get_translation('compare_title', language, current=current_label, previous=previous_label)}**\n\n"
+        for category_type, key in ((CategoryType.INCOME, 'total_income'), (CategoryType.EXPENSE, 'total_expense')):
+            current, previous = totals[category_type]
+            message += f"**{get_translation(key, language)}**: {user_currency} {current:,.2f} ({self._format_delta(current, previous, language)})\n"
+        
+        if movers:
+            message += f"\n📈 **{get_translation('biggest_movers', language)}:**\n"
+            for _, icon, name, current, previous in movers[:10]:
+                message += f"• {icon} {name}: {previous:,.2f} → {current:,.2f} ({self._format_delta(current, previous, language)})\n"
+        
+        await self.edit_message(
+            update,
+            message,
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            parse_mode='Markdown'
+        )
+    
+    @staticmethod
+    def _format_delta(current: float, previous: float, language: str) -> str:
+        """Absolute and percentage change, e.g. +120.00, +15.0%"""
+        delta = current - previous
+        if previous:
+            return f"{delta:+,.2f}, {delta / previous * 100:+.1f}%"
+        return f"{delta:+,.2f}, {get_translation('compare_new', language)}" if delta else "0.00"
+    
+    async def _send_chart(self, update: Update, user_id: int, caption: str, language: str, func, *args):
+        """Reply with a chart, reusing a cached upload when the same data was drawn before"""
+        key = make_cache_key(func.__name__, *args)
+        sent = await file_cache.send_photo(
+            update.callback_query.message,
+            key,
+            lambda: chart_renderer.render(user_id, func, *args),
+            caption=caption
+        )
+        if not sent:
+            await update.callback_query.message.reply_text(get_translation("chart_unavailable", language))
+    
+    async def handle_monthly_chart(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Send current month expenses by category as a pie chart"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+        
+        if not user:
+            await update.callback_query.answer(get_translation("user_not_found", "en"))
+            return
+        
+        language = user.preferred_language if user else "en"
+        
+        now = datetime.now()
+        start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        
+        rows = self.db.query(
+            Category.name_en,
+            Category.name_ru,
+            Category.color,
+            func.sum(Transaction.amount).label('total')
+        ).join(Transaction).filter(
+            Transaction.user_id == user.id,
+            Category.category_type == CategoryType.EXPENSE,
+            Transaction.transaction_date >= start_of_month
+        ).group_by(Category.id, Category.name_en, Category.name_ru, Category.color).order_by(desc('total')).all()
+        
+        if not rows:
+            await update.callback_query.message.reply_text(get_translation("chart_no_data", language))
+            return
+        
+        labels = [name_ru if language == "ru" else name_en for name_en, name_ru, _, _ in rows]
+        values = [float(total) for _, _, _, total in rows]
+        colors = [color or "#3498db" for _, _, color, _ in rows]
+        title = get_translation("category_pie_title", language, period=now.strftime("%Y-%m"))
+        
+        await self._send_chart(update, user.id, title, language, render_category_pie, labels, values, colors, title)
+    
+    async def handle_yearly_chart(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Send current year income vs expenses per month as a bar chart"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+        
+        if not user:
+            await update.callback_query.answer(get_translation("user_not_found", "en"))
+            return
+        
+        language = user.preferred_language if user else "en"
+        
+        now = datetime.now()
+        start_of_year = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        month_expr = extract('month', Transaction.transaction_date)
+        
+        rows = self.db.query(
+            month_expr.label('month'),
+            Category.category_type,
+            func.sum(Transaction.amount).label('total')
+        ).join(Category).filter(
+            Transaction.user_id == user.id,
+            Transaction.transaction_date >= start_of_year
+        ).group_by(month_expr, Category.category_type).all()
+        
+        if not rows:
+            await update.callback_query.message.reply_text(get_translation("chart_no_data", language))
+            return
+        
+        income = [0.0] * now.month
+        expenses = [0.0] * now.month
+        for month_num, category_type, total in rows:
+            index = int(month_num) - 1
+            if index >= now.month:
+                continue
+            if category_type == CategoryType.INCOME:
+                income[index] += float(total)
+            else:
+                expenses[index] += float(total)
+        months = [f"{m:02d}" for m in range(1, now.month + 1)]
+        title = get_translation("income_vs_expense_title", language, year=now.year)
+        
+        await self._send_chart(
+            update, user.id, title, language, render_income_expense_bars, months, income, expenses, title,
+            get_translation('income', language), get_translation('expense', language)
+        )
+    
+    async def handle_balance_chart(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Send the running balance per month as a line chart"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+        
+        if not user:
+            await update.callback_query.answer(get_translation("user_not_found", "en"))
+            return
+        
+        language = user.preferred_language if user else "en"
+        user_currency = user.preferred_currency if user else "USD"
+        
+        # Same scope as the balance report: all time, in the user's currency
+        month_bucket = func.date_trunc('month', Transaction.transaction_date)
+        rows = self.db.query(
+            month_bucket.label('month'),
+            Category.category_type,
+            func.sum(Transaction.amount).label('total')
+        ).join(Category).filter(
+            Transaction.user_id == user.id,
+            Transaction.currency == user_currency
+        ).group_by(month_bucket, Category.category_type).order_by(month_bucket).all()
+        
+        if not rows:
+            await update.callback_query.message.reply_text(get_translation("chart_no_data", language))
+            return
+        
+        net_by_month = {}
+        for month, category_type, total in rows:
+            key = month.strftime("%Y-%m")
+            sign = 1 if category_type == CategoryType.INCOME else -1
+            net_by_month[key] = net_by_month.get(key, 0.0) + sign * float(total)
+        
+        periods = sorted(net_by_month)
+        balances = []
+        running = 0.0
+        for period in periods:
+            running += net_by_month[period]
+            balances.append(running)
+        title = get_translation("balance_trend_title", language, currency=user_currency)
+        
+        await self._send_chart(update, user.id, title, language, render_balance_trend, periods, balances, title)
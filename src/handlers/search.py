@@ -0,0 +1,111 @@
+import hashlib
+from typing import Tuple
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes
+from src.models.user import User
+from src.utils.translations import get_translation, get_currency_symbol
+from src.utils.search import search_transactions, SEARCH_PAGE_SIZE
+from .base import BaseHandler
+
+SNIPPET_LENGTH = 60
+# Recent queries remembered per user for "more" buttons, keyed by query_key()
+MAX_REMEMBERED_QUERIES = 20
+
+
+def query_key(query: str) -> str:
+    """Short hash of a query, small enough for callback data"""
+    return hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+
+
+def parse_search_cursor(value: str) -> Tuple[str, float, int, int]:
+    """Parse the "{query_key}_{rank}_{id}_{offset}" tail of search_more_ callback data"""
+    key, rank, transaction_id, offset = value.split("_")
+    return key, float(rank), int(transaction_id), int(offset)
+
+
+class SearchHandler(BaseHandler):
+    async def handle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Default handle method - not used in this handler"""
+        pass
+
+    async def handle_search_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """/search <text> - find transactions by description"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+
+        if not user:
+            await update.message.reply_text(get_translation("user_not_found", "en"))
+            return
+
+        language = user.preferred_language if user else "en"
+        query = " ".join(context.args or []).strip()
+        if not query:
+            await update.message.reply_text(get_translation("search_usage", language), parse_mode='Markdown')
+            return
+
+        # A "more" button from an older result message must page through its own query
+        queries = context.user_data.setdefault('search_queries', {})
+        queries.pop(query_key(query), None)
+        queries[query_key(query)] = query
+        while len(queries) > MAX_REMEMBERED_QUERIES:
+            queries.pop(next(iter(queries)))
+        message, reply_markup = self._render_page(user, language, query, None, 0)
+        await update.message.reply_text(message, reply_markup=reply_markup)
+
+    async def handle_search_more(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                                 cursor: Tuple[str, float, int, int]):
+        """Next page of results; ``cursor`` is (query key, rank, id, offset) from search_more_{key}_{rank}_{id}_{offset}"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+        if not user:
+            await update.callback_query.answer(get_translation("user_not_found", "en"))
+            return
+        language = user.preferred_language or "en"
+
+        key, rank, transaction_id, offset = cursor
+        query = context.user_data.get('search_queries', {}).get(key)
+        if not query:
+            await self.edit_message(update, get_translation("search_usage", language), parse_mode='Markdown')
+            return
+
+        message, reply_markup = self._render_page(user, language, query, (rank, transaction_id), offset)
+        await self.edit_message(update, message, reply_markup=reply_markup)
+
+    def _render_page(self, user: User, language: str, query: str, after, offset: int):
+        transactions, next_cursor = search_transactions(self.db, user.id, query, after=after)
+
+        message = f"🔍 {get_translation('search_results', language, query=query)}\n\n"
+        if not transactions:
+            message += get_translation("search_no_results", language)
+
+        keyboard = []
+        for number, transaction in enumerate(transactions, start=offset + 1):
+            date_str = transaction.transaction_date.strftime("%d.%m.%Y")
+            currency = get_currency_symbol(transaction.currency)
+            category_name = transaction.category.get_name(language)
+            description = transaction.description or ""
+            if len(description) > SNIPPET_LENGTH:
+                description = description[:SNIPPET_LENGTH - 1] + "…"
+            message += f"{number}. {date_str} {currency} {transaction.amount} - {category_name}\n"
+            if description:
+                message += f"    {description}\n"
+
+            button_text = f"{number:2d}. {date_str} - {currency} {transaction.amount} - {category_name}"
+            if len(button_text) > 50:  # Telegram button text limit
+                button_text = f"{number:2d}. {date_str} - {currency} {transaction.amount}"
+            keyboard.append([InlineKeyboardButton(
+                button_text,
+                callback_data=f"manage_transaction_{transaction.id}"
+            )])
+
+        if next_cursor:
+            rank, last_id = next_cursor
+            keyboard.append([InlineKeyboardButton(
+                "➡️",
+                callback_data=f"search_more_{query_key(query)}_{rank!r}_{last_id}_{offset + SEARCH_PAGE_SIZE}"
+            )])
+        keyboard.append([InlineKeyboardButton(
+            get_translation("back_to_main", language),
+            callback_data="main_menu"
+        )])
+        return message, InlineKeyboardMarkup(keyboard)
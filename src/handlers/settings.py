@@ -9,6 +9,8 @@ from src.utils.translations import (
     SUPPORTED_CURRENCIES,
     get_currency_symbol
 )
+from src.utils.keyboards import get_settings_menu_keyboard
+from src.utils.recent_transactions import recent_transactions
 from .base import BaseHandler
 
 class SettingsHandler(BaseHandler):
@@ -27,35 +29,14 @@ class SettingsHandler(BaseHandler):
         
         language = user.preferred_language if user else "en"
         
-        keyboard = [
-            [InlineKeyboardButton(
-                get_translation("language_settings", language),
-                callback_data="language_settings"
-            )],
-            [InlineKeyboardButton(
-                get_translation("currency_settings", language),
-                callback_data="currency_settings"
-            )],
-            [InlineKeyboardButton(
-                get_translation("manage_categories", language),
-                callback_data="manage_categories"
-            )],
-            [InlineKeyboardButton(
-                get_translation("balance_settings", language),
-                callback_data="balance_settings"
-            )],
-            [InlineKeyboardButton(
-                get_translation("back_to_main", language),
-                callback_data="main_menu"
-            )]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = get_settings_menu_keyboard(language)
         
         menu_text = get_translation("settings_menu", language)
         if not menu_text.strip():
             menu_text = "⚙️ Settings"
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             menu_text,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -88,16 +69,15 @@ class SettingsHandler(BaseHandler):
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("select_language", current_language),
             reply_markup=reply_markup,
             parse_mode='Markdown'
         )
     
-    async def handle_set_language(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_set_language(self, update: Update, context: ContextTypes.DEFAULT_TYPE, language_code: str):
         """Handle language selection"""
-        callback_data = update.callback_query.data
-        language_code = callback_data.split("_")[-1]
         
         user_data = self.get_context_from_update(update)
         user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
@@ -109,6 +89,7 @@ class SettingsHandler(BaseHandler):
         # Update user's preferred language
         user.preferred_language = language_code
         self.db.commit()
+        recent_transactions.invalidate(user.telegram_id)
         
         language_name = SUPPORTED_LANGUAGES.get(language_code, language_code)
         
@@ -147,7 +128,8 @@ class SettingsHandler(BaseHandler):
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("select_currency", current_language),
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -174,15 +156,14 @@ class SettingsHandler(BaseHandler):
                 callback_data=f"set_primary_income_{c.id}"
             )])
         keyboard.append([InlineKeyboardButton(get_translation("back", language), callback_data="settings")])
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("select_primary_income_category", language),
             reply_markup=InlineKeyboardMarkup(keyboard),
             parse_mode='Markdown'
         )
 
-    async def handle_set_primary_income(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        callback_data = update.callback_query.data
-        category_id = int(callback_data.split("_")[-1])
+    async def handle_set_primary_income(self, update: Update, context: ContextTypes.DEFAULT_TYPE, category_id: int):
         user_data = self.get_context_from_update(update)
         user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
         if not user:
@@ -192,10 +173,48 @@ class SettingsHandler(BaseHandler):
         self.db.commit()
         await self.handle_balance_settings(update, context)
     
-    async def handle_set_currency(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_digest_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Opt in or out of the scheduled weekly/monthly digests"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+        if not user:
+            await update.callback_query.answer(get_translation("user_not_found", "en"))
+            return
+        language = user.preferred_language or "en"
+        keyboard = [
+            [InlineKeyboardButton(
+                f"{'✅' if user.digest_weekly else '⚪'} {get_translation('digest_weekly', language)}",
+                callback_data="toggle_digest_weekly"
+            )],
+            [InlineKeyboardButton(
+                f"{'✅' if user.digest_monthly else '⚪'} {get_translation('digest_monthly', language)}",
+                callback_data="toggle_digest_monthly"
+            )],
+            [InlineKeyboardButton(get_translation("back", language), callback_data="settings")]
+        ]
+        await self.edit_message(
+            update,
+            get_translation("digest_settings_text", language),
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            parse_mode='Markdown'
+        )
+
+    async def handle_toggle_digest(self, update: Update, context: ContextTypes.DEFAULT_TYPE, kind: str):
+        """Toggle the weekly or monthly digest subscription"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+        if not user:
+            await update.callback_query.answer(get_translation("user_not_found", "en"))
+            return
+        if kind == "weekly":
+            user.digest_weekly = not user.digest_weekly
+        else:
+            user.digest_monthly = not user.digest_monthly
+        self.db.commit()
+        await self.handle_digest_settings(update, context)
+    
+    async def handle_set_currency(self, update: Update, context: ContextTypes.DEFAULT_TYPE, currency_code: str):
         """Handle currency selection"""
-        callback_data = update.callback_query.data
-        currency_code = callback_data.split("_")[-1]
         
         user_data = self.get_context_from_update(update)
         user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
@@ -207,6 +226,7 @@ class SettingsHandler(BaseHandler):
         # Update user's preferred currency
         user.preferred_currency = currency_code
         self.db.commit()
+        recent_transactions.invalidate(user.telegram_id)
         
         currency_info = SUPPORTED_CURRENCIES.get(currency_code, {})
         currency_name = currency_info.get("name", currency_code)
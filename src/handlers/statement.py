@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+import tempfile
+from datetime import datetime
+from telegram import Update
+from telegram.ext import ContextTypes
+from telegram.error import TelegramError
+from src.models.user import User
+from src.models.category import Category
+from src.database.session import get_session
+from src.utils.translations import get_translation
+from src.utils.category_matcher import CategoryMatcher, category_matchers
+from src.utils.recent_transactions import recent_transactions
+from src.utils.statement_import import IMPORT_FORMATS, MAX_IMPORT_BYTES, ImportResult, import_statement
+from .base import BaseHandler
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL = 1.5  # seconds between status message edits
+
+class StatementHandler(BaseHandler):
+    async def handle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Default handle method - not used in this handler"""
+        pass
+
+    async def handle_document(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Import a CSV/OFX bank statement sent as a document"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+
+        if not user:
+            await update.message.reply_text(get_translation("user_not_found", "en"))
+            return
+
+        language = user.preferred_language if user else "en"
+        document = update.message.document
+        fmt = os.path.splitext(document.file_name or "")[1].lstrip(".").lower()
+        if fmt not in IMPORT_FORMATS:
+            await update.message.reply_text(get_translation("import_unsupported", language))
+            return
+        if document.file_size and document.file_size > MAX_IMPORT_BYTES:
+            await update.message.reply_text(get_translation("import_too_large", language))
+            return
+
+        categories = [
+            (c.id, c.name_en, c.name_ru, c.category_type)
+            for c in self.db.query(Category).filter(Category.user_id == user.id, Category.is_active == True).all()
+        ]
+        # Built on the event loop; matching itself is read-only and safe in the worker thread
+        matcher = category_matchers.get(self.db, user.id)
+        status = await update.message.reply_text(get_translation("import_started", language))
+
+        fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+        os.close(fd)
+        task = None
+        try:
+            tg_file = await context.bot.get_file(document.file_id)
+            await tg_file.download_to_drive(path)
+
+            progress = {"stage": "parsing", "rows": 0}
+            task = asyncio.create_task(asyncio.to_thread(
+                self._run_import, path, fmt, user.id, user.preferred_currency or "USD", categories, matcher, progress
+            ))
+            last_text = None
+            while not task.done():
+                await asyncio.wait({task}, timeout=PROGRESS_INTERVAL)
+                if task.done() or progress["stage"] == "done":
+                    break
+                text = get_translation(f"import_{progress['stage']}", language, rows=progress["rows"])
+                if text != last_text:
+                    # Progress is cosmetic: a failed edit must not abandon the running import
+                    try:
+                        await status.edit_text(text)
+                    except TelegramError as e:
+                        logger.warning(f"Import progress update failed for user {user.id}: {e}")
+                    last_text = text
+            result: ImportResult = await task
+        except Exception as e:
+            logger.error(f"Statement import failed for user {user.id}: {e}")
+            await status.edit_text(get_translation("import_failed", language))
+            return
+        finally:
+            if task is not None and not task.done():
+                # Cancelled while the worker thread still reads the file: let it finish first
+                await asyncio.wait({task})
+            os.unlink(path)
+        recent_transactions.invalidate(user.telegram_id)
+
+        await status.edit_text(get_translation(
+            "import_done", language,
+            inserted=result.inserted, duplicates=result.duplicates,
+            probable_duplicates=result.probable_duplicates, skipped=result.skipped
+        ))
+
+    def _run_import(self, path: str, fmt: str, user_id: int, currency: str, categories, matcher: CategoryMatcher,
+                    progress: dict) -> ImportResult:
+        """Parse and merge the statement (runs in a worker thread with its own DB session)"""
+        db = get_session()
+        try:
+            started = datetime.now()
+            result = import_statement(db, path, fmt, user_id, currency, categories, matcher, progress)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        elapsed = (datetime.now() - started).total_seconds()
+        logger.info(f"Statement import for user {user_id}: {result} in {elapsed:.2f}s")
+        return result
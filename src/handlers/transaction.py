@@ -1,13 +1,19 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, desc, insert
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
 from src.models.user import User
 from src.models.category import Category, CategoryType
 from src.models.transaction import Transaction
 from src.utils.translations import get_translation, get_currency_symbol, SUPPORTED_CURRENCIES
-from src.utils.keyboards import get_amount_keyboard
+from src.utils.keyboards import get_amount_keyboard, get_date_keyboard
+from src.utils.batch_entry import parse_batch
+from src.utils.category_matcher import category_matchers
+from src.utils.recent_transactions import recent_transactions, BUFFER_SIZE
+from src.utils.dedup import DEDUP_CONSTRAINT, recent_writes, transaction_fingerprint
+from src.utils.invalidation import TRANSACTION, notify_changed
 from .base import BaseHandler
 from datetime import datetime, date
 from typing import Optional
@@ -44,7 +50,8 @@ class TransactionHandler(BaseHandler):
         if not menu_text.strip():
             menu_text = "💰 Add Transaction"
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             menu_text,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -58,18 +65,10 @@ class TransactionHandler(BaseHandler):
         user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
         if not user:
             return None
-        language = user.preferred_language if user else "en"
-        text_norm = text.lower()
-        categories = self.db.query(Category).filter(
-            Category.user_id == user.id,
-            Category.category_type == CategoryType.EXPENSE,
-            Category.is_active == True
-        ).all()
-        for category in categories:
-            name = category.get_name(language).lower()
-            if name and name in text_norm:
-                return category
-        return None
+        category_id = category_matchers.get(self.db, user.id).match(text, CategoryType.EXPENSE.value)
+        if category_id is None:
+            return None
+        return self.db.get(Category, category_id)
 
     async def start_expense_with_category_id(self, update: Update, context: ContextTypes.DEFAULT_TYPE, category_id: int):
         """Start expense add flow directly with a selected category (message context)."""
@@ -101,41 +100,16 @@ class TransactionHandler(BaseHandler):
             context.user_data['selected_date'] = selected_date
             context.user_data['waiting_for_amount'] = True
 
-            amount_display = context.user_data.get('amount_buffer', '') or '0'
-            header_key = 'add_income' if category.category_type == CategoryType.INCOME else 'add_expense'
-            amount_keyboard = get_amount_keyboard(language)
+            header = self._amount_header(category, language, currency_code, selected_date)
             await update.message.reply_text(
-                f"{get_translation(header_key, language)}\n\n"
-                f"{get_translation('category', language)}: {category.icon} {category.get_name(language)}\n"
-                f"{get_translation('date', language)}: {selected_date.strftime('%d.%m.%Y')}\n\n"
-                f"{get_translation('amount', language)}: **{amount_display}**",
+                self._begin_amount_step(context, header, language),
                 parse_mode='Markdown',
-                reply_markup=amount_keyboard
+                reply_markup=get_amount_keyboard(language)
             )
             return
 
         # Otherwise show date selection keyboard
-        today = datetime.now().date()
-        yesterday = today - timedelta(days=1)
-        keyboard = [
-            [InlineKeyboardButton(
-                f"📅 {get_translation('today', language)} ({today.strftime('%d.%m.%Y')})",
-                callback_data="select_date_today"
-            )],
-            [InlineKeyboardButton(
-                f"📅 {get_translation('yesterday', language)} ({yesterday.strftime('%d.%m.%Y')})",
-                callback_data="select_date_yesterday"
-            )],
-            [InlineKeyboardButton(
-                get_translation('custom_date', language),
-                callback_data="select_date_custom"
-            )],
-            [InlineKeyboardButton(
-                get_translation('back_to_main', language),
-                callback_data="main_menu"
-            )]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = get_date_keyboard(language)
 
         header_key = 'add_income' if category.category_type == CategoryType.INCOME else 'add_expense'
         await update.message.reply_text(
@@ -172,8 +146,13 @@ class TransactionHandler(BaseHandler):
             description=description or "",
             transaction_date=datetime.combine(selected_date, datetime.now().time())
         )
-        self.db.add(transaction)
-        self.db.commit()
+        if not self._insert_once(transaction):
+            # Same voice note delivered twice
+            await update.message.reply_text(get_translation("duplicate_transaction", language))
+            for key in ['voice_description', 'amount_buffer', 'amount_header', 'amount_language', 'selected_date', 'selected_currency', 'selected_category_id', 'waiting_for_amount', 'waiting_for_custom_date']:
+                context.user_data.pop(key, None)
+            return
+        recent_transactions.put(user.telegram_id, transaction, category)
 
         from src.utils.translations import get_currency_symbol
         currency_symbol = get_currency_symbol(currency_code)
@@ -185,9 +164,62 @@ class TransactionHandler(BaseHandler):
         await update.message.reply_text(confirmation, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
 
         # Cleanup any temp state
-        for key in ['voice_description', 'amount_buffer', 'selected_date', 'selected_currency', 'selected_category_id', 'waiting_for_amount', 'waiting_for_custom_date']:
+        for key in ['voice_description', 'amount_buffer', 'amount_header', 'amount_language', 'selected_date', 'selected_currency', 'selected_category_id', 'waiting_for_amount', 'waiting_for_custom_date']:
             context.user_data.pop(key, None)
     
+    async def handle_batch_text(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
+        """Add one transaction per "<category> <amount> [date]" line; returns False if no line parsed"""
+        user_data = self.get_context_from_update(update)
+        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+        if not user:
+            return False
+
+        parsed, unparsed = parse_batch(update.message.text or "", category_matchers.get(self.db, user.id))
+        # Nothing parsed: ordinary chatter, not a batch
+        if not parsed:
+            return False
+        by_id = {c.id: c for c in self.db.query(Category).filter(
+            Category.id.in_({row.category_id for row in parsed})
+        ).all()}
+
+        language = user.preferred_language or "en"
+        currency_code = user.preferred_currency or "USD"
+        now_time = datetime.now().time()
+
+        # Single multi-row INSERT and a single commit for the whole message
+        self.db.execute(insert(Transaction).values([
+            {
+                "amount": row.amount,
+                "currency": currency_code,
+                "description": row.line,
+                "transaction_date": datetime.combine(row.selected_date, now_time),
+                "user_id": user.id,
+                "category_id": row.category_id
+            }
+            for row in parsed
+        ]))
+        # A Core insert bypasses the ORM flush that announces changes to other replicas
+        notify_changed(self.db, user.id, TRANSACTION)
+        self.db.commit()
+        recent_transactions.invalidate(user.telegram_id)
+
+        currency_symbol = get_currency_symbol(currency_code)
+        message = get_translation("batch_added", language, count=len(parsed)) + "\n\n"
+        for row in parsed:
+            category = by_id[row.category_id]
+            type_emoji = "💰" if category.category_type == CategoryType.INCOME else "💸"
+            message += (
+                f"{type_emoji} {category.icon} {category.get_name(language)}: "
+                f"{currency_symbol} {row.amount:,.2f} ({row.selected_date.strftime('%d.%m.%Y')})\n"
+            )
+        if unparsed:
+            message += f"\n{get_translation('batch_unparsed', language)}\n"
+            message += "\n".join(f"• {line}" for line in unparsed)
+
+        keyboard = [[InlineKeyboardButton(get_translation('back_to_main', language), callback_data="main_menu")]]
+        await update.message.reply_text(message, reply_markup=InlineKeyboardMarkup(keyboard))
+        return True
+    
     async def handle_add_income(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle add income transaction"""
         user_data = self.get_context_from_update(update)
@@ -203,7 +235,8 @@ class TransactionHandler(BaseHandler):
         ).all()
         
         if not categories:
-            await update.callback_query.edit_message_text(
+            await self.edit_message(
+                update,
                 "❌ No income categories found. Please create some categories first.",
                 reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="add_transaction")]])
             )
@@ -250,7 +283,8 @@ class TransactionHandler(BaseHandler):
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             "💰 **Add Income**\n\nSelect a category:",
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -271,7 +305,8 @@ class TransactionHandler(BaseHandler):
         ).all()
         
         if not categories:
-            await update.callback_query.edit_message_text(
+            await self.edit_message(
+                update,
                 "❌ No expense categories found. Please create some categories first.",
                 reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="add_transaction")]])
             )
@@ -318,16 +353,15 @@ class TransactionHandler(BaseHandler):
                 parse_mode='Markdown'
             )
         else:
-            await update.callback_query.edit_message_text(
+            await self.edit_message(
+                update,
                 get_translation("select_category_for_expense", language),
                 reply_markup=reply_markup,
                 parse_mode='Markdown'
             )
     
-    async def handle_select_category(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_select_category(self, update: Update, context: ContextTypes.DEFAULT_TYPE, category_id: int):
         """Handle category selection for transaction"""
-        callback_data = update.callback_query.data
-        category_id = int(callback_data.split("_")[-1])
         
         category = self.db.query(Category).filter(Category.id == category_id).first()
         if not category:
@@ -354,49 +388,17 @@ class TransactionHandler(BaseHandler):
             context.user_data['selected_date'] = selected_date
             context.user_data['waiting_for_amount'] = True
 
-            amount_keyboard = get_amount_keyboard(language)
-
-            header_key = 'add_income' if category.category_type == CategoryType.INCOME else 'add_expense'
-            currency_info = SUPPORTED_CURRENCIES.get(currency_code, {})
-            currency_symbol = currency_info.get('symbol', currency_code)
-            amount_display = context.user_data.get('amount_buffer', '') or '0'
-
-            await update.callback_query.edit_message_text(
-                f"{get_translation(header_key, language)}\n\n"
-                f"{get_translation('category', language)}: {category.icon} {category.get_name(language)}\n"
-                f"Currency: {currency_symbol} {currency_code}\n"
-                f"Date: {selected_date.strftime('%d.%m.%Y')}\n\n"
-                f"{get_translation('amount', language)}: **{amount_display}**\n\n"
-                f"Use the keyboard below to enter amount:",
+            header = self._amount_header(category, language, currency_code, selected_date)
+            await self.edit_message(
+                update,
+                self._begin_amount_step(context, header, language),
                 parse_mode='Markdown',
-                reply_markup=amount_keyboard
+                reply_markup=get_amount_keyboard(language)
             )
             return
 
         # Show date selection directly (no currency selection during add flow)
-        today = datetime.now().date()
-        yesterday = today - timedelta(days=1)
-        
-        keyboard = [
-            [InlineKeyboardButton(
-                f"📅 {get_translation('today', language)} ({today.strftime('%d.%m.%Y')})",
-                callback_data="select_date_today"
-            )],
-            [InlineKeyboardButton(
-                f"📅 {get_translation('yesterday', language)} ({yesterday.strftime('%d.%m.%Y')})",
-                callback_data="select_date_yesterday"
-            )],
-            [InlineKeyboardButton(
-                get_translation('custom_date', language),
-                callback_data="select_date_custom"
-            )],
-            [InlineKeyboardButton(
-                get_translation('back_to_main', language),
-                callback_data="main_menu"
-            )]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = get_date_keyboard(language)
         
         header_key = 'add_income' if category.category_type == CategoryType.INCOME else 'add_expense'
         currency_info = SUPPORTED_CURRENCIES.get(currency_code, {})
@@ -406,7 +408,8 @@ class TransactionHandler(BaseHandler):
         if context.user_data.get('voice_amount') and not context.user_data.get('amount_buffer'):
             context.user_data['amount_buffer'] = context.user_data['voice_amount']
 
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             f"{get_translation(header_key, language)}\n\n"
             f"{get_translation('category', language)}: {category.icon} {category.get_name(language)}\n"
             f"{get_translation('select_date', language)}:",
@@ -441,31 +444,10 @@ class TransactionHandler(BaseHandler):
         currency_symbol = currency_info.get("symbol", currency_code)
         
         # Show date selection keyboard
-        today = datetime.now().date()
-        yesterday = today - timedelta(days=1)
-        
-        keyboard = [
-            [InlineKeyboardButton(
-                f"📅 {get_translation('today', language)} ({today.strftime('%d.%m.%Y')})",
-                callback_data="select_date_today"
-            )],
-            [InlineKeyboardButton(
-                f"📅 {get_translation('yesterday', language)} ({yesterday.strftime('%d.%m.%Y')})",
-                callback_data="select_date_yesterday"
-            )],
-            [InlineKeyboardButton(
-                get_translation('custom_date', language),
-                callback_data="select_date_custom"
-            )],
-            [InlineKeyboardButton(
-                get_translation('back_to_main', language),
-                callback_data="main_menu"
-            )]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = get_date_keyboard(language)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             f"{type_emoji} **Add {type_name}**\n\n"
             f"Category: {category.icon} {category.get_name(language)}\n"
             f"Currency: {currency_symbol} {currency_code}\n\n"
@@ -492,7 +474,8 @@ class TransactionHandler(BaseHandler):
             context.user_data['waiting_for_custom_date'] = True
             context.user_data['waiting_for_amount'] = False
             
-            await update.callback_query.edit_message_text(
+            await self.edit_message(
+                update,
                 f"📅 {get_translation('enter_date', language)}\n\n"
                 f"Format: DD.MM.YYYY (e.g., 15.03.2024)",
                 parse_mode='Markdown'
@@ -506,26 +489,19 @@ class TransactionHandler(BaseHandler):
         context.user_data['selected_date'] = selected_date
         context.user_data['waiting_for_amount'] = True
         
-        # Show amount input keyboard
-        amount_keyboard = get_amount_keyboard(language)
-        
         # Get category info for display
         category_id = context.user_data.get('selected_category_id')
         category = self.db.query(Category).filter(Category.id == category_id).first()
         currency_code = context.user_data.get('selected_currency')
         
         if category and currency_code:
-            header_key = 'add_income' if category.category_type == CategoryType.INCOME else 'add_expense'
-            currency_info = SUPPORTED_CURRENCIES.get(currency_code, {})
-            currency_symbol = currency_info.get("symbol", currency_code)
-            
-            await update.callback_query.edit_message_text(
-                f"{get_translation(header_key, language)}\n\n"
-                f"{get_translation('category', language)}: {category.icon} {category.get_name(language)}\n"
-                f"{get_translation('date', language)}: {selected_date.strftime('%d.%m.%Y')}\n\n"
-                f"{get_translation('amount', language)}: **0**",
+            # Starting fresh from the date picker; a voice-prefilled buffer is kept
+            header = self._amount_header(category, language, currency_code, selected_date)
+            await self.edit_message(
+                update,
+                self._begin_amount_step(context, header, language),
                 parse_mode='Markdown',
-                reply_markup=amount_keyboard
+                reply_markup=get_amount_keyboard(language)
             )
     
     async def handle_custom_date_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -557,31 +533,18 @@ class TransactionHandler(BaseHandler):
             context.user_data['waiting_for_custom_date'] = False
             context.user_data['waiting_for_amount'] = True
             
-            # Show amount input keyboard
-            amount_keyboard = get_amount_keyboard(language)
-            
             # Get category info for display
             category_id = context.user_data.get('selected_category_id')
             category = self.db.query(Category).filter(Category.id == category_id).first()
             currency_code = context.user_data.get('selected_currency')
             
             if category and currency_code:
-                type_emoji = "💰" if category.category_type == CategoryType.INCOME else "💸"
-                type_name = get_translation("income", language) if category.category_type == CategoryType.INCOME else get_translation("expense", language)
-                currency_info = SUPPORTED_CURRENCIES.get(currency_code, {})
-                currency_symbol = currency_info.get("symbol", currency_code)
-                
                 # Preserve pre-filled amount (e.g., from voice) if present
-                amount_display = context.user_data.get('amount_buffer', '') or '0'
+                header = self._amount_header(category, language, currency_code, selected_date)
                 await update.message.reply_text(
-                    f"{type_emoji} **Add {type_name}**\n\n"
-                    f"Category: {category.icon} {category.get_name(language)}\n"
-                    f"Currency: {currency_symbol} {currency_code}\n"
-                    f"Date: {selected_date.strftime('%d.%m.%Y')}\n\n"
-                    f"Amount: **{amount_display}**\n\n"
-                    f"Use the keyboard below to enter amount:",
+                    self._begin_amount_step(context, header, language),
                     parse_mode='Markdown',
-                    reply_markup=amount_keyboard
+                    reply_markup=get_amount_keyboard(language)
                 )
             
         except ValueError:
@@ -594,10 +557,12 @@ class TransactionHandler(BaseHandler):
         if not context.user_data.get('waiting_for_amount'):
             return
         
-        # Get user's preferred language
-        user_data = self.get_context_from_update(update)
-        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
-        language = user.preferred_language if user else "en"
+        # Language is cached when the amount step starts, so keystrokes never hit the DB
+        language = context.user_data.get('amount_language')
+        if language is None:
+            user_data = self.get_context_from_update(update)
+            user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+            language = user.preferred_language if user else "en"
         
         # Initialize amount buffer if not exists
         if 'amount_buffer' not in context.user_data:
@@ -611,29 +576,7 @@ class TransactionHandler(BaseHandler):
             # Do not clear amount_buffer when navigating back from amount -> date
             
             # Show date selection keyboard again
-            today = datetime.now().date()
-            yesterday = today - timedelta(days=1)
-            
-            keyboard = [
-                [InlineKeyboardButton(
-                    f"📅 {get_translation('today', language)} ({today.strftime('%d.%m.%Y')})",
-                    callback_data="select_date_today"
-                )],
-                [InlineKeyboardButton(
-                    f"📅 {get_translation('yesterday', language)} ({yesterday.strftime('%d.%m.%Y')})",
-                    callback_data="select_date_yesterday"
-                )],
-                [InlineKeyboardButton(
-                    get_translation('custom_date', language),
-                    callback_data="select_date_custom"
-                )],
-                [InlineKeyboardButton(
-                    get_translation('back_to_main', language),
-                    callback_data="main_menu"
-                )]
-            ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = get_date_keyboard(language)
             
             # Get category info for display
             category_id = context.user_data.get('selected_category_id')
@@ -642,7 +585,8 @@ class TransactionHandler(BaseHandler):
             
             if category and currency_code:
                 header_key = 'add_income' if category.category_type == CategoryType.INCOME else 'add_expense'
-                await update.callback_query.edit_message_text(
+                await self.edit_message(
+                    update,
                     f"{get_translation(header_key, language)}\n\n"
                     f"{get_translation('category', language)}: {category.icon} {category.get_name(language)}\n\n"
                     f"{get_translation('select_date', language)}:",
@@ -687,14 +631,18 @@ class TransactionHandler(BaseHandler):
                     return
                 transaction.amount = amount
                 self.db.commit()
+                recent_transactions.put(transaction.user.telegram_id, transaction, transaction.category)
                 # Clear edit flags
                 context.user_data.pop('edit_mode', None)
                 context.user_data.pop('editing_transaction_id', None)
                 context.user_data.pop('amount_buffer', None)
                 context.user_data.pop('waiting_for_amount', None)
+                context.user_data.pop('amount_header', None)
+                context.user_data.pop('amount_language', None)
                 # Confirmation
                 confirm_text = get_translation("transaction_updated", language) if get_translation("transaction_updated", language) else "✅ Updated"
-                await update.callback_query.edit_message_text(
+                await self.edit_message(
+                    update,
                     confirm_text,
                     reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton(get_translation('back_to_manage', language), callback_data='manage_transactions')]])
                 )
@@ -732,8 +680,39 @@ class TransactionHandler(BaseHandler):
             await self._show_amount_buffer_callback(update, context, language)
             return
     
+    def _amount_header(self, category: Category, language: str, currency_code: str, selected_date: date) -> str:
+        """Keypad header (everything above the amount value) for the add flow"""
+        header_key = 'add_income' if category.category_type == CategoryType.INCOME else 'add_expense'
+        return (
+            f"{get_translation(header_key, language)}\n\n"
+            f"{get_translation('category', language)}: {category.icon} {category.get_name(language)}\n"
+            f"{get_translation('currency', language)}: {get_currency_symbol(currency_code)} {currency_code}\n"
+            f"{get_translation('date', language)}: {selected_date.strftime('%d.%m.%Y')}\n\n"
+            f"{get_translation('amount', language)}: "
+        )
+
+    def _begin_amount_step(self, context: ContextTypes.DEFAULT_TYPE, header: str, language: str) -> str:
+        """Remember the rendered header for the keypad and return the first screen"""
+        context.user_data['amount_header'] = header
+        context.user_data['amount_language'] = language
+        return self._render_amount(context)
+
+    @staticmethod
+    def _render_amount(context: ContextTypes.DEFAULT_TYPE) -> str:
+        buffer = context.user_data.get('amount_buffer') or '0'
+        return f"{context.user_data.get('amount_header', '')}**{buffer}**"
+
     async def _show_amount_buffer_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, language: str):
         """Show current amount buffer to user via callback query"""
+        if 'amount_header' in context.user_data:
+            await self.edit_message(
+                update,
+                self._render_amount(context),
+                parse_mode='Markdown',
+                reply_markup=get_amount_keyboard(language)
+            )
+            return
+
         buffer = context.user_data.get('amount_buffer', '')
         if not buffer:
             buffer = "0"
@@ -754,7 +733,8 @@ class TransactionHandler(BaseHandler):
         else:
             message = f"{get_translation('amount', language)}: **{buffer}**"
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             parse_mode='Markdown',
             reply_markup=get_amount_keyboard(language)
@@ -786,8 +766,9 @@ class TransactionHandler(BaseHandler):
             transaction_date=datetime.combine(selected_date, datetime.now().time())
         )
         
-        self.db.add(transaction)
-        self.db.commit()
+        inserted = self._insert_once(transaction)
+        if inserted:
+            recent_transactions.put(user.telegram_id, transaction, category)
 
         # If expense and primary income category configured, ensure future balances reflect deduction in UI
         # (We keep derived balance via queries; no separate table write needed here.)
@@ -799,6 +780,13 @@ class TransactionHandler(BaseHandler):
         context.user_data.pop('selected_currency', None)
         context.user_data.pop('selected_date', None)
         context.user_data.pop('amount_buffer', None)
+        context.user_data.pop('amount_header', None)
+        context.user_data.pop('amount_language', None)
+        
+        if not inserted:
+            # Double tap on Enter: the first tap already saved it and showed the confirmation
+            await update.callback_query.answer(get_translation("duplicate_transaction", language))
+            return
         
         # Get user's preferred language and currency
         currency_symbol = get_currency_symbol(selected_currency)
@@ -831,31 +819,65 @@ class TransactionHandler(BaseHandler):
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             success_message,
             reply_markup=reply_markup
         )
     
+    def _insert_once(self, transaction: Transaction) -> bool:
+        """Insert an interactively entered transaction unless it repeats one from the last few seconds"""
+        key, external_id = transaction_fingerprint(
+            transaction.user_id, transaction.amount, transaction.category_id, transaction.currency,
+            transaction.transaction_date.date(),
+        )
+        if not recent_writes.claim(key):
+            return False
+        transaction.external_id = external_id
+        self.db.add(transaction)
+        try:
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            constraint = getattr(getattr(e.orig, "diag", None), "constraint_name", None)
+            if constraint != DEDUP_CONSTRAINT:
+                # Not a repeat (missing category, ...): the entry was lost, do not report it as a duplicate
+                recent_writes.release(key)
+                raise
+            # Written moments ago by another process; the unique index caught it
+            return False
+        except Exception:
+            self.db.rollback()
+            recent_writes.release(key)
+            raise
+        return True
+    
     async def handle_recent_transactions(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle view recent transactions"""
         user_data = self.get_context_from_update(update)
-        user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
-        language = user.preferred_language if user else "en"
-        user_currency = user.preferred_currency if user else "USD"
-        
-        if not user:
-            await update.callback_query.answer("Please use /start first to initialize your account.")
-            return
-        
-        # No need to check for group context - unified logic handles both
-        
-        # Get recent personal transactions (last 10)
-        transactions = self.db.query(Transaction).filter(
-            Transaction.user_id == user.id
-        ).order_by(desc(Transaction.transaction_date)).limit(10).all()
-        
-        if not transactions:
-            await update.callback_query.edit_message_text(
+        # Active users are served from the in-memory buffer without touching the database
+        lines = recent_transactions.get(user_data['telegram_id'])
+        if lines is None:
+            user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
+            language = user.preferred_language if user else "en"
+            user_currency = user.preferred_currency if user else "USD"
+            
+            if not user:
+                await update.callback_query.answer("Please use /start first to initialize your account.")
+                return
+            
+            # No need to check for group context - unified logic handles both
+            
+            # Get recent personal transactions; the buffer keeps a few more than are shown
+            transactions = self.db.query(Transaction).options(joinedload(Transaction.category)).filter(
+                Transaction.user_id == user.id
+            ).order_by(desc(Transaction.transaction_date), desc(Transaction.id)).limit(BUFFER_SIZE).all()
+            recent_transactions.load(user.telegram_id, user.id, language, user_currency, transactions)
+            lines = recent_transactions.get(user.telegram_id)
+        
+        if not lines:
+            await self.edit_message(
+                update,
                 "📋 **Recent Transactions**\n\nNo transactions found. Start by adding some income or expenses!",
                 reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="add_transaction")]]),
                 parse_mode='Markdown'
@@ -863,19 +885,14 @@ class TransactionHandler(BaseHandler):
             return
         
         message = "📋 **Recent Transactions**\n\n"
-        for i, transaction in enumerate(transactions, 1):
-            type_emoji = "💰" if transaction.is_income else "💸"
-            date_str = transaction.transaction_date.strftime("%Y-%m-%d %H:%M")
-            message += f"{i:2d}. {type_emoji} {user_currency} {transaction.amount:,.2f} - {transaction.category.icon} {transaction.category.get_name(language)}\n"
-            message += f"     📅 {date_str}\n"
-            if transaction.description:
-                message += f"     📝 {transaction.description}\n"
-            message += "\n"
+        for i, line in enumerate(lines, 1):
+            message += f"{i:2d}. {line}\n"
         
         keyboard = [[InlineKeyboardButton("🔙 Back", callback_data="add_transaction")]]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -919,13 +936,14 @@ class TransactionHandler(BaseHandler):
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
         )
     
-    async def handle_manage_specific_transaction(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_manage_specific_transaction(self, update: Update, context: ContextTypes.DEFAULT_TYPE, transaction_id: int):
         """Handle management of a specific transaction"""
         user_data = self.get_context_from_update(update)
         user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
@@ -935,8 +953,6 @@ class TransactionHandler(BaseHandler):
             await update.callback_query.answer("Please use /start first to initialize your account.")
             return
         
-        # Extract transaction ID from callback data
-        transaction_id = int(update.callback_query.data.replace("manage_transaction_", ""))
         transaction = self.db.query(Transaction).filter(
             Transaction.id == transaction_id,
             Transaction.user_id == user.id
@@ -976,14 +992,15 @@ class TransactionHandler(BaseHandler):
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
         )
     
-    async def handle_edit_transaction(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle editing a transaction"""
+    async def handle_edit_transaction(self, update: Update, context: ContextTypes.DEFAULT_TYPE, transaction_id: int, action: Optional[str] = None):
+        """Handle editing a transaction (``action`` is the field picked from the edit menu, if any)"""
         user_data = self.get_context_from_update(update)
         user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
         language = user.preferred_language if user else "en"
@@ -992,30 +1009,6 @@ class TransactionHandler(BaseHandler):
             await update.callback_query.answer("Please use /start first to initialize your account.")
             return
         
-        # Extract transaction ID and optional sub-action
-        data = update.callback_query.data
-        action = None
-        transaction_id = None
-        try:
-            if data.startswith("edit_transaction_amount_"):
-                action = "amount"
-                transaction_id = int(data.split("_")[-1])
-            elif data.startswith("edit_transaction_category_"):
-                action = "category"
-                transaction_id = int(data.split("_")[-1])
-            elif data.startswith("edit_transaction_date_"):
-                action = "date"
-                transaction_id = int(data.split("_")[-1])
-            elif data.startswith("edit_transaction_description_"):
-                action = "description"
-                transaction_id = int(data.split("_")[-1])
-            else:
-                # plain edit_transaction_{id}
-                transaction_id = int(data.replace("edit_transaction_", ""))
-        except ValueError:
-            await update.callback_query.answer(get_translation("unknown_command", language))
-            return
-
         transaction = self.db.query(Transaction).filter(
             Transaction.id == transaction_id,
             Transaction.user_id == user.id
@@ -1037,7 +1030,14 @@ class TransactionHandler(BaseHandler):
             context.user_data['selected_currency'] = transaction.currency
 
             currency_symbol = get_currency_symbol(transaction.currency)
-            await update.callback_query.edit_message_text(
+            context.user_data['amount_header'] = (
+                f"✏️ {get_translation('amount', language)}\n\n"
+                f"{currency_symbol} {float(transaction.amount):,.2f}\n\n"
+                f"{get_translation('amount', language)}: "
+            )
+            context.user_data['amount_language'] = language
+            await self.edit_message(
+                update,
                 f"✏️ {get_translation('amount', language)}\n\n"
                 f"{currency_symbol} {float(transaction.amount):,.2f}\n\n"
                 f"{get_translation('enter_amount', language)}",
@@ -1077,13 +1077,14 @@ class TransactionHandler(BaseHandler):
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
         )
     
-    async def handle_delete_transaction(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_delete_transaction(self, update: Update, context: ContextTypes.DEFAULT_TYPE, transaction_id: int):
         """Handle deleting a transaction"""
         user_data = self.get_context_from_update(update)
         user = self.db.query(User).filter(User.telegram_id == user_data['telegram_id']).first()
@@ -1093,8 +1094,6 @@ class TransactionHandler(BaseHandler):
             await update.callback_query.answer("Please use /start first to initialize your account.")
             return
         
-        # Extract transaction ID from callback data
-        transaction_id = int(update.callback_query.data.replace("delete_transaction_", ""))
         transaction = self.db.query(Transaction).filter(
             Transaction.id == transaction_id,
             Transaction.user_id == user.id
@@ -1107,8 +1106,10 @@ class TransactionHandler(BaseHandler):
         # Delete the transaction
         self.db.delete(transaction)
         self.db.commit()
+        recent_transactions.remove(user.telegram_id, transaction_id)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             get_translation("transaction_deleted", language)
         )
     
@@ -1182,7 +1183,8 @@ class TransactionHandler(BaseHandler):
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
             
-            await update.callback_query.edit_message_text(
+            await self.edit_message(
+                update,
                 message,
                 reply_markup=reply_markup,
                 parse_mode='Markdown'
@@ -1297,7 +1299,8 @@ class TransactionHandler(BaseHandler):
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.callback_query.edit_message_text(
+        await self.edit_message(
+            update,
             message,
             reply_markup=reply_markup,
             parse_mode='Markdown'
@@ -6,6 +6,8 @@ from src.models.category import Category
 from src.database.init_db import create_default_categories
 from src.utils.translations import get_translation, format_amount
 from src.utils.balance_calculator import get_balance_calculator
+from src.utils.keyboards import get_main_menu_keyboard
+from src.utils.category_matcher import category_matchers
 from .base import BaseHandler
 
 class UserHandler(BaseHandler):
@@ -36,6 +38,7 @@ class UserHandler(BaseHandler):
             
             # Create default categories
             create_default_categories(self.db, user.id)
+            category_matchers.invalidate(user.id)
         
         language = user.preferred_language if user else "en"
         
@@ -50,59 +53,13 @@ class UserHandler(BaseHandler):
             if not menu_message.strip():
                 menu_message = "🤖 Expense Tracker Bot"
         
-        if user_data['is_group']:
-            keyboard = [
-                [InlineKeyboardButton(
-                    get_translation("add_expense", language), 
-                    callback_data="add_expense"
-                )],
-                [InlineKeyboardButton(
-                    get_translation("add_income", language), 
-                    callback_data="add_income"
-                )],
-                [InlineKeyboardButton(
-                    get_translation("manage_transactions", language), 
-                    callback_data="manage_transactions"
-                )],
-                [InlineKeyboardButton(
-                    get_translation("view_reports", language), 
-                    callback_data="view_reports"
-                )],
-                [InlineKeyboardButton(
-                    get_translation("settings", language), 
-                    callback_data="settings"
-                )]
-            ]
-        else:
-            keyboard = [
-                [InlineKeyboardButton(
-                    get_translation("add_expense", language), 
-                    callback_data="add_expense"
-                )],
-                [InlineKeyboardButton(
-                    get_translation("add_income", language), 
-                    callback_data="add_income"
-                )],
-                [InlineKeyboardButton(
-                    get_translation("manage_transactions", language), 
-                    callback_data="manage_transactions"
-                )],
-                [InlineKeyboardButton(
-                    get_translation("view_reports", language), 
-                    callback_data="view_reports"
-                )],
-                [InlineKeyboardButton(
-                    get_translation("settings", language), 
-                    callback_data="settings"
-                )]
-            ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        # Same menu for users and groups
+        reply_markup = get_main_menu_keyboard(language)
         
         if update.message:
             await update.message.reply_text(menu_message, reply_markup=reply_markup)
         else:
-            await update.callback_query.edit_message_text(menu_message, reply_markup=reply_markup)
+            await self.edit_message(update, menu_message, reply_markup=reply_markup)
     
     async def handle_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
@@ -2,5 +2,7 @@ from .user import User
 from .category import Category, CategoryType
 from .transaction import Transaction
 from .exchange_rates import ExchangeRate
+from .recurring import RecurringRule, RecurrenceFrequency
+from .conversation_state import ConversationState
 
-__all__ = ["User", "Category", "CategoryType", "Transaction", "ExchangeRate"]
+__all__ = ["User", "Category", "CategoryType", "Transaction", "ExchangeRate", "RecurringRule", "RecurrenceFrequency", "ConversationState"]
@@ -19,6 +19,7 @@ class Category(Base):
     category_type = Column(Enum(CategoryType), nullable=False)
     color = Column(String, default="#3498db")  # Hex color for UI
     icon = Column(String, nullable=True)  # Emoji or icon identifier
+    aliases = Column(String, nullable=True)  # Comma-separated extra words for free-text matching
     is_default = Column(Boolean, default=False)  # System default categories
     is_active = Column(Boolean, default=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
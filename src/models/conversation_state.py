@@ -0,0 +1,25 @@
+"""
+Persisted conversation state (context.user_data of unfinished input flows)
+"""
+
+from sqlalchemy import Column, BigInteger, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class ConversationState(Base):
+    __tablename__ = "conversation_state"
+    
+    # Shard layout that owns the row ("<index>/<count>"), empty when not sharded
+    scope = Column(String(16), primary_key=True, default="")
+    # Keyed like context.user_data: by Telegram user id, not users.id
+    telegram_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    data = Column(Text, nullable=False)  # JSON object
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index("idx_conversation_state_updated", "updated_at"),
+    )
+    
+    def __repr__(self):
+        return f"<ConversationState(scope={self.scope!r}, telegram_id={self.telegram_id}, updated_at={self.updated_at})>"
@@ -0,0 +1,43 @@
+"""
+Recurring transaction rules (rent monthly, subscription weekly, salary on the 25th)
+"""
+
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Numeric, Text, Enum, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+from .base import Base
+
+
+class RecurrenceFrequency(enum.Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
+
+class RecurringRule(Base):
+    __tablename__ = "recurring_rules"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    amount = Column(Numeric(10, 2), nullable=False)
+    currency = Column(String(10), default="USD", nullable=False)
+    description = Column(Text, nullable=True)
+    frequency = Column(Enum(RecurrenceFrequency), nullable=False)
+    day_of_week = Column(Integer, nullable=True)  # 0 = Monday, for WEEKLY
+    day_of_month = Column(Integer, nullable=True)  # 1-31, clamped to the month's last day, for MONTHLY
+    start_date = Column(Date, nullable=False)
+    last_run_date = Column(Date, nullable=True)  # Last day already materialized
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("idx_recurring_rules_user", "user_id"),
+    )
+    
+    # Relationships
+    category = relationship("Category")
+    
+    def __repr__(self):
+        return f"<RecurringRule(user_id={self.user_id}, amount={self.amount}, frequency={self.frequency})>"
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Numeric, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Numeric, Text, Index, Computed, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from .base import Base
 
@@ -15,6 +16,21 @@ class Transaction(Base):
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    external_id = Column(String(64), nullable=True)  # Stable id of an imported statement row (dedup key)
+    # Search vector maintained by PostgreSQL ('simple' config: mixed ru/uk/en text, no stemming)
+    description_tsv = deferred(Column(
+        TSVECTOR, Computed("to_tsvector('simple', coalesce(description, ''))", persisted=True)
+    ))
+    
+    __table_args__ = (
+        Index(
+            "uq_transactions_user_external_id", "user_id", "external_id",
+            unique=True, postgresql_where=external_id.isnot(None)
+        ),
+        Index("idx_transactions_user_date", "user_id", "transaction_date"),
+        # Composite GIN over an integer column needs btree_gin (created before the table, see below)
+        Index("idx_transactions_user_description_tsv", "user_id", "description_tsv", postgresql_using="gin"),
+    )
     
     # Relationships
     user = relationship("User", back_populates="transactions")
@@ -30,3 +46,9 @@ class Transaction(Base):
     @property
     def is_expense(self):
         return self.category and self.category.category_type.value == "expense"
+
+
+event.listen(
+    Transaction.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gin").execute_if(dialect="postgresql"),
+)
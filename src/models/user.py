@@ -18,6 +18,8 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     primary_income_category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    digest_weekly = Column(Boolean, default=False)  # Opt-in weekly digest (sent on Mondays)
+    digest_monthly = Column(Boolean, default=False)  # Opt-in monthly digest (sent on the 1st)
     
     # Group-specific fields
     is_group = Column(Boolean, default=False)
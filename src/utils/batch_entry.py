@@ -0,0 +1,92 @@
+"""
+Multi-line transaction entry parser for the Expense Tracker Bot
+
+Parses messages such as "food 120\\ntaxi 45 yesterday\\nsalary 3000" into
+(category, amount, date) rows. Categories are found with the user's compiled
+CategoryMatcher (names, aliases, stems), the same one voice input uses, so
+the handler can insert every row in a single statement. Only exact matches
+count: the edit-distance fallback that absorbs speech recognition errors
+would turn typed chatter ("good 5", "wood 3") into expenses.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from src.utils.category_matcher import CategoryMatcher
+
+MAX_BATCH_LINES = 50
+
+AMOUNT_RE = re.compile(r"^\d+(?:[.,]\d{1,2})?$")
+DATE_RE = re.compile(r"^(\d{1,2})\.(\d{1,2})(?:\.(\d{4}))?$")
+TODAY_WORDS = {"today", "сегодня", "сьогодні"}
+YESTERDAY_WORDS = {"yesterday", "вчера", "вчора"}
+
+
+class ParsedLine:
+    def __init__(self, line: str, category_id: int, amount: float, selected_date: date):
+        self.line = line
+        self.category_id = category_id
+        self.amount = amount
+        self.selected_date = selected_date
+
+    def __repr__(self):
+        return f"<ParsedLine(category_id={self.category_id}, amount={self.amount}, date={self.selected_date})>"
+
+
+def _parse_date(token: str, today: date) -> Optional[date]:
+    if token in TODAY_WORDS:
+        return today
+    if token in YESTERDAY_WORDS:
+        return today - timedelta(days=1)
+    match = DATE_RE.match(token)
+    if match:
+        day, month, year = match.groups()
+        try:
+            return date(int(year) if year else today.year, int(month), int(day))
+        except ValueError:
+            return None
+    return None
+
+
+def parse_line(line: str, matcher: CategoryMatcher, today: date) -> Optional[ParsedLine]:
+    """Parse "<category words> <amount> [today|yesterday|DD.MM[.YYYY]]" in any word order"""
+    amount = None
+    selected_date = None
+    words = []
+    for token in line.lower().split():
+        if amount is None and AMOUNT_RE.match(token):
+            amount = float(token.replace(",", "."))
+            continue
+        parsed_date = _parse_date(token, today) if selected_date is None else None
+        if parsed_date is not None:
+            selected_date = parsed_date
+            continue
+        if DATE_RE.match(token):
+            # "31.02" or a second date: not a category word, and not something to guess around
+            return None
+        words.append(token)
+
+    if amount is None or amount <= 0 or not words:
+        return None
+    if selected_date is not None and selected_date > today:
+        return None
+
+    category_id = matcher.match(" ".join(words), fuzzy=False)
+    if category_id is None:
+        return None
+    return ParsedLine(line, category_id, amount, selected_date or today)
+
+
+def parse_batch(text: str, matcher: CategoryMatcher, today: Optional[date] = None) -> Tuple[List[ParsedLine], List[str]]:
+    """Split a message into parsed rows and the lines that could not be understood"""
+    today = today or datetime.now().date()
+    parsed, unparsed = [], []
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    for line in lines[:MAX_BATCH_LINES]:
+        result = parse_line(line, matcher, today)
+        if result is None:
+            unparsed.append(line)
+        else:
+            parsed.append(result)
+    unparsed.extend(lines[MAX_BATCH_LINES:])
+    return parsed, unparsed
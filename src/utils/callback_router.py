@@ -0,0 +1,124 @@
+"""
+Callback query router for the Expense Tracker Bot
+
+Inline buttons carry callback_data such as "main_menu" or
+"delete_transaction_42". Exact values are resolved with one dict lookup and
+prefixed values by walking a character trie, which finds the longest
+registered prefix in a single pass ("edit_transaction_amount_" wins over
+"edit_transaction_"). The rest of the value after a prefix is converted once
+and passed to the handler as a keyword argument. Every route counts calls,
+errors and latency.
+"""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from telegram import Update
+from telegram.ext import ContextTypes
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class Route:
+    __slots__ = ("name", "handler", "param", "converter", "defaults", "calls", "errors", "total_seconds", "max_seconds")
+
+    def __init__(self, name: str, handler: Handler, param: Optional[str] = None,
+                 converter: Callable[[str], Any] = str, defaults: Optional[dict] = None):
+        self.name = name
+        self.handler = handler
+        self.param = param
+        self.converter = converter
+        self.defaults = defaults or {}
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 2),
+        }
+
+
+class CallbackRouter:
+    def __init__(self):
+        self._exact: Dict[str, Route] = {}
+        self._trie: dict = {}  # char -> child node; a node's None key holds the route ending there
+        self.unrouted = 0
+
+    def exact(self, data: str, handler: Handler, **defaults):
+        """Route callback_data equal to ``data``; ``defaults`` are passed to the handler as keyword arguments"""
+        self._exact[data] = Route(data, handler, defaults=defaults)
+
+    def prefix(self, prefix: str, handler: Handler, param: Optional[str] = None,
+               converter: Callable[[str], Any] = str, **defaults):
+        """Route callback_data starting with ``prefix``; the remainder is converted and passed as ``param``"""
+        node = self._trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[None] = Route(prefix + "*", handler, param, converter, defaults)
+
+    def resolve(self, data: str) -> Tuple[Optional[Route], dict]:
+        """Find the route for ``data`` and its keyword arguments; raises ValueError if the parameter does not parse"""
+        route = self._exact.get(data)
+        if route is not None:
+            return route, route.defaults
+
+        node, matched, matched_length = self._trie, None, 0
+        for position, char in enumerate(data):
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                matched, matched_length = node[None], position + 1
+        if matched is None:
+            return None, {}
+        if matched.param is None:
+            return matched, matched.defaults
+        try:
+            value = matched.converter(data[matched_length:])
+        except ValueError:
+            matched.errors += 1
+            raise
+        return matched, {**matched.defaults, matched.param: value}
+
+    async def dispatch(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
+        """Run the handler for the update's callback_data; False if no route matches"""
+        route, kwargs = self.resolve(update.callback_query.data or "")
+        if route is None:
+            self.unrouted += 1
+            return False
+
+        started = time.perf_counter()
+        try:
+            await route.handler(update, context, **kwargs)
+        except Exception:
+            route.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            route.calls += 1
+            route.total_seconds += elapsed
+            if elapsed > route.max_seconds:
+                route.max_seconds = elapsed
+        return True
+
+    def routes(self):
+        yield from self._exact.values()
+        stack = [self._trie]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char is None:
+                    yield child
+                else:
+                    stack.append(child)
+
+    def stats(self) -> dict:
+        """Per-route counters for routes that have been used"""
+        return {route.name: route.stats() for route in self.routes() if route.calls or route.errors}
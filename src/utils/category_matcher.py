@@ -0,0 +1,214 @@
+"""
+Per-user category matcher for the Expense Tracker Bot
+
+Finds the category mentioned in free text (voice transcripts, typed notes).
+Both localized names and the user's aliases are reduced to crude ru/uk/en
+stems ("Здоровье" and "здоровья" both become "здоров") and compiled into one
+Aho-Corasick automaton per user, so a lookup is a single pass over the text
+no matter how many categories the user has. When nothing matches exactly, a
+bounded edit-distance pass over single-word keys catches small recognition
+errors. Matchers are cached per user and must be invalidated whenever the
+user's categories change.
+"""
+
+import logging
+import re
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from src.models.category import Category
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_MATCHERS = 10000
+MIN_STEM_LENGTH = 3
+MIN_FUZZY_LENGTH = 4
+MAX_FUZZY_TOKENS = 20
+
+WORD_RE = re.compile(r"[^\W_]+")
+# Longest first; ru/uk noun and adjective endings, then en plurals/verb forms
+SUFFIXES = sorted({
+    "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ией", "иях", "ях", "ах", "ов", "ев", "ей",
+    "ий", "ый", "ой", "ая", "яя", "ое", "ее", "ые", "ие", "ья", "ье", "ью", "ьи", "ию", "ия", "ом", "ем", "ам",
+    "ям", "ую", "юю", "ою", "ею", "ів", "ій", "ої", "а", "я", "о", "е", "ы", "и", "у", "ю", "ь", "й", "і", "ї", "є",
+    "ies", "ing", "es", "ed", "s",
+}, key=len, reverse=True)
+
+# Key priorities: a full name or alias beats one word of a multi-word name
+FULL_KEY = 2
+WORD_KEY = 1
+
+
+def stem(word: str) -> str:
+    """Strip the longest known ending while leaving at least MIN_STEM_LENGTH letters"""
+    word = word.lower().replace("ё", "е")
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+
+def stems(text: str) -> List[str]:
+    return [stem(word) for word in WORD_RE.findall(text.lower())]
+
+
+def _within_distance(a: str, b: str, limit: int) -> bool:
+    """Levenshtein distance <= limit, abandoning rows that already exceed it"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class CategoryMatcher:
+    """Aho-Corasick automaton over " stem stem " keys of one user's categories"""
+
+    def __init__(self, categories: Iterable[Tuple[int, str, Sequence[str]]]):
+        """``categories`` yields (category_id, category_type value, names and aliases)"""
+        self.category_types: Dict[int, str] = {}
+        keys: Dict[str, Tuple[int, int]] = {}
+        word_owners: Dict[str, set] = {}
+        for category_id, category_type, names in categories:
+            self.category_types[category_id] = category_type
+            for name in names:
+                name_stems = stems(name or "")
+                if not name_stems:
+                    continue
+                key = " ".join(name_stems)
+                if key not in keys or keys[key][1] < FULL_KEY:
+                    keys[key] = (category_id, FULL_KEY)
+                if len(name_stems) > 1:
+                    for word in name_stems:
+                        if len(word) >= MIN_STEM_LENGTH:
+                            word_owners.setdefault(word, set()).add(category_id)
+        # A word shared by several multi-word names ("Кафе и рестораны", "Рестораны доставки") is ambiguous
+        for word, owners in word_owners.items():
+            if word not in keys and len(owners) == 1:
+                keys[word] = (next(iter(owners)), WORD_KEY)
+
+        self.keys = keys
+        self._fuzzy_keys: Dict[int, List[str]] = {}
+        for key in keys:
+            if " " not in key and len(key) >= MIN_FUZZY_LENGTH:
+                self._fuzzy_keys.setdefault(len(key), []).append(key)
+        self._build([f" {key} " for key in keys])
+
+    def _build(self, patterns: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for pattern in patterns:
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(pattern[1:-1])
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _exact(self, text: str, category_type: Optional[str]) -> Optional[int]:
+        best, best_score = None, None
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for key in self._out[state]:
+                category_id, priority = self.keys[key]
+                if category_type and self.category_types[category_id] != category_type:
+                    continue
+                # Highest priority, then longest key, then earliest in the text
+                score = (priority, len(key), -position)
+                if best_score is None or score > best_score:
+                    best, best_score = category_id, score
+        return best
+
+    def _fuzzy(self, tokens: List[str], category_type: Optional[str]) -> Optional[int]:
+        for token in tokens[:MAX_FUZZY_TOKENS]:
+            if len(token) < MIN_FUZZY_LENGTH:
+                continue
+            limit = 1 if len(token) <= 6 else 2
+            for length in range(len(token) - limit, len(token) + limit + 1):
+                for key in self._fuzzy_keys.get(length, ()):
+                    category_id = self.keys[key][0]
+                    if category_type and self.category_types[category_id] != category_type:
+                        continue
+                    if _within_distance(token, key, limit):
+                        return category_id
+        return None
+
+    def match(self, text: str, category_type: Optional[str] = None, fuzzy: bool = True) -> Optional[int]:
+        """Return the id of the category mentioned in ``text``, optionally limited to one category type;
+        ``fuzzy=False`` skips the edit-distance fallback (typed text, where a near miss is another word)"""
+        tokens = stems(text or "")
+        if not tokens:
+            return None
+        found = self._exact(f" {' '.join(tokens)} ", category_type)
+        if found is None and fuzzy:
+            found = self._fuzzy(tokens, category_type)
+        return found
+
+
+class CategoryMatcherCache:
+    """LRU of compiled matchers keyed by user id"""
+
+    def __init__(self, max_users: int = MAX_CACHED_MATCHERS):
+        self.max_users = max_users
+        self._matchers: "OrderedDict[int, CategoryMatcher]" = OrderedDict()
+        self.builds = 0
+
+    def get(self, db: Session, user_id: int) -> CategoryMatcher:
+        matcher = self._matchers.get(user_id)
+        if matcher is not None:
+            self._matchers.move_to_end(user_id)
+            return matcher
+
+        rows = db.query(
+            Category.id, Category.category_type, Category.name_en, Category.name_ru, Category.aliases
+        ).filter(Category.user_id == user_id, Category.is_active == True).all()
+        matcher = CategoryMatcher(
+            (row.id, row.category_type.value, (row.name_en, row.name_ru, *split_aliases(row.aliases)))
+            for row in rows
+        )
+        self.builds += 1
+        self._matchers[user_id] = matcher
+        while len(self._matchers) > self.max_users:
+            self._matchers.popitem(last=False)
+        return matcher
+
+    def invalidate(self, user_id: int):
+        """Drop the user's matcher; call after any change to their categories or aliases"""
+        self._matchers.pop(user_id, None)
+
+    def clear(self):
+        self._matchers.clear()
+
+
+def split_aliases(aliases: Optional[str]) -> List[str]:
+    return [alias.strip() for alias in (aliases or "").split(",") if alias.strip()]
+
+
+# Global instance
+category_matchers = CategoryMatcherCache()
@@ -0,0 +1,178 @@
+"""
+Chart rendering for the Expense Tracker Bot
+
+Plotting is CPU bound, so charts are drawn in a process pool and the event
+loop only awaits the finished PNG bytes. The render functions below take plain
+Python data (no ORM objects) so they can be pickled into worker processes.
+"""
+
+import asyncio
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+INCOME_COLOR = "#27ae60"
+EXPENSE_COLOR = "#e74c3c"
+BALANCE_COLOR = "#3498db"
+
+
+def _new_figure():
+    """Create a figure with the non-interactive Agg backend"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(8, 6), dpi=100)
+    return plt, fig, ax
+
+
+def _to_png(plt, fig) -> bytes:
+    """Serialize a figure to PNG bytes and release it"""
+    buffer = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_category_pie(labels: List[str], values: List[float], colors: List[str], title: str) -> bytes:
+    """Render expenses by category as a pie chart"""
+    plt, fig, ax = _new_figure()
+    ax.pie(values, labels=labels, colors=colors or None, autopct="%1.1f%%", startangle=90, counterclock=False)
+    ax.axis("equal")
+    ax.set_title(title)
+    return _to_png(plt, fig)
+
+
+def render_income_expense_bars(months: List[str], income: List[float], expenses: List[float], title: str,
+                               income_label: str, expense_label: str) -> bytes:
+    """Render monthly income vs expense as grouped bars"""
+    plt, fig, ax = _new_figure()
+    positions = list(range(len(months)))
+    width = 0.4
+    ax.bar([p - width / 2 for p in positions], income, width, label=income_label, color=INCOME_COLOR)
+    ax.bar([p + width / 2 for p in positions], expenses, width, label=expense_label, color=EXPENSE_COLOR)
+    ax.set_xticks(positions)
+    ax.set_xticklabels(months)
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(axis="y", alpha=0.3)
+    return _to_png(plt, fig)
+
+
+def render_balance_trend(periods: List[str], balances: List[float], title: str) -> bytes:
+    """Render the running balance as a line chart"""
+    plt, fig, ax = _new_figure()
+    ax.plot(periods, balances, marker="o", color=BALANCE_COLOR)
+    ax.axhline(0, color="#95a5a6", linewidth=0.8)
+    ax.set_title(title)
+    ax.grid(alpha=0.3)
+    if len(periods) > 12:
+        ax.set_xticks(periods[::max(1, len(periods) // 12)])
+    fig.autofmt_xdate()
+    return _to_png(plt, fig)
+
+
+class ChartRenderer:
+    """Runs render functions in a process pool with admission control.
+
+    - at most ``queue_size`` charts may be waiting or rendering at once
+    - each user may have at most ``per_user_limit`` charts in flight
+    - a render that exceeds ``timeout`` seconds is abandoned by its caller, but
+      keeps its slot until the worker process is actually done with it
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float, per_user_limit: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.per_user_limit = per_user_limit
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._per_user: Dict[int, int] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use"""
+        if self._executor is None:
+            # spawn avoids forking a process that already runs an event loop and DB pools
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def render(self, user_id: int, func: Callable[..., bytes], *args) -> Optional[bytes]:
+        """Render a chart for a user; returns PNG bytes or None if rejected or failed"""
+        if self._pending >= self.queue_size:
+            logger.warning(f"Chart queue full ({self._pending}/{self.queue_size}), rejecting render for user {user_id}")
+            return None
+        if self._per_user.get(user_id, 0) >= self.per_user_limit:
+            logger.info(f"User {user_id} already has {self.per_user_limit} chart(s) in flight")
+            return None
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BrokenProcessPool as e:
+            logger.error(f"Chart process pool broken, restarting: {e}")
+            self.shutdown()
+            return None
+        self._pending += 1
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        # The slot is freed when the worker is really done: a timed out render keeps its
+        # process busy, so it keeps counting against the queue and the user until it finishes
+        future.add_done_callback(lambda _: self._release_threadsafe(loop, user_id))
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=self.timeout)
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM); drop the pool so the next render starts a fresh one
+            logger.error(f"Chart process pool broken, restarting: {e}")
+            self.shutdown()
+            return None
+        except asyncio.TimeoutError:
+            # Drops it if still queued; a running render cannot be interrupted
+            future.cancel()
+            logger.warning(f"Chart {func.__name__} for user {user_id} timed out after {self.timeout}s")
+            return None
+        except Exception as e:
+            logger.error(f"Error rendering chart {func.__name__} for user {user_id}: {e}")
+            return None
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop, user_id: int):
+        # Done callbacks run in the pool's management thread
+        try:
+            loop.call_soon_threadsafe(self._release, user_id)
+        except RuntimeError:
+            pass  # Loop already closed on shutdown
+
+    def _release(self, user_id: int):
+        self._pending -= 1
+        remaining = self._per_user.get(user_id, 1) - 1
+        if remaining > 0:
+            self._per_user[user_id] = remaining
+        else:
+            self._per_user.pop(user_id, None)
+
+    def shutdown(self):
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+chart_renderer = ChartRenderer(
+    workers=settings.CHART_WORKERS,
+    queue_size=settings.CHART_QUEUE_SIZE,
+    timeout=settings.CHART_RENDER_TIMEOUT,
+    per_user_limit=settings.CHART_PER_USER_LIMIT
+)
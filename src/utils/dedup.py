@@ -0,0 +1,73 @@
+"""
+Duplicate transaction suppression for the Expense Tracker Bot
+
+A double tap on the keypad Enter button or a re-sent voice note produces the
+same (user, amount, category, currency, date) a few seconds apart. Interactive
+inserts claim that fingerprint in an in-memory sliding window first, so the
+repeat never reaches the database. As a backstop, the row also carries
+external_id "entry:<category>:<amount>:<currency>:<date>:<time bucket>", and
+the partial unique index uq_transactions_user_external_id on (user_id,
+external_id) rejects a repeat that gets past the window (another replica, a
+restart). The selected date is part of the fingerprint, so entering the same
+amount for yesterday and today in quick succession records both.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from typing import Hashable, Optional, Tuple
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_WRITES = 100000
+DEDUP_CONSTRAINT = "uq_transactions_user_external_id"
+
+
+def transaction_fingerprint(user_id: int, amount, category_id: int, currency: str, transaction_date: date,
+                            now: Optional[float] = None) -> Tuple[Tuple, str]:
+    """Return (in-memory key, external_id) for an interactive insert on ``transaction_date``"""
+    now = time.time() if now is None else now
+    amount = Decimal(str(amount)).quantize(Decimal("0.01"))
+    bucket = int(now // settings.DEDUP_WINDOW_SECONDS)
+    day = transaction_date.strftime("%Y%m%d")
+    return (
+        (user_id, amount, category_id, currency, day),
+        f"entry:{category_id}:{amount}:{currency}:{day}:{bucket}",
+    )
+
+
+class RecentWrites:
+    """Sliding window of recently written fingerprints"""
+
+    def __init__(self, window: float, max_entries: int = MAX_TRACKED_WRITES):
+        self.window = window
+        self.max_entries = max_entries
+        self._seen: "OrderedDict[Hashable, float]" = OrderedDict()
+        self.suppressed = 0
+
+    def claim(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """Record ``key``; False if it was already written within the window"""
+        now = time.monotonic() if now is None else now
+        # Entries are kept in write order, so expired ones are always at the front
+        while self._seen:
+            oldest_key, written_at = next(iter(self._seen.items()))
+            if now - written_at < self.window and len(self._seen) < self.max_entries:
+                break
+            self._seen.popitem(last=False)
+
+        if key in self._seen:
+            self.suppressed += 1
+            return False
+        self._seen[key] = now
+        return True
+
+    def release(self, key: Hashable):
+        """Forget a claim whose insert did not happen"""
+        self._seen.pop(key, None)
+
+
+# Global instance
+recent_writes = RecentWrites(settings.DEDUP_WINDOW_SECONDS)
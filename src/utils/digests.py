@@ -0,0 +1,141 @@
+"""
+Scheduled weekly and monthly digests for the Expense Tracker Bot
+
+Digests for every opted-in user and group are computed with a single
+GROUP BY query per period and then sent through the rate-limited fan-out.
+Opted-in users without transactions in the period get a "no activity" digest.
+"""
+
+import logging
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Tuple
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+from telegram.ext import ContextTypes
+from config.settings import settings
+from src.database.session import get_session
+from src.models.user import User
+from src.models.category import Category, CategoryType
+from src.models.transaction import Transaction
+from src.utils.translations import get_translation
+from src.utils.fanout import fan_out_messages
+
+logger = logging.getLogger(__name__)
+
+WEEKLY = "weekly"
+MONTHLY = "monthly"
+TOP_CATEGORIES = 5
+
+
+def get_digest_period(kind: str, today: date) -> Tuple[date, date]:
+    """Return the [start, end) dates of the period that just finished"""
+    if kind == WEEKLY:
+        end = today - timedelta(days=today.weekday())
+        return end - timedelta(days=7), end
+    end = today.replace(day=1)
+    start = (end - timedelta(days=1)).replace(day=1)
+    return start, end
+
+
+def compute_digests(db: Session, kind: str, start: date, end: date) -> "OrderedDict[int, dict]":
+    """Aggregate the period for all opted-in users in one query, keyed by users.id
+
+    Users without transactions in the period are included with zero totals
+    and no categories.
+    """
+    opt_in = User.digest_weekly if kind == WEEKLY else User.digest_monthly
+    rows = db.query(
+        User.id,
+        User.telegram_id,
+        User.preferred_language,
+        User.preferred_currency,
+        Category.name_en,
+        Category.name_ru,
+        Category.icon,
+        Category.category_type,
+        func.sum(Transaction.amount).label('total')
+    ).outerjoin(Transaction, and_(
+        Transaction.user_id == User.id,
+        Transaction.transaction_date >= start,
+        Transaction.transaction_date < end
+    )).outerjoin(
+        Category, Transaction.category_id == Category.id
+    ).filter(
+        opt_in == True,
+        User.is_active == True
+    ).group_by(
+        User.id, User.telegram_id, User.preferred_language, User.preferred_currency,
+        Category.id, Category.name_en, Category.name_ru, Category.icon, Category.category_type
+    ).order_by(User.id).all()
+
+    digests: "OrderedDict[int, dict]" = OrderedDict()
+    for user_id, telegram_id, language, currency, name_en, name_ru, icon, category_type, total in rows:
+        digest = digests.get(user_id)
+        if digest is None:
+            digest = digests[user_id] = {
+                "telegram_id": telegram_id,
+                "language": language or "en",
+                "currency": currency or "USD",
+                "income": 0.0,
+                "expense": 0.0,
+                "categories": []
+            }
+        if category_type is None:  # No transactions in the period
+            continue
+        amount = float(total or 0)
+        if category_type == CategoryType.INCOME:
+            digest["income"] += amount
+        else:
+            digest["expense"] += amount
+        name = name_ru if digest["language"] == "ru" else name_en
+        digest["categories"].append((icon, name, amount))
+    return digests
+
+
+def format_digest(kind: str, digest: dict, start: date, end: date) -> str:
+    """Render one digest using the same layout as the interactive reports"""
+    language = digest["language"]
+    currency = digest["currency"]
+    title_key = 'weekly_report' if kind == WEEKLY else 'monthly_report'
+    net_amount = digest["income"] - digest["expense"]
+    last_day = end - timedelta(days=1)
+
+    message = f"**{get_translation(title_key, language)}**\n\n"
+    message += f"**{get_translation('period', language)}**: {start.strftime('%Y-%m-%d')} - {last_day.strftime('%Y-%m-%d')}\n\n"
+    if not digest["categories"]:
+        return message + get_translation('digest_no_activity', language)
+    message += f"**{get_translation('total_income', language)}**: {currency} {digest['income']:,.2f}\n"
+    message += f"**{get_translation('total_expense', language)}**: {currency} {digest['expense']:,.2f}\n"
+    message += f"**{get_translation('net_amount', language)}**: {currency} {net_amount:,.2f}\n\n"
+
+    top = sorted(digest["categories"], key=lambda c: c[2], reverse=True)[:TOP_CATEGORIES]
+    if top:
+        message += f"**{get_translation('by_category', language)}**:\n"
+        for icon, name, amount in top:
+            message += f"{icon} {name}: {currency} {amount:,.2f}\n"
+    return message
+
+
+async def send_due_digests(context: ContextTypes.DEFAULT_TYPE):
+    """Daily job: weekly digests on Mondays, monthly digests on the 1st"""
+    today = datetime.now().date()
+    due = []
+    if today.weekday() == 0:
+        due.append(WEEKLY)
+    if today.day == 1:
+        due.append(MONTHLY)
+    if not due:
+        return
+
+    for kind in due:
+        start, end = get_digest_period(kind, today)
+        db = get_session()
+        try:
+            digests = compute_digests(db, kind, start, end)
+        finally:
+            db.close()
+
+        messages = ((d["telegram_id"], format_digest(kind, d, start, end)) for d in digests.values())
+        result = await fan_out_messages(context.bot, messages, per_second=settings.DIGEST_SEND_RATE)
+        logger.info(f"{kind.capitalize()} digests for {start} - {end}: {len(digests)} computed, {result}")
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import Column, String, Float, DateTime, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from telegram.ext import ContextTypes
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -255,3 +256,8 @@ class ExchangeRateManager:
 
 # Global instance
 exchange_manager = ExchangeRateManager()
+
+
+async def refresh_exchange_rates(context: ContextTypes.DEFAULT_TYPE):
+    """Repeating job: refresh all exchange rates"""
+    await exchange_manager.update_all_rates()
@@ -0,0 +1,139 @@
+"""
+Streaming transaction export (CSV / XLSX) for the Expense Tracker Bot
+
+Rows are pulled from a server-side cursor (yield_per) and pushed through
+generator-based writers into a SpooledTemporaryFile, so memory stays flat
+regardless of how many transactions a user or group has.
+"""
+
+import codecs
+import csv
+import tempfile
+from datetime import datetime, timedelta
+from typing import IO, Iterable, Iterator, Optional, Sequence, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from src.models.transaction import Transaction
+from src.models.category import Category, CategoryType
+
+EXPORT_PERIODS = ("today", "week", "month", "year", "all")
+EXPORT_FORMATS = ("csv", "xlsx")
+EXPORT_BATCH_SIZE = 2000
+SPOOL_MAX_SIZE = 4 * 1024 * 1024  # keep small exports in memory, roll bigger ones to disk
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024  # Telegram Bot API upload limit for documents
+
+HEADER = ("date", "type", "category", "amount", "currency", "description")
+
+
+def get_period_range(period: str, now: Optional[datetime] = None) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Return [start, end) datetimes for an export period; (None, None) means all time"""
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "today":
+        return today, today + timedelta(days=1)
+    if period == "week":
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=7)
+    if period == "month":
+        start = today.replace(day=1)
+        end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+        return start, end
+    if period == "year":
+        start = today.replace(month=1, day=1)
+        return start, start.replace(year=start.year + 1)
+    return None, None
+
+
+def _filtered(query, user_id: int, start: Optional[datetime], end: Optional[datetime]):
+    query = query.filter(Transaction.user_id == user_id)
+    if start is not None:
+        query = query.filter(Transaction.transaction_date >= start, Transaction.transaction_date < end)
+    return query
+
+
+def get_export_fingerprint(db: Session, user_id: int, start: Optional[datetime], end: Optional[datetime]) -> tuple:
+    """Cheap aggregate that changes whenever a row in the period is added, edited or deleted"""
+    row = _filtered(
+        db.query(
+            func.count(Transaction.id),
+            func.max(Transaction.id),
+            func.max(func.coalesce(Transaction.updated_at, Transaction.created_at)),
+            func.sum(Transaction.amount)
+        ),
+        user_id, start, end
+    ).one()
+    return tuple(row)
+
+
+def iter_transaction_rows(db: Session, user_id: int, start: Optional[datetime], end: Optional[datetime],
+                          language: str = "en") -> Iterator[tuple]:
+    """Yield export rows for a user/group, streamed from a server-side cursor"""
+    name_column = Category.name_ru if language == "ru" else Category.name_en
+    query = _filtered(
+        db.query(
+            Transaction.transaction_date,
+            Category.category_type,
+            name_column,
+            Transaction.amount,
+            Transaction.currency,
+            Transaction.description
+        ).join(Category, Transaction.category_id == Category.id),
+        user_id, start, end
+    ).order_by(Transaction.transaction_date, Transaction.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    for transaction_date, category_type, category_name, amount, currency, description in query:
+        yield (
+            transaction_date.strftime("%Y-%m-%d %H:%M") if transaction_date else "",
+            "income" if category_type == CategoryType.INCOME else "expense",
+            category_name,
+            amount,
+            currency,
+            description or ""
+        )
+
+
+def write_csv(rows: Iterable[Sequence], fileobj: IO[bytes]) -> int:
+    """Write rows as UTF-8 CSV (with BOM so Excel detects the encoding); returns row count"""
+    fileobj.write(codecs.BOM_UTF8)
+    writer_stream = codecs.getwriter("utf-8")(fileobj)
+    writer = csv.writer(writer_stream)
+    writer.writerow(HEADER)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_xlsx(rows: Iterable[Sequence], fileobj: IO[bytes]) -> int:
+    """Write rows as XLSX using openpyxl's write-only (streaming) mode; returns row count"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("transactions")
+    sheet.append(HEADER)
+    count = 0
+    for row in rows:
+        sheet.append([float(value) if i == 3 else value for i, value in enumerate(row)])
+        count += 1
+    workbook.save(fileobj)
+    return count
+
+
+def xlsx_available() -> bool:
+    try:
+        import openpyxl  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_export(rows: Iterable[Sequence], fmt: str) -> Tuple[IO[bytes], int]:
+    """Write rows into a SpooledTemporaryFile positioned at 0; returns (file, row count)"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+b")
+    if fmt == "xlsx":
+        count = write_xlsx(rows, spooled)
+    else:
+        count = write_csv(rows, spooled)
+    spooled.seek(0)
+    return spooled, count
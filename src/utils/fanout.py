@@ -0,0 +1,65 @@
+"""
+Rate-limited message fan-out for the Expense Tracker Bot
+
+Used by broadcast-style features (scheduled digests) to send many messages
+to distinct chats without tripping Telegram flood limits.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Iterable, Tuple
+from telegram import Bot
+from telegram.error import Forbidden, RetryAfter, TelegramError
+
+logger = logging.getLogger(__name__)
+
+
+class FanoutResult:
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.blocked = 0
+        self.retries = 0
+
+    def __repr__(self):
+        return f"<FanoutResult(sent={self.sent}, failed={self.failed}, blocked={self.blocked}, retries={self.retries})>"
+
+
+async def fan_out_messages(bot: Bot, messages: Iterable[Tuple[int, str]], per_second: float = 25.0,
+                           max_retries: int = 3, parse_mode: str = 'Markdown') -> FanoutResult:
+    """Send (chat_id, text) pairs at no more than ``per_second`` messages per second.
+
+    A 429 (RetryAfter) pauses the whole fan-out for the requested time and retries
+    the same message; chats that blocked the bot are counted and skipped.
+    """
+    result = FanoutResult()
+    interval = 1.0 / per_second if per_second > 0 else 0.0
+    next_slot = time.monotonic()
+
+    for chat_id, text in messages:
+        for attempt in range(max_retries + 1):
+            delay = next_slot - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_slot = max(next_slot, time.monotonic()) + interval
+            try:
+                await bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                result.sent += 1
+                break
+            except RetryAfter as e:
+                result.retries += 1
+                retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else float(e.retry_after)
+                logger.warning(f"Flood limit hit during fan-out, pausing {retry_after}s")
+                next_slot = time.monotonic() + retry_after
+            except Forbidden:
+                result.blocked += 1
+                break
+            except TelegramError as e:
+                result.failed += 1
+                logger.error(f"Fan-out to chat {chat_id} failed: {e}")
+                break
+        else:
+            result.failed += 1
+
+    return result
@@ -0,0 +1,203 @@
+"""
+Content-addressed cache for generated files (charts, exports)
+
+Files are keyed by a hash of the aggregate data and render parameters they were
+produced from. The first send uploads the bytes and remembers the file_id
+Telegram returns; later sends of the same key reuse that file_id and skip both
+rendering and upload. Raw bytes are kept in a size-bounded on-disk LRU so a
+file can still be re-uploaded if its file_id is rejected.
+
+A renderer returns either bytes or an open binary file rewound to its start;
+a file is streamed to the disk cache and uploaded as is, so large exports are
+never read into memory here, and closed once sent.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+from collections import OrderedDict
+from typing import Any, Awaitable, BinaryIO, Callable, Optional, Union
+from telegram import Message
+from telegram.error import BadRequest
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+BYTES_SUFFIX = ".bin"
+FILE_ID_SUFFIX = ".fid"
+MAX_FILE_IDS = 10000
+
+Rendered = Optional[Union[bytes, BinaryIO]]
+
+
+def make_cache_key(kind: str, *parts: Any) -> str:
+    """Build a stable key from a file kind plus everything that affects its bytes"""
+    payload = json.dumps([kind, parts], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FileCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._file_ids: dict = {}
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def _load(self):
+        """Index files left on disk by a previous run, least recently used first"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            names = os.listdir(self.directory)
+        except OSError as e:
+            logger.warning(f"File cache directory {self.directory} unavailable: {e}")
+            return
+
+        blobs = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if name.endswith(BYTES_SUFFIX):
+                stat = os.stat(path)
+                blobs.append((stat.st_mtime, name[:-len(BYTES_SUFFIX)], stat.st_size))
+            elif name.endswith(FILE_ID_SUFFIX):
+                with open(path, "r", encoding="utf-8") as f:
+                    self._file_ids[name[:-len(FILE_ID_SUFFIX)]] = f.read().strip()
+
+        for _, key, size in sorted(blobs):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used files until the cache fits its budget"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self._file_ids.pop(key, None)
+            for suffix in (BYTES_SUFFIX, FILE_ID_SUFFIX):
+                try:
+                    os.remove(self._path(key, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def get_file_id(self, key: str) -> Optional[str]:
+        return self._file_ids.get(key)
+
+    def set_file_id(self, key: str, file_id: str):
+        self._file_ids[key] = file_id
+        # file_ids of files too large for the disk cache live only here; keep the map bounded
+        while len(self._file_ids) > MAX_FILE_IDS:
+            self._file_ids.pop(next(iter(self._file_ids)))
+        if key in self._entries:
+            with open(self._path(key, FILE_ID_SUFFIX), "w", encoding="utf-8") as f:
+                f.write(file_id)
+
+    def forget_file_id(self, key: str):
+        self._file_ids.pop(key, None)
+        try:
+            os.remove(self._path(key, FILE_ID_SUFFIX))
+        except FileNotFoundError:
+            pass
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Read cached bytes and mark the entry as recently used"""
+        if key not in self._entries:
+            return None
+        path = self._path(key, BYTES_SUFFIX)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            self._total_bytes -= self._entries.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def put_bytes(self, key: str, data: bytes):
+        """Store bytes for a key; files larger than the whole budget are not kept"""
+        self.put_file(key, io.BytesIO(data))
+
+    def put_file(self, key: str, file: BinaryIO):
+        """Copy an open binary file to the cache for a key, leaving it rewound"""
+        size = file.seek(0, 2)
+        file.seek(0)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._total_bytes -= self._entries.pop(key)
+        tmp_path = self._path(key, BYTES_SUFFIX + ".tmp")
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(file, f)
+        file.seek(0)
+        os.replace(tmp_path, self._path(key, BYTES_SUFFIX))
+        self._entries[key] = size
+        self._total_bytes += size
+        self._evict()
+
+    async def _send(self, key: str, render: Callable[[], Awaitable[Rendered]],
+                    send: Callable[[Any], Awaitable[Message]], extract_file_id: Callable[[Message], str]) -> bool:
+        file_id = self.get_file_id(key)
+        if file_id:
+            try:
+                await send(file_id)
+                self.hits += 1
+                return True
+            except BadRequest as e:
+                # file_ids are bot scoped and may expire; fall back to re-uploading
+                logger.info(f"Cached file_id rejected for {key[:12]}: {e}")
+                self.forget_file_id(key)
+
+        self.misses += 1
+        data = self.get_bytes(key)
+        if data is None:
+            data = await render()
+            if data is None:
+                return False
+            if isinstance(data, bytes):
+                self.put_bytes(key, data)
+            else:
+                self.put_file(key, data)
+
+        try:
+            sent = await send(data)
+        finally:
+            if not isinstance(data, bytes):
+                data.close()
+        new_file_id = extract_file_id(sent)
+        if new_file_id:
+            self.set_file_id(key, new_file_id)
+        return True
+
+    async def send_photo(self, message: Message, key: str, render: Callable[[], Awaitable[Rendered]],
+                         caption: Optional[str] = None) -> bool:
+        """Reply with a cached photo, rendering and uploading it only on a miss"""
+        return await self._send(
+            key,
+            render,
+            lambda photo: message.reply_photo(photo=photo, caption=caption),
+            lambda sent: sent.photo[-1].file_id if sent and sent.photo else None
+        )
+
+    async def send_document(self, message: Message, key: str, render: Callable[[], Awaitable[Rendered]],
+                            filename: str, caption: Optional[str] = None) -> bool:
+        """Reply with a cached document, rendering and uploading it only on a miss"""
+        return await self._send(
+            key,
+            render,
+            lambda document: message.reply_document(document=document, filename=filename, caption=caption),
+            lambda sent: sent.document.file_id if sent and sent.document else None
+        )
+
+
+# Global instance
+file_cache = FileCache(settings.FILE_CACHE_DIR, settings.FILE_CACHE_MAX_BYTES)
@@ -0,0 +1,211 @@
+"""
+Cross-replica cache invalidation for the Expense Tracker Bot
+
+Each bot process keeps per-user caches (the recent transactions buffer and
+the category matchers). When several replicas or shards run, a write on one
+of them has to evict the matching entries on the others.
+
+Publishing: ORM flushes that touch a Transaction, Category or User row mark
+(user_id, entity) on the session; right before the session commits, all
+marks go out in one pg_notify statement on the cache_invalidation channel,
+inside the same transaction, so nothing is announced for a rolled back write
+and every committed one is. Writes that bypass the ORM flush (Core inserts
+of batch entry, statement import, recurring rules) mark their changes with
+notify_changed().
+
+Payload: "<origin> <user_id> <entity> <version>", where origin identifies the
+publishing process (it skips its own notifications; its caches were already
+updated in place), user_id 0 means "all users" and version is the publish
+time in milliseconds, which also gives the propagation lag.
+
+Consuming: CacheInvalidationListener holds a LISTEN connection whose socket
+is watched by the event loop (loop.add_reader), so notifications are handled
+between updates without a polling thread. If the connection drops, it
+reconnects and clears every cache, since notifications may have been missed.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from itertools import chain
+from typing import Callable, Dict, Optional
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from src.database.connection import engine
+from src.models.category import Category
+from src.models.transaction import Transaction
+from src.models.user import User
+from src.utils.category_matcher import CategoryMatcherCache, category_matchers
+from src.utils.recent_transactions import RecentTransactionsCache, recent_transactions
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+RECONNECT_DELAY = 1.0
+
+TRANSACTION = "transaction"
+CATEGORY = "category"
+SETTINGS = "settings"
+ALL_USERS = 0
+
+REPLICA_ID = f"{socket.gethostname()}:{os.getpid()}"
+PENDING_KEY = "cache_invalidation"  # session.info key of the (user_id, entity) marks
+ORIGIN_KEY = "cache_invalidation_origin"  # optional per-session origin override
+
+NOTIFY_SQL = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload")
+
+
+def notify_changed(db: Session, user_id: int, entity: str):
+    """Announce a change made outside the ORM when ``db`` commits; user_id 0 means all users"""
+    db.info.setdefault(PENDING_KEY, set()).add((user_id, entity))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context):
+    pending = session.info.setdefault(PENDING_KEY, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Transaction):
+            pending.add((obj.user_id, TRANSACTION))
+        elif isinstance(obj, Category):
+            pending.add((obj.user_id, CATEGORY))
+        elif isinstance(obj, User):
+            pending.add((obj.id, SETTINGS))
+
+
+@event.listens_for(Session, "before_commit")
+def _publish_changes(session: Session):
+    # The commit's own flush runs after this hook; flush first so its changes are collected
+    session.flush()
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending or session.get_bind().dialect.name != "postgresql":
+        return
+    origin = session.info.get(ORIGIN_KEY, REPLICA_ID)
+    version = int(time.time() * 1000)
+    payloads = [f"{origin} {user_id} {entity} {version}" for user_id, entity in pending if user_id is not None]
+    session.execute(NOTIFY_SQL, {"channel": CHANNEL, "payloads": payloads})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session):
+    session.info.pop(PENDING_KEY, None)
+
+
+class CacheInvalidationListener:
+    def __init__(self, recent: RecentTransactionsCache, matchers: CategoryMatcherCache, origin: str = REPLICA_ID):
+        self.recent = recent
+        self.matchers = matchers
+        self.origin = origin
+        self._handlers: Dict[str, Callable[[int], None]] = {}
+        self._connection = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.received = 0
+        self.applied = 0
+        self.reconnects = 0
+        self.lag_total_ms = 0
+        self.lag_max_ms = 0
+
+    def on(self, entity: str, handler: Callable[[int], None]):
+        """Route another entity's notifications to ``handler``; it is also called with 0 after a reconnect"""
+        self._handlers[entity] = handler
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._connect()
+
+    async def stop(self):
+        self._disconnect()
+        self._loop = None
+
+    def _connect(self):
+        connection = engine.raw_connection()
+        dbapi = connection.driver_connection
+        dbapi.autocommit = True
+        cursor = dbapi.cursor()
+        cursor.execute(f"LISTEN {CHANNEL}")
+        cursor.close()
+        self._connection = connection
+        self._loop.add_reader(dbapi.fileno(), self._on_readable)
+        logger.info(f"Listening for cache invalidations as {self.origin}")
+
+    def _disconnect(self):
+        if self._connection is None:
+            return
+        try:
+            self._loop.remove_reader(self._connection.driver_connection.fileno())
+        except Exception:
+            pass
+        try:
+            self._connection.invalidate()
+        except Exception:
+            pass
+        self._connection = None
+
+    def _reconnect(self):
+        if self._loop is None:
+            return
+        try:
+            self._connect()
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener reconnect failed: {e}")
+            self._loop.call_later(RECONNECT_DELAY, self._reconnect)
+            return
+        self.reconnects += 1
+        # Notifications sent while we were away are gone
+        self.clear_all()
+        for handler in self._handlers.values():
+            handler(ALL_USERS)
+
+    def _on_readable(self):
+        dbapi = self._connection.driver_connection
+        try:
+            dbapi.poll()
+        except Exception as e:
+            logger.warning(f"Cache invalidation connection lost: {e}")
+            self._disconnect()
+            self._loop.call_later(RECONNECT_DELAY, self._reconnect)
+            return
+        while dbapi.notifies:
+            self.handle(dbapi.notifies.pop(0).payload)
+
+    def handle(self, payload: str):
+        self.received += 1
+        try:
+            origin, user_id, entity, version = payload.split(" ")
+            user_id, version = int(user_id), int(version)
+        except ValueError:
+            logger.warning(f"Malformed cache invalidation: {payload!r}")
+            return
+        if origin == self.origin:
+            return
+        if entity in self._handlers:
+            self._handlers[entity](user_id)
+        elif user_id == ALL_USERS:
+            self.clear_all()
+        else:
+            # Language and currency are baked into rendered lines, category names and icons too
+            self.recent.invalidate_user(user_id)
+            if entity == CATEGORY:
+                self.matchers.invalidate(user_id)
+        self.applied += 1
+        lag = max(0, int(time.time() * 1000) - version)
+        self.lag_total_ms += lag
+        self.lag_max_ms = max(self.lag_max_ms, lag)
+
+    def clear_all(self):
+        self.recent.clear()
+        self.matchers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "received": self.received,
+            "applied": self.applied,
+            "reconnects": self.reconnects,
+            "avg_lag_ms": round(self.lag_total_ms / self.applied, 1) if self.applied else 0.0,
+            "max_lag_ms": self.lag_max_ms,
+        }
+
+
+# Global instance
+cache_invalidation = CacheInvalidationListener(recent_transactions, category_matchers)
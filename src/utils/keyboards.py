@@ -1,8 +1,18 @@
+"""
+Prebuilt inline keyboards for the Expense Tracker Bot
+
+InlineKeyboardMarkup objects are immutable in python-telegram-bot 20, so each
+keyboard is built once per language and shared across updates. Keyboards that
+show dates (the today/yesterday picker) are cached per day.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
 from telegram import InlineKeyboardMarkup, InlineKeyboardButton
 from src.utils.translations import get_translation
 
-def get_amount_keyboard(language: str = "en"):
-    """Create a compact numeric keyboard for amount input"""
+
+def _build_amount_keyboard(language: str) -> InlineKeyboardMarkup:
     keyboard = [
         [InlineKeyboardButton("1", callback_data="amount_1"), InlineKeyboardButton("2", callback_data="amount_2"), InlineKeyboardButton("3", callback_data="amount_3"), InlineKeyboardButton("⌫", callback_data="amount_backspace")],
         [InlineKeyboardButton("4", callback_data="amount_4"), InlineKeyboardButton("5", callback_data="amount_5"), InlineKeyboardButton("6", callback_data="amount_6"), InlineKeyboardButton(".", callback_data="amount_dot")],
@@ -10,3 +20,118 @@ def get_amount_keyboard(language: str = "en"):
         [InlineKeyboardButton("0", callback_data="amount_0"), InlineKeyboardButton(get_translation("enter", language), callback_data="amount_enter")]
     ]
     return InlineKeyboardMarkup(keyboard)
+
+
+def _build_main_menu(language: str) -> InlineKeyboardMarkup:
+    keyboard = [
+        [InlineKeyboardButton(get_translation("add_expense", language), callback_data="add_expense")],
+        [InlineKeyboardButton(get_translation("add_income", language), callback_data="add_income")],
+        [InlineKeyboardButton(get_translation("manage_transactions", language), callback_data="manage_transactions")],
+        [InlineKeyboardButton(get_translation("view_reports", language), callback_data="view_reports")],
+        [InlineKeyboardButton(get_translation("settings", language), callback_data="settings")]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+
+def _build_reports_menu(language: str) -> InlineKeyboardMarkup:
+    keyboard = [
+        [InlineKeyboardButton(get_translation('balance', language), callback_data="balance_report")],
+        [InlineKeyboardButton(get_translation('analytics', language), callback_data="analytics")],
+        [InlineKeyboardButton(get_translation('weekly_report', language), callback_data="weekly_report")],
+        [InlineKeyboardButton(get_translation('monthly_report', language), callback_data="monthly_report")],
+        [InlineKeyboardButton(get_translation('yearly_report', language), callback_data="yearly_report")],
+        [InlineKeyboardButton(get_translation('category_breakdown', language), callback_data="category_breakdown")],
+        [InlineKeyboardButton(get_translation('custom_period', language), callback_data="custom_period")],
+        [InlineKeyboardButton(get_translation('compare_periods', language), callback_data="compare_report")],
+        [InlineKeyboardButton(get_translation('back_to_main', language), callback_data="main_menu")]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+
+def _build_settings_menu(language: str) -> InlineKeyboardMarkup:
+    keyboard = [
+        [InlineKeyboardButton(get_translation("language_settings", language), callback_data="language_settings")],
+        [InlineKeyboardButton(get_translation("currency_settings", language), callback_data="currency_settings")],
+        [InlineKeyboardButton(get_translation("manage_categories", language), callback_data="manage_categories")],
+        [InlineKeyboardButton(get_translation("balance_settings", language), callback_data="balance_settings")],
+        [InlineKeyboardButton(get_translation("digest_settings", language), callback_data="digest_settings")],
+        [InlineKeyboardButton(get_translation("back_to_main", language), callback_data="main_menu")]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+
+def _build_date_keyboard(language: str, today: date) -> InlineKeyboardMarkup:
+    yesterday = today - timedelta(days=1)
+    keyboard = [
+        [InlineKeyboardButton(
+            f"📅 {get_translation('today', language)} ({today.strftime('%d.%m.%Y')})",
+            callback_data="select_date_today"
+        )],
+        [InlineKeyboardButton(
+            f"📅 {get_translation('yesterday', language)} ({yesterday.strftime('%d.%m.%Y')})",
+            callback_data="select_date_yesterday"
+        )],
+        [InlineKeyboardButton(get_translation('custom_date', language), callback_data="select_date_custom")],
+        [InlineKeyboardButton(get_translation('back_to_main', language), callback_data="main_menu")]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+
+class KeyboardRegistry:
+    """Per-language cache of static keyboards plus a per-day cache of date keyboards"""
+
+    def __init__(self):
+        self._builders: Dict[str, Callable[[str], InlineKeyboardMarkup]] = {
+            "amount": _build_amount_keyboard,
+            "main_menu": _build_main_menu,
+            "reports_menu": _build_reports_menu,
+            "settings_menu": _build_settings_menu,
+        }
+        self._static: Dict[Tuple[str, str], InlineKeyboardMarkup] = {}
+        self._dated: Dict[Tuple[str, str], InlineKeyboardMarkup] = {}
+        self._day: Optional[date] = None
+
+    def get(self, name: str, language: str) -> InlineKeyboardMarkup:
+        key = (name, language)
+        markup = self._static.get(key)
+        if markup is None:
+            markup = self._static[key] = self._builders[name](language)
+        return markup
+
+    def get_date_keyboard(self, language: str, today: Optional[date] = None) -> InlineKeyboardMarkup:
+        today = today or datetime.now().date()
+        if today != self._day:
+            # New day: yesterday's labels are stale, drop them all at once
+            self._dated.clear()
+            self._day = today
+        key = ("date", language)
+        markup = self._dated.get(key)
+        if markup is None:
+            markup = self._dated[key] = _build_date_keyboard(language, today)
+        return markup
+
+
+# Global instance
+keyboards = KeyboardRegistry()
+
+
+def get_amount_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+    """Compact numeric keyboard for amount input"""
+    return keyboards.get("amount", language)
+
+
+def get_date_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+    """Today / yesterday / custom date picker used by the add-transaction flow"""
+    return keyboards.get_date_keyboard(language)
+
+
+def get_main_menu_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+    return keyboards.get("main_menu", language)
+
+
+def get_reports_menu_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+    return keyboards.get("reports_menu", language)
+
+
+def get_settings_menu_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+    return keyboards.get("settings_menu", language)
@@ -0,0 +1,145 @@
+"""
+Leader election for the Expense Tracker Bot
+
+Every replica (or shard) schedules the same background jobs, but only the
+current leader runs them. Leadership is a Postgres session-level advisory
+lock held on a dedicated connection:
+
+- each replica tries pg_try_advisory_lock every LEADER_CHECK_INTERVAL
+  seconds; whoever holds it is leader;
+- the leader re-checks its connection on the same schedule and steps down
+  as soon as it fails, or when no check has succeeded for LEASE_CHECKS
+  intervals (a check stuck on a half-open connection);
+- when the leader process dies or its connection drops, Postgres releases
+  the lock and another replica takes over on its next check, so failover
+  takes a few seconds.
+
+The election connection's application_name is the replica id, which lets
+every replica (and an operator) see who the leader is via pg_stat_activity.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import socket
+import time
+from typing import Awaitable, Callable, Optional
+from telegram.ext import ContextTypes
+from config.settings import settings
+from src.database.connection import engine
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary, fixed advisory lock key for the job leader
+LEADER_LOCK_KEY = 727_001
+LEASE_CHECKS = 3
+
+# Who holds the lock; a bigint key shows up as classid (high half) / objid (low half), objsubid 1
+CURRENT_LEADER_SQL = """
+    SELECT a.application_name
+    FROM pg_locks l
+    JOIN pg_stat_activity a ON a.pid = l.pid
+    WHERE l.locktype = 'advisory' AND l.granted
+      AND l.classid = 0 AND l.objid = %s AND l.objsubid = 1
+"""
+
+
+class LeaderElection:
+    def __init__(self, check_interval: float, lock_key: int = LEADER_LOCK_KEY, replica_id: Optional[str] = None):
+        self.check_interval = check_interval
+        self.lock_key = lock_key
+        self.replica_id = replica_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.is_leader = False
+        self.current_leader: Optional[str] = None
+        self.leader_since: Optional[float] = None
+        self.transitions = 0
+        self._confirmed_at = 0.0
+        self._connection = None
+
+    def _connect(self):
+        connection = engine.raw_connection()
+        cursor = connection.cursor()
+        cursor.execute("SET application_name = %s", (f"expense-bot {self.replica_id}"[:63],))
+        cursor.close()
+        connection.commit()
+        return connection
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.invalidate()
+            except Exception:
+                pass
+            self._connection = None
+
+    def check(self) -> bool:
+        """Try to become (or verify we still are) leader; blocking, call from a worker thread"""
+        try:
+            if self._connection is None:
+                self._connection = self._connect()
+            cursor = self._connection.cursor()
+            if self.is_leader:
+                cursor.execute("SELECT 1")
+                leader = True
+            else:
+                cursor.execute("SELECT pg_try_advisory_lock(%s)", (self.lock_key,))
+                leader = cursor.fetchone()[0]
+            cursor.execute(CURRENT_LEADER_SQL, (self.lock_key,))
+            row = cursor.fetchone()
+            self.current_leader = row[0] if row else None
+            cursor.close()
+            self._connection.commit()
+            self._confirmed_at = time.monotonic()
+        except Exception as e:
+            # A dead connection has already released the lock on the server side
+            logger.warning(f"Leader election check failed: {e}")
+            self._close()
+            leader = False
+            self.current_leader = None
+        self._set_leader(leader)
+        return leader
+
+    def _set_leader(self, leader: bool):
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        self.transitions += 1
+        self.leader_since = time.time() if leader else None
+        logger.info(f"Replica {self.replica_id} {'became' if leader else 'is no longer'} job leader")
+
+    def holds_lease(self) -> bool:
+        """Leader with a recent successful check"""
+        return self.is_leader and time.monotonic() - self._confirmed_at < LEASE_CHECKS * self.check_interval
+
+    async def run_check(self, context: ContextTypes.DEFAULT_TYPE):
+        """Repeating job: refresh leadership"""
+        await asyncio.to_thread(self.check)
+
+    def resign(self):
+        """Release leadership (on shutdown) so another replica takes over at its next check"""
+        self._close()
+        self._set_leader(False)
+
+    def leader_only(self, callback: Callable[[ContextTypes.DEFAULT_TYPE], Awaitable]) -> Callable:
+        """Wrap a job callback so it only runs on the leader"""
+        @functools.wraps(callback)
+        async def wrapper(context: ContextTypes.DEFAULT_TYPE):
+            if not self.holds_lease():
+                logger.debug("Skipping job %s: not the leader", callback.__name__)
+                return
+            await callback(context)
+        return wrapper
+
+    def stats(self) -> dict:
+        return {
+            "replica": self.replica_id,
+            "is_leader": self.is_leader,
+            "leader": self.current_leader,
+            "leader_for_s": round(time.time() - self.leader_since) if self.leader_since else 0,
+            "transitions": self.transitions,
+        }
+
+
+# Global instance
+leader_election = LeaderElection(settings.LEADER_CHECK_INTERVAL)
@@ -0,0 +1,114 @@
+"""
+Logging pipeline for the Expense Tracker Bot
+
+Log calls on the event loop only snapshot the record and put it on an
+in-memory queue; a QueueListener thread redacts, formats and writes it, so
+slow stdout/file I/O never blocks update handling.
+
+- Redaction uses one regex compiled at startup from the configured bot token
+  and webhook secret (plus the generic "bot<id>:<secret>" shape of Telegram
+  API URLs) and runs once per record in the listener thread.
+- DEBUG records are sampled per call site: the first one and then every
+  LOG_DEBUG_SAMPLE_RATE-th one pass. Call sites need lazy %-style arguments
+  (logger.debug("x=%s", x)) for this, which also skips formatting entirely
+  when the level is disabled.
+- LOG_FORMAT=json writes one JSON object per line.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import re
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, Optional, Tuple
+from config.settings import settings
+
+REDACTED = "***"
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def build_redaction_pattern(secrets: Iterable[str]) -> "re.Pattern":
+    """One alternation over the given secrets and the Telegram API URL token shape"""
+    alternatives = [re.escape(secret) for secret in sorted(set(filter(None, secrets)), key=len, reverse=True)]
+    alternatives.append(r"(?<=bot)\d+:[A-Za-z0-9_-]{20,}")
+    return re.compile("|".join(alternatives))
+
+
+class SnapshotQueueHandler(QueueHandler):
+    """Queues a record with its message merged, leaving formatting and I/O to the listener"""
+
+    def __init__(self, log_queue: queue.Queue, sample_rate: int = 1):
+        super().__init__(log_queue)
+        self.sample_rate = sample_rate
+        self._debug_seen: Dict[Tuple[str, int], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.DEBUG and self.sample_rate > 1:
+            key = (record.pathname, record.lineno)
+            seen = self._debug_seen.get(key, 0)
+            self._debug_seen[key] = seen + 1
+            if seen % self.sample_rate:
+                return False
+        return super().filter(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments may be mutated after the call returns, so merge them now;
+        # tracebacks reference live frames and are rendered now as well
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.msg, record.args = message, None
+        record.exc_info, record.exc_text = None, exc_text
+        return record
+
+
+class RedactingQueueListener(QueueListener):
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, pattern: "re.Pattern"):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.pattern = pattern
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = self.pattern.sub(REDACTED, record.msg)
+        if record.exc_text:
+            record.exc_text = self.pattern.sub(REDACTED, record.exc_text)
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level: Optional[str] = None) -> RedactingQueueListener:
+    """Route all logging through the queue pipeline; safe to call once at startup"""
+    log_queue: queue.Queue = queue.Queue(-1)
+    output = logging.StreamHandler()
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    pattern = build_redaction_pattern([settings.TELEGRAM_BOT_TOKEN, settings.webhook_secret])
+    listener = RedactingQueueListener(log_queue, output, pattern=pattern)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(SnapshotQueueHandler(log_queue, settings.LOG_DEBUG_SAMPLE_RATE))
+    root.setLevel(getattr(logging, level or settings.LOG_LEVEL))
+    # httpx logs every Bot API request URL at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,334 @@
+"""
+Conversation state persistence for the Expense Tracker Bot
+
+Input flows keep their state in context.user_data (amount_buffer,
+selected_category_id, selected_date, voice_description, the waiting_for_*
+flags, ...). DatabasePersistence stores it in the compact conversation_state
+table (scope, Telegram id, JSON text, updated_at) so a deploy or restart does
+not drop half-finished entries:
+
+- PTB hands over the user_data of every user touched since its last run each
+  PERSISTENCE_FLUSH_INTERVAL seconds; changed entries of one run are written
+  with a single upsert (and emptied ones removed with a single delete) in one
+  transaction, off the event loop. Unchanged entries are not written.
+- Flows untouched for CONVERSATION_TTL_MINUTES are abandoned: a sweep job
+  drops them from memory and deletes expired rows, so both stay bounded by
+  the number of recently active users.
+- On startup only unexpired rows are loaded.
+- Shards (BOT_MODE=worker) route by chat, so one user's private and group
+  updates may run on different workers, each with its own user_data. Rows
+  are therefore scoped to the shard layout ("<index>/<count>"; empty when not
+  sharded) and a worker only loads and writes its own. After a reshard the
+  old rows are ignored and expire.
+- Replicas of the same scope (webhook mode behind a load balancer) announce
+  every write on the cache invalidation channel; the others mark the user
+  stale and refresh_user_data reloads the row before that user's next update.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Optional, Set
+from sqlalchemy import text
+from telegram.ext import BasePersistence, ContextTypes, PersistenceInput
+from src.database.connection import engine
+from src.models.category import CategoryType
+from src.utils.invalidation import ALL_USERS, CHANNEL, REPLICA_ID
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_SWEEP_INTERVAL = 300  # seconds
+CONVERSATION = "conversation"  # Invalidation entity; its user id is the Telegram id
+
+# Non-JSON values flows keep in user_data, stored as {"$<tag>": value}
+ENUMS = {"CategoryType": CategoryType}
+
+LOAD_SQL = text("""
+    SELECT telegram_id, data, EXTRACT(EPOCH FROM now() - updated_at) AS age
+    FROM conversation_state
+    WHERE scope = :scope AND updated_at > now() - make_interval(secs => :ttl)
+""")
+
+LOAD_ONE_SQL = text("""
+    SELECT data, EXTRACT(EPOCH FROM now() - updated_at) AS age
+    FROM conversation_state
+    WHERE scope = :scope AND telegram_id = :telegram_id
+""")
+
+UPSERT_SQL = text("""
+    INSERT INTO conversation_state (scope, telegram_id, data, updated_at)
+    SELECT :scope, state.telegram_id, state.data, now()
+    FROM unnest(CAST(:telegram_ids AS bigint[]), CAST(:states AS text[])) AS state (telegram_id, data)
+    ON CONFLICT (scope, telegram_id) DO UPDATE SET data = EXCLUDED.data, updated_at = EXCLUDED.updated_at
+""")
+
+DELETE_SQL = text("DELETE FROM conversation_state WHERE scope = :scope AND telegram_id = ANY(CAST(:telegram_ids AS bigint[]))")
+
+NOTIFY_SQL = text("""
+    SELECT pg_notify(:channel, :origin || ' ' || telegram_id || ' conversation ' || :version)
+    FROM unnest(CAST(:telegram_ids AS bigint[])) AS telegram_id
+""")
+
+EXPIRE_SQL = text("DELETE FROM conversation_state WHERE updated_at < now() - make_interval(secs => :ttl)")
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, Enum) and type(value).__name__ in ENUMS:
+        return {"$enum": type(value).__name__, "value": value.value}
+    raise TypeError(f"Cannot persist {type(value).__name__} in user_data")
+
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    if "$datetime" in obj:
+        return datetime.fromisoformat(obj["$datetime"])
+    if "$date" in obj:
+        return date.fromisoformat(obj["$date"])
+    if "$enum" in obj:
+        return ENUMS[obj["$enum"]](obj["value"])
+    return obj
+
+
+def encode_state(data: Dict[str, Any]) -> str:
+    return json.dumps(data, default=_encode_value, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_state(state: str) -> Dict[str, Any]:
+    return json.loads(state, object_hook=_decode_object)
+
+
+class DatabasePersistence(BasePersistence):
+    def __init__(self, flush_interval: float = 0.3, ttl: float = 7200, scope: str = ""):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=flush_interval,
+        )
+        self.ttl = ttl
+        self.scope = scope
+        self._pending: Dict[int, Optional[str]] = {}  # Telegram id -> JSON to upsert, None to delete
+        self._stored: Dict[int, int] = {}  # Telegram id -> hash of the JSON last written, for users with a row
+        self._written_at: Dict[int, float] = {}
+        self._touched_at: Dict[int, float] = {}
+        self._stale: Set[int] = set()  # Users another replica wrote since we last read them
+        self._flush_task: Optional[asyncio.Task] = None
+        # Batches commit in order, so an older state never overwrites a newer one
+        self._write_lock = asyncio.Lock()
+
+        self.flushes = 0
+        self.rows_written = 0
+        self.rows_deleted = 0
+        self.flush_time_max = 0.0
+        self.expired = 0
+        self.refreshed = 0
+
+    # user_data
+
+    async def get_user_data(self) -> Dict[int, Dict[Any, Any]]:
+        rows = await asyncio.to_thread(self._load)
+        now = time.monotonic()
+        user_data = {}
+        for telegram_id, state, age in rows:
+            try:
+                user_data[telegram_id] = decode_state(state)
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Dropping unreadable conversation state of {telegram_id}: {e}")
+                continue
+            self._stored[telegram_id] = hash(state)
+            self._written_at[telegram_id] = now - float(age)
+            self._touched_at[telegram_id] = now - float(age)
+        logger.info(f"Restored conversation state of {len(user_data)} users")
+        return user_data
+
+    def _load(self):
+        with engine.connect() as connection:
+            return connection.execute(LOAD_SQL, {"scope": self.scope, "ttl": self.ttl}).all()
+
+    async def update_user_data(self, user_id: int, data: Dict[Any, Any]) -> None:
+        now = time.monotonic()
+        self._touched_at[user_id] = now
+        if not data:
+            if user_id not in self._stored:
+                return
+            self._pending[user_id] = None
+        else:
+            try:
+                state = encode_state(data)
+            except TypeError as e:
+                logger.error(f"Conversation state of {user_id} not persisted: {e}")
+                return
+            # Rewrite unchanged state once in a while so its row does not expire under an active user
+            if self._stored.get(user_id) == hash(state) and now - self._written_at[user_id] < self.ttl / 2:
+                return
+            self._pending[user_id] = state
+        await self._flush_soon()
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._touched_at.pop(user_id, None)
+        if user_id in self._stored:
+            self._pending[user_id] = None
+            await self._flush_soon()
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict[Any, Any]) -> None:
+        """Called before each update; reloads the row only if another replica wrote it since"""
+        # Local changes not yet written are newer than what the other replica saw
+        if user_id not in self._stale or user_id in self._pending:
+            return
+        self._stale.discard(user_id)
+        row = await asyncio.to_thread(self._load_one, user_id)
+        user_data.clear()
+        if row is None:
+            self._stored.pop(user_id, None)
+            self._written_at.pop(user_id, None)
+        else:
+            state, age = row
+            user_data.update(decode_state(state))
+            self._stored[user_id] = hash(state)
+            self._written_at[user_id] = time.monotonic() - float(age)
+        self.refreshed += 1
+
+    def _load_one(self, telegram_id: int):
+        with engine.connect() as connection:
+            return connection.execute(LOAD_ONE_SQL, {"scope": self.scope, "telegram_id": telegram_id}).first()
+
+    def mark_stale(self, telegram_id: int):
+        """Invalidation handler: another replica wrote this user's state (0: maybe anyone's)"""
+        if telegram_id == ALL_USERS:
+            self._stale.update(self._touched_at)
+        elif telegram_id in self._touched_at:
+            self._stale.add(telegram_id)
+
+    # Batched writes
+
+    async def _flush_soon(self):
+        """Join the write of the current batch; PTB updates all touched users at once, so they share it"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_batch())
+        await asyncio.shield(self._flush_task)
+
+    async def _flush_batch(self):
+        # Let the other update_user_data calls of this run add their entries first
+        await asyncio.sleep(0)
+        self._flush_task = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        started = time.monotonic()
+        try:
+            async with self._write_lock:
+                await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            # Keep the entries for the next run unless newer ones arrived meanwhile
+            logger.error(f"Writing conversation state of {len(batch)} users failed: {e}")
+            for telegram_id, state in batch.items():
+                self._pending.setdefault(telegram_id, state)
+            return
+        finished = time.monotonic()
+        for telegram_id, state in batch.items():
+            if state is None:
+                self._stored.pop(telegram_id, None)
+                self._written_at.pop(telegram_id, None)
+            else:
+                self._stored[telegram_id] = hash(state)
+                self._written_at[telegram_id] = finished
+        self.flushes += 1
+        self.flush_time_max = max(self.flush_time_max, finished - started)
+
+    def _write(self, batch: Dict[int, Optional[str]]):
+        upserts = {telegram_id: state for telegram_id, state in batch.items() if state is not None}
+        deletes = [telegram_id for telegram_id, state in batch.items() if state is None]
+        with engine.begin() as connection:
+            if upserts:
+                connection.execute(UPSERT_SQL, {
+                    "scope": self.scope, "telegram_ids": list(upserts), "states": list(upserts.values()),
+                })
+            if deletes:
+                connection.execute(DELETE_SQL, {"scope": self.scope, "telegram_ids": deletes})
+            connection.execute(NOTIFY_SQL, {
+                "channel": CHANNEL, "origin": REPLICA_ID, "version": str(int(time.time() * 1000)),
+                "telegram_ids": list(batch),
+            })
+        self.rows_written += len(upserts)
+        self.rows_deleted += len(deletes)
+
+    async def flush(self) -> None:
+        """Called on shutdown after the last update run"""
+        if self._flush_task is not None:
+            await self._flush_task
+        if self._pending:
+            await self._flush_batch()
+
+    # Expiry
+
+    async def expire_flows(self, context: ContextTypes.DEFAULT_TYPE):
+        """Repeating job: forget flows untouched for the TTL, in memory and in the table"""
+        application = context.application
+        cutoff = time.monotonic() - self.ttl
+        expired = [user_id for user_id in application.user_data if self._touched_at.get(user_id, 0) < cutoff]
+        for user_id in expired:
+            application.drop_user_data(user_id)
+            # Its row is at least as old as the last touch; the sweep below deletes it
+            self._touched_at.pop(user_id, None)
+            self._stale.discard(user_id)
+            self._stored.pop(user_id, None)
+            self._written_at.pop(user_id, None)
+        await asyncio.to_thread(self._expire_rows)
+        self.expired += len(expired)
+        if expired:
+            logger.info(f"Expired {len(expired)} abandoned conversation states")
+
+    def _expire_rows(self):
+        with engine.begin() as connection:
+            connection.execute(EXPIRE_SQL, {"ttl": self.ttl})
+
+    # Not persisted: bot_data, chat_data, callback_data, ConversationHandler states
+
+    async def get_chat_data(self) -> Dict[int, Dict[Any, Any]]:
+        return {}
+
+    async def get_bot_data(self) -> Dict[Any, Any]:
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name: str) -> Dict:
+        return {}
+
+    async def update_conversation(self, name: str, key, new_state) -> None:
+        pass
+
+    async def update_chat_data(self, chat_id: int, data: Dict[Any, Any]) -> None:
+        pass
+
+    async def update_bot_data(self, data: Dict[Any, Any]) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Dict[Any, Any]) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._touched_at),
+            "stored": len(self._stored),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "rows_deleted": self.rows_deleted,
+            "max_flush_ms": round(self.flush_time_max * 1000, 1),
+            "expired": self.expired,
+            "refreshed": self.refreshed,
+        }
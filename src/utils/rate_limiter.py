@@ -0,0 +1,162 @@
+"""
+Outbound Telegram rate limiter for the Expense Tracker Bot
+
+Every Bot API call made through the Application passes through
+TelegramRateLimiter. Calls addressed to a chat (sends, edits, uploads) are
+paced by a global limit and by a limit for their chat: private chats get a
+per-second rate with a burst allowance (keypad edits come in quick runs),
+groups the per-minute rate Telegram enforces there. Other calls
+(answerCallbackQuery, getFile, getUpdates) are not paced.
+
+Pacing reserves a send slot per limit (GCRA) without locks: the event loop
+is single-threaded, so taking a slot never races. A 429 pauses all calls for
+the requested retry_after and the call is retried up to
+RATE_LIMIT_MAX_RETRIES times. A call already holding its slots when a pause
+starts waits the pause out without reserving new ones, so the slots are not
+wasted.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Coroutine, Dict, Optional, Union
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_CHATS = 10000
+
+
+class Pacer:
+    """Generic cell rate algorithm: ``rate`` calls per ``period`` seconds with ``burst`` allowed at once"""
+    __slots__ = ("interval", "tolerance", "tat")
+
+    def __init__(self, rate: float, period: float = 1.0, burst: int = 1):
+        self.interval = period / rate
+        self.tolerance = (max(burst, 1) - 1) * self.interval
+        self.tat = 0.0  # theoretical arrival time of the next call
+
+    def reserve(self, now: float) -> float:
+        """Take the next slot; returns how long to wait for it"""
+        tat = max(self.tat, now)
+        start = max(now, tat - self.tolerance)
+        self.tat = tat + self.interval
+        return start - now
+
+
+class TelegramRateLimiter(BaseRateLimiter[int]):
+    def __init__(self, global_rate: float = 30, chat_rate: float = 1, chat_burst: int = 10,
+                 group_rate_per_minute: float = 20, max_retries: int = 3):
+        self.global_pacer = Pacer(global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate_per_minute = group_rate_per_minute
+        self.max_retries = max_retries
+        self._chat_pacers: "OrderedDict[int, Pacer]" = OrderedDict()
+        self._paused_until = 0.0
+
+        self.requests = 0
+        self.attempts = 0
+        self.paced = 0
+        self.queue_delay_total = 0.0
+        self.queue_delay_max = 0.0
+        self.retries = 0
+        self.gave_up = 0
+        self.in_flight = 0
+        self.in_flight_max = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def _chat_pacer(self, chat_id: int) -> Pacer:
+        pacer = self._chat_pacers.get(chat_id)
+        if pacer is None:
+            if chat_id < 0:
+                pacer = Pacer(self.group_rate_per_minute, period=60.0, burst=3)
+            else:
+                pacer = Pacer(self.chat_rate, burst=self.chat_burst)
+            self._chat_pacers[chat_id] = pacer
+            if len(self._chat_pacers) > MAX_TRACKED_CHATS:
+                self._chat_pacers.popitem(last=False)
+        else:
+            self._chat_pacers.move_to_end(chat_id)
+        return pacer
+
+    async def _wait_out_pause(self):
+        while True:
+            remaining = self._paused_until - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    async def _wait_for_slot(self, chat_id: Optional[int]):
+        started = time.monotonic()
+        await self._wait_out_pause()
+        if chat_id is not None:
+            # Chat slot first: a chat over its limit should not hold a global slot while it waits
+            delay = self._chat_pacer(chat_id).reserve(time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+            delay = self.global_pacer.reserve(time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # A 429 that arrived meanwhile delays the call, but the slots already taken stay ours
+            await self._wait_out_pause()
+        waited = time.monotonic() - started
+        self.attempts += 1
+        if waited > 0.001:
+            self.paced += 1
+        self.queue_delay_total += waited
+        self.queue_delay_max = max(self.queue_delay_max, waited)
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Union[bool, Dict[str, Any], list]]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int],
+    ):
+        max_retries = self.max_retries if rate_limit_args is None else rate_limit_args
+        chat_id = data.get("chat_id")
+        try:
+            chat_id = int(chat_id) if chat_id is not None else None
+        except (TypeError, ValueError):
+            chat_id = -1  # @channelusername; paced like a group
+
+        self.requests += 1
+        for attempt in range(max_retries + 1):
+            await self._wait_for_slot(chat_id)
+            self.in_flight += 1
+            self.in_flight_max = max(self.in_flight_max, self.in_flight)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else float(e.retry_after)
+                if attempt == max_retries:
+                    self.gave_up += 1
+                    logger.error(f"{endpoint}: still rate limited after {max_retries} retries")
+                    raise
+                self.retries += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after + 0.1)
+                logger.warning(f"{endpoint}: rate limited by Telegram, pausing outbound calls for {retry_after}s")
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "paced": self.paced,
+            "avg_queue_ms": round(self.queue_delay_total / self.attempts * 1000, 1) if self.attempts else 0.0,
+            "max_queue_ms": round(self.queue_delay_max * 1000, 1),
+            "retries": self.retries,
+            "gave_up": self.gave_up,
+            "in_flight": self.in_flight,
+            "in_flight_max": self.in_flight_max,
+        }
@@ -0,0 +1,145 @@
+"""
+Recent transactions buffer for the Expense Tracker Bot
+
+Keeps the newest transactions of active users as pre-rendered lines so the
+"Recent Transactions" view needs no queries at all. Each user gets a bounded
+deque ordered newest first; write paths push, replace or drop single rows
+and bulk writers invalidate. Buffers hold a few more rows than are shown so a
+delete does not force a reload, and an LRU over users caps total memory.
+Buffers are keyed by Telegram id because that is what a view starts from;
+an index by user id serves invalidations coming from other replicas.
+"""
+
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from src.models.category import Category, CategoryType
+from src.models.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+RECENT_LIMIT = 10  # Rows shown in the view
+BUFFER_SIZE = 20  # Rows kept per user; the slack absorbs deletes
+MAX_BUFFERED_USERS = 10000
+
+
+def render_recent_line(transaction: Transaction, category: Category, language: str, currency: str) -> str:
+    """One transaction as shown in the recent list (without its position number)"""
+    type_emoji = "💰" if category.category_type == CategoryType.INCOME else "💸"
+    date_str = transaction.transaction_date.strftime("%Y-%m-%d %H:%M")
+    line = f"{type_emoji} {currency} {transaction.amount:,.2f} - {category.icon} {category.get_name(language)}\n"
+    line += f"     📅 {date_str}\n"
+    if transaction.description:
+        line += f"     📝 {transaction.description}\n"
+    return line
+
+
+class RecentBuffer:
+    __slots__ = ("user_id", "language", "currency", "rows", "complete")
+
+    def __init__(self, user_id: int, language: str, currency: str, complete: bool):
+        self.user_id = user_id
+        self.language = language
+        self.currency = currency
+        # (transaction_date, transaction_id, rendered line), newest first
+        self.rows = deque(maxlen=BUFFER_SIZE)
+        # True when the buffer holds every transaction the user has
+        self.complete = complete
+
+    def usable(self) -> bool:
+        return self.complete or len(self.rows) >= RECENT_LIMIT
+
+    def put(self, sort_date: datetime, transaction_id: int, line: str):
+        self.drop(transaction_id)
+        key = (sort_date, transaction_id)
+        position = 0
+        while position < len(self.rows) and self.rows[position][:2] > key:
+            position += 1
+        if position == len(self.rows) and (len(self.rows) == self.rows.maxlen or not self.complete):
+            # Older than everything kept; unless we hold all rows, unkept ones may sit in between
+            self.complete = False
+            return
+        if len(self.rows) == self.rows.maxlen:
+            self.rows.pop()
+            self.complete = False
+        self.rows.insert(position, (sort_date, transaction_id, line))
+
+    def drop(self, transaction_id: int):
+        for row in self.rows:
+            if row[1] == transaction_id:
+                self.rows.remove(row)
+                return
+
+
+class RecentTransactionsCache:
+    """LRU of per-user RecentBuffer objects"""
+
+    def __init__(self, max_users: int = MAX_BUFFERED_USERS):
+        self.max_users = max_users
+        self._buffers: "OrderedDict[int, RecentBuffer]" = OrderedDict()
+        self._telegram_ids: Dict[int, int] = {}  # user id -> Telegram id of buffered users
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, telegram_id: int) -> Optional[List[str]]:
+        """Rendered lines of the newest RECENT_LIMIT transactions, or None if the buffer cannot answer"""
+        buffer = self._buffers.get(telegram_id)
+        if buffer is None or not buffer.usable():
+            self.misses += 1
+            return None
+        self._buffers.move_to_end(telegram_id)
+        self.hits += 1
+        return [row[2] for row in list(buffer.rows)[:RECENT_LIMIT]]
+
+    def load(self, telegram_id: int, user_id: int, language: str, currency: str, transactions: Iterable[Transaction]):
+        """Fill a user's buffer from up to BUFFER_SIZE transactions fetched newest first"""
+        transactions = list(transactions)
+        buffer = RecentBuffer(user_id, language, currency, complete=len(transactions) < BUFFER_SIZE)
+        for transaction in transactions:
+            buffer.rows.append((
+                transaction.transaction_date, transaction.id,
+                render_recent_line(transaction, transaction.category, language, currency)
+            ))
+        self._buffers[telegram_id] = buffer
+        self._buffers.move_to_end(telegram_id)
+        self._telegram_ids[user_id] = telegram_id
+        while len(self._buffers) > self.max_users:
+            _, evicted = self._buffers.popitem(last=False)
+            self._telegram_ids.pop(evicted.user_id, None)
+
+    def put(self, telegram_id: int, transaction: Transaction, category: Category):
+        """Record an inserted or edited transaction in the user's buffer, if the user has one"""
+        buffer = self._buffers.get(telegram_id)
+        if buffer is None:
+            return
+        line = render_recent_line(transaction, category, buffer.language, buffer.currency)
+        buffer.put(transaction.transaction_date, transaction.id, line)
+
+    def remove(self, telegram_id: int, transaction_id: int):
+        buffer = self._buffers.get(telegram_id)
+        if buffer is not None:
+            buffer.drop(transaction_id)
+
+    def invalidate(self, telegram_id: int):
+        """Forget a user's buffer; call after bulk writes or changes that affect rendering"""
+        buffer = self._buffers.pop(telegram_id, None)
+        if buffer is not None:
+            self._telegram_ids.pop(buffer.user_id, None)
+
+    def invalidate_user(self, user_id: int):
+        """Forget a buffer by user id; used when another replica changed the user's data"""
+        telegram_id = self._telegram_ids.get(user_id)
+        if telegram_id is not None:
+            self.invalidate(telegram_id)
+
+    def clear(self):
+        self._buffers.clear()
+        self._telegram_ids.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "users": len(self._buffers)}
+
+
+# Global instance
+recent_transactions = RecentTransactionsCache()
@@ -0,0 +1,90 @@
+"""
+Recurring transaction materialization for the Expense Tracker Bot
+
+A daily job turns every due occurrence of every active rule into a
+transaction with one set-based INSERT ... SELECT over generate_series. Each
+occurrence carries external_id "recurring:<rule>:<date>", so the partial
+unique index on (user_id, external_id) makes retries and overlapping runs
+harmless. The same statement advances last_run_date of the rules it inserted
+for. A newly added rule is materialized alone, filtered by its id.
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from telegram.ext import ContextTypes
+from src.database.session import get_session
+from src.utils.invalidation import ALL_USERS, TRANSACTION, notify_changed
+from src.utils.recent_transactions import recent_transactions
+
+logger = logging.getLogger(__name__)
+
+MATERIALIZE_SQL = text("""
+    WITH inserted AS (
+        INSERT INTO transactions (amount, currency, description, transaction_date, user_id, category_id, external_id, created_at)
+        SELECT r.amount, r.currency, r.description, d, r.user_id, r.category_id,
+               'recurring:' || r.id || ':' || to_char(d, 'YYYY-MM-DD'), now()
+        FROM recurring_rules r
+        CROSS JOIN LATERAL generate_series(
+            GREATEST(r.start_date, COALESCE(r.last_run_date + 1, r.start_date))::timestamp,
+            CAST(:today AS date)::timestamp,
+            interval '1 day'
+        ) AS d
+        WHERE r.is_active
+          AND (CAST(:rule_id AS integer) IS NULL OR r.id = :rule_id)
+          AND (
+            r.frequency = 'DAILY'
+            OR (r.frequency = 'WEEKLY' AND extract(isodow FROM d) - 1 = r.day_of_week)
+            OR (r.frequency = 'MONTHLY' AND extract(day FROM d) = LEAST(
+                    r.day_of_month,
+                    extract(day FROM date_trunc('month', d) + interval '1 month - 1 day')
+                ))
+          )
+        ON CONFLICT DO NOTHING
+        RETURNING external_id, user_id
+    ),
+    marked AS (
+        UPDATE recurring_rules
+        SET last_run_date = :today
+        WHERE id IN (SELECT CAST(split_part(external_id, ':', 2) AS integer) FROM inserted)
+          AND (last_run_date IS NULL OR last_run_date < :today)
+    )
+    SELECT user_id FROM inserted
+""")
+
+
+def materialize_due(db: Session, today: Optional[date] = None, rule_id: Optional[int] = None) -> int:
+    """Insert all occurrences up to ``today`` (of one rule, or of every user's rules) in one statement; returns rows inserted"""
+    today = today or datetime.now().date()
+    # Only rules that produced a row are marked, in the same statement, so a rule added meanwhile is never
+    # marked as run without its transaction
+    user_ids = db.execute(MATERIALIZE_SQL, {"today": today, "rule_id": rule_id}).scalars().all()
+    if user_ids:
+        notify_changed(db, user_ids[0] if rule_id is not None else ALL_USERS, TRANSACTION)
+    db.commit()
+    return len(user_ids)
+
+
+def materialize_in_session(rule_id: Optional[int] = None) -> int:
+    """materialize_due with a session of its own, for worker threads"""
+    db = get_session()
+    try:
+        return materialize_due(db, rule_id=rule_id)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def materialize_recurring(context: ContextTypes.DEFAULT_TYPE):
+    """Daily job: materialize due recurring transactions"""
+    started = datetime.now()
+    inserted = await asyncio.to_thread(materialize_in_session)
+    if inserted:
+        # Rows landed for many users at once; let buffers reload on next view
+        recent_transactions.clear()
+    logger.info(f"Recurring rules: {inserted} transactions materialized in {(datetime.now() - started).total_seconds():.2f}s")
@@ -0,0 +1,74 @@
+"""
+Message edit de-duplication for the Expense Tracker Bot
+
+Telegram rejects an edit that leaves a message unchanged ("message is not
+modified") but we still pay the round trip. MessageRenderer remembers a hash of
+the last (text, parse_mode, markup) rendered into each message and skips edits
+that would not change anything.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+from telegram import CallbackQuery, InlineKeyboardMarkup
+from telegram.error import BadRequest
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_MESSAGES = 50000
+
+
+class MessageRenderer:
+    def __init__(self, max_entries: int = MAX_TRACKED_MESSAGES):
+        self.max_entries = max_entries
+        self._rendered: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        self.edits = 0
+        self.skipped = 0
+
+    @staticmethod
+    def _message_key(query: CallbackQuery) -> Optional[Tuple[int, int]]:
+        message = query.message
+        if message is None:
+            return None
+        return (message.chat_id, message.message_id)
+
+    def _remember(self, key: Tuple[int, int], digest: int):
+        self._rendered[key] = digest
+        self._rendered.move_to_end(key)
+        while len(self._rendered) > self.max_entries:
+            self._rendered.popitem(last=False)
+
+    def forget(self, chat_id: int, message_id: int):
+        self._rendered.pop((chat_id, message_id), None)
+
+    async def edit(self, query: CallbackQuery, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None,
+                   parse_mode: Optional[str] = None, **kwargs) -> bool:
+        """Edit the callback's message unless it already shows this content; returns True if edited"""
+        key = self._message_key(query)
+        digest = hash((text, parse_mode, reply_markup))
+        if key is not None and self._rendered.get(key) == digest:
+            self.skipped += 1
+            return False
+
+        try:
+            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=parse_mode, **kwargs)
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                raise
+            # Rendered by something we did not track (restart, another path); it is current now
+            self.skipped += 1
+            if key is not None:
+                self._remember(key, digest)
+            return False
+
+        self.edits += 1
+        if key is not None:
+            self._remember(key, digest)
+        return True
+
+    def stats(self) -> dict:
+        return {"edits": self.edits, "skipped": self.skipped, "tracked": len(self._rendered)}
+
+
+# Global instance
+message_renderer = MessageRenderer()
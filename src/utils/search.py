@@ -0,0 +1,109 @@
+"""
+Transaction description search for the Expense Tracker Bot
+
+Searches test the stored transactions.description_tsv column, so nothing is
+re-parsed, and every word is matched as a prefix ("такс" finds "такси").
+Only the newest SEARCH_CANDIDATES matches are ranked, so the cost does not
+grow with the number of hits:
+
+- The newest SEARCH_WINDOW rows of the user are walked backwards through
+  idx_transactions_user_date; for common words they hold enough matches.
+- Otherwise the words are rare for this user and the composite GIN index
+  idx_transactions_user_description_tsv (user_id, description_tsv; needs the
+  btree_gin extension) finds all of the user's matches directly.
+
+The planner cannot tell a rare prefix from a common one, so the choice is
+made here rather than left to it. Candidates are ranked with ts_rank and
+paginated with a (rank, id) keyset cursor.
+"""
+
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session, joinedload
+from src.models.transaction import Transaction
+
+SEARCH_PAGE_SIZE = 8
+MAX_QUERY_WORDS = 8
+SEARCH_WINDOW = 20000  # Newest transactions scanned before falling back to the index
+SEARCH_CANDIDATES = 200  # Newest matches that are ranked
+
+WORD_RE = re.compile(r"[^\W_]+")
+
+# Common words: the newest SEARCH_WINDOW rows through idx_transactions_user_date hold enough matches
+RECENT_CANDIDATES_SQL = text("""
+    SELECT c.id, ts_rank(c.description_tsv, to_tsquery('simple', :query)) AS rank
+    FROM (
+        SELECT r.id, r.description_tsv
+        FROM (
+            SELECT t.id, t.description_tsv, t.transaction_date
+            FROM transactions t
+            WHERE t.user_id = :user_id
+            ORDER BY t.transaction_date DESC
+            LIMIT :window
+        ) r
+        WHERE r.description_tsv @@ to_tsquery('simple', :query)
+        ORDER BY r.transaction_date DESC
+        LIMIT :candidates
+    ) c
+""")
+
+# Rare words: all of the user's matches through idx_transactions_user_description_tsv
+INDEXED_CANDIDATES_SQL = text("""
+    WITH matches AS MATERIALIZED (
+        SELECT t.id, t.description_tsv, t.transaction_date
+        FROM transactions t
+        WHERE t.user_id = :user_id
+          AND t.description_tsv @@ to_tsquery('simple', :query)
+    )
+    SELECT id, ts_rank(description_tsv, to_tsquery('simple', :query)) AS rank
+    FROM matches
+    ORDER BY transaction_date DESC
+    LIMIT :candidates
+""")
+
+
+def build_tsquery(query: str) -> Optional[str]:
+    """Turn free text into a prefix-matching tsquery ("taxi air" -> "taxi:* & air:*"), or None if it has no words"""
+    words = WORD_RE.findall(query.lower())[:MAX_QUERY_WORDS]
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def search_transactions(
+    db: Session,
+    user_id: int,
+    query: str,
+    after: Optional[Tuple[float, int]] = None,
+    limit: int = SEARCH_PAGE_SIZE
+) -> Tuple[List[Transaction], Optional[Tuple[float, int]]]:
+    """Return one page of matching transactions (best match first) and the cursor of the next page, if any"""
+    tsquery = build_tsquery(query)
+    if tsquery is None:
+        return [], None
+
+    params = {"query": tsquery, "user_id": user_id, "window": SEARCH_WINDOW, "candidates": SEARCH_CANDIDATES}
+    candidates = db.execute(RECENT_CANDIDATES_SQL, params).all()
+    if len(candidates) < SEARCH_CANDIDATES:
+        candidates = db.execute(INDEXED_CANDIDATES_SQL, params).all()
+
+    # Best match first; the (rank, id) keyset is applied to the small candidate list
+    hits = sorted(((row.rank, row.id) for row in candidates), reverse=True)
+    if after:
+        hits = [hit for hit in hits if hit < tuple(after)]
+    rows = hits[:limit + 1]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1]
+
+    ids = [transaction_id for _, transaction_id in rows]
+    if not ids:
+        return [], None
+    by_id = {
+        transaction.id: transaction
+        for transaction in db.query(Transaction).options(joinedload(Transaction.category)).filter(Transaction.id.in_(ids))
+    }
+    return [by_id[i] for i in ids if i in by_id], next_cursor
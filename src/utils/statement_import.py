@@ -0,0 +1,369 @@
+"""
+Bank statement import (CSV / OFX) for the Expense Tracker Bot
+
+Statements are parsed as a stream, each row is mapped to one of the user's
+categories with their CategoryMatcher (names, aliases, stems) and written to
+a spooled CSV. That file is loaded with
+PostgreSQL COPY into a temporary staging table and merged into transactions
+with a single INSERT ... SELECT that skips rows imported before (dedup on the
+per-user external_id).
+
+Rows the user already entered in the bot (by hand, batch entry or a recurring
+rule) have no statement external_id, so before the merge each staged row that
+matches one of them on (date, amount, currency) is dropped and counted as a
+probable duplicate. Matching is one-to-one: two identical coffees on the
+statement against one entered by hand import the second.
+"""
+
+import codecs
+import csv
+import hashlib
+import logging
+import re
+import tempfile
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, IO, Iterator, Optional, Sequence, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from src.models.category import CategoryType
+from src.utils.category_matcher import CategoryMatcher
+from src.utils.invalidation import TRANSACTION, notify_changed
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ofx", "qfx")
+MAX_IMPORT_BYTES = 20 * 1024 * 1024  # Bot API getFile download limit
+SPOOL_MAX_SIZE = 4 * 1024 * 1024
+MAX_AMOUNT = Decimal("99999999.99")  # transactions.amount is NUMERIC(10, 2)
+SNIFF_BYTES = 64 * 1024
+MAX_MEMO_DESCRIPTIONS = 50000
+
+DATE_HEADERS = ("date", "transaction date", "posted", "posting date", "booking date", "дата", "дата операции", "дата операції")
+AMOUNT_HEADERS = ("amount", "sum", "сумма", "сума", "сумма операции", "сума операції")
+DEBIT_HEADERS = ("debit", "withdrawal", "расход", "списание", "витрата")
+CREDIT_HEADERS = ("credit", "deposit", "приход", "зачисление", "надходження")
+DESCRIPTION_HEADERS = ("description", "details", "memo", "payee", "name", "narrative", "описание", "назначение", "детали", "опис", "призначення")
+CURRENCY_HEADERS = ("currency", "валюта")
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d.%m.%y")
+OTHER_NAME_HINTS = ("other", "прочи", "інш")
+
+# A row ready for staging: (external_id, transaction_date, signed amount, currency, description)
+StatementRow = Tuple[str, datetime, Decimal, str, str]
+
+
+class ImportResult:
+    def __init__(self):
+        self.parsed = 0
+        self.skipped = 0
+        self.inserted = 0
+        self.probable_duplicates = 0  # Matched a row entered in the bot
+
+    @property
+    def duplicates(self) -> int:
+        return self.parsed - self.inserted - self.probable_duplicates
+
+    def __repr__(self):
+        return (
+            f"<ImportResult(parsed={self.parsed}, inserted={self.inserted}, duplicates={self.duplicates}, "
+            f"probable_duplicates={self.probable_duplicates}, skipped={self.skipped})>"
+        )
+
+
+def _external_id(*parts) -> str:
+    return hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def _parse_amount(value: str) -> Optional[Decimal]:
+    value = (value or "").strip().replace(" ", "").replace(" ", "")
+    if not value:
+        return None
+    if "," in value and "." in value:
+        # 1,234.56 or 1.234,56: the last separator is the decimal one
+        if value.rfind(",") > value.rfind("."):
+            value = value.replace(".", "").replace(",", ".")
+        else:
+            value = value.replace(",", "")
+    else:
+        value = value.replace(",", ".")
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return None
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    value = (value or "").strip()
+    # Keep only the date part of "2024-01-15 10:30" / "15.01.2024T10:30"
+    value = re.split(r"[ T]", value, maxsplit=1)[0]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _open_text(path: str) -> IO[str]:
+    """Open a statement as text, falling back to cp1251 for legacy bank exports"""
+    with open(path, "rb") as raw:
+        sample = raw.read(SNIFF_BYTES)
+    try:
+        sample.decode("utf-8")
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError:
+        encoding = "cp1251"
+    return open(path, "r", encoding=encoding, errors="replace", newline="")
+
+
+def _find_column(header: Sequence[str], candidates: Sequence[str]) -> Optional[int]:
+    normalized = [h.strip().lower() for h in header]
+    for candidate in candidates:
+        if candidate in normalized:
+            return normalized.index(candidate)
+    for index, name in enumerate(normalized):
+        if any(name.startswith(candidate) for candidate in candidates):
+            return index
+    return None
+
+
+def iter_csv_rows(path: str, default_currency: str, result: ImportResult) -> Iterator[StatementRow]:
+    """Stream rows from a bank CSV; column roles are detected from the header"""
+    with _open_text(path) as handle:
+        sample = handle.read(SNIFF_BYTES)
+        handle.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(handle, dialect)
+        header = next(reader, None)
+        if not header:
+            return
+
+        date_col = _find_column(header, DATE_HEADERS)
+        amount_col = _find_column(header, AMOUNT_HEADERS)
+        debit_col = _find_column(header, DEBIT_HEADERS)
+        credit_col = _find_column(header, CREDIT_HEADERS)
+        description_col = _find_column(header, DESCRIPTION_HEADERS)
+        currency_col = _find_column(header, CURRENCY_HEADERS)
+        if date_col is None or (amount_col is None and debit_col is None and credit_col is None):
+            logger.warning(f"Statement CSV header not recognized: {header}")
+            return
+
+        occurrences: Dict[tuple, int] = defaultdict(int)
+        for row in reader:
+            if not row or len(row) <= date_col:
+                continue
+            transaction_date = _parse_date(row[date_col])
+            if amount_col is not None and amount_col < len(row):
+                amount = _parse_amount(row[amount_col])
+            else:
+                debit = _parse_amount(row[debit_col]) if debit_col is not None and debit_col < len(row) else None
+                credit = _parse_amount(row[credit_col]) if credit_col is not None and credit_col < len(row) else None
+                amount = (credit or Decimal(0)) - abs(debit or Decimal(0)) if (debit or credit) else None
+            if transaction_date is None or not amount or abs(amount) > MAX_AMOUNT:
+                result.skipped += 1
+                continue
+            description = row[description_col].strip() if description_col is not None and description_col < len(row) else ""
+            currency = row[currency_col].strip().upper() if currency_col is not None and currency_col < len(row) and row[currency_col].strip() else default_currency
+
+            # Identical rows on the same day are legitimate (two coffees); number them
+            key = (transaction_date.date(), amount, description)
+            occurrences[key] += 1
+            yield (
+                _external_id("csv", transaction_date.date().isoformat(), amount, description, occurrences[key]),
+                transaction_date, amount, currency, description
+            )
+
+
+def _iter_ofx_tokens(handle: IO[str]) -> Iterator[Tuple[str, str]]:
+    """Yield (TAG, value) pairs from SGML or XML OFX, reading the file in chunks"""
+    buffer = ""
+    while True:
+        chunk = handle.read(SNIFF_BYTES)
+        if not chunk:
+            break
+        buffer += chunk
+        parts = buffer.split("<")
+        buffer = parts.pop()
+        for part in parts:
+            tag, _, value = part.partition(">")
+            if tag:
+                yield tag.strip().upper(), value.strip()
+    tag, _, value = buffer.partition(">")
+    if tag:
+        yield tag.strip().upper(), value.strip()
+
+
+def iter_ofx_rows(path: str, default_currency: str, result: ImportResult) -> Iterator[StatementRow]:
+    """Stream STMTTRN records from an OFX/QFX statement"""
+    currency = default_currency
+    current: Optional[Dict[str, str]] = None
+
+    def emit(record: Dict[str, str]) -> Optional[StatementRow]:
+        posted = record.get("DTPOSTED", "")
+        amount = _parse_amount(record.get("TRNAMT", ""))
+        try:
+            transaction_date = datetime.strptime(posted[:8], "%Y%m%d")
+        except ValueError:
+            transaction_date = None
+        if transaction_date is None or not amount or abs(amount) > MAX_AMOUNT:
+            return None
+        description = " ".join(v for v in (record.get("NAME"), record.get("MEMO")) if v)
+        fitid = record.get("FITID") or f"{posted}|{amount}|{description}"
+        return (_external_id("ofx", fitid), transaction_date, amount, currency, description)
+
+    with _open_text(path) as handle:
+        for tag, value in _iter_ofx_tokens(handle):
+            if tag == "CURDEF" and value:
+                currency = value.upper()
+            elif tag == "STMTTRN":
+                current = {}
+            elif tag == "/STMTTRN" and current is not None:
+                row = emit(current)
+                current = None
+                if row is None:
+                    result.skipped += 1
+                else:
+                    yield row
+            elif current is not None and not tag.startswith("/") and value:
+                current.setdefault(tag, value)
+        if current:
+            # SGML OFX may omit closing tags on the last record
+            row = emit(current)
+            if row is None:
+                result.skipped += 1
+            else:
+                yield row
+
+
+class CategoryMapper:
+    """Map a statement description to a category with the user's CategoryMatcher, else an "Other" category"""
+
+    def __init__(self, matcher: CategoryMatcher, categories: Sequence[Tuple[int, str, str, CategoryType]]):
+        self.matcher = matcher
+        # Statements repeat the same merchant descriptions; match each one once
+        self._memo: Dict[Tuple[str, bool], Optional[int]] = {}
+        self._fallback: Dict[CategoryType, Optional[int]] = {CategoryType.INCOME: None, CategoryType.EXPENSE: None}
+        for category_id, name_en, name_ru, category_type in categories:
+            names = [n.lower() for n in (name_en, name_ru) if n]
+            if self._fallback[category_type] is None or any(h in n for n in names for h in OTHER_NAME_HINTS):
+                self._fallback[category_type] = category_id
+
+    def map(self, description: str, is_income: bool) -> Optional[int]:
+        key = (description, is_income)
+        if key in self._memo:
+            return self._memo[key]
+        category_type = CategoryType.INCOME if is_income else CategoryType.EXPENSE
+        category_id = self.matcher.match(description, category_type.value)
+        if category_id is None:
+            category_id = self._fallback[category_type]
+        if len(self._memo) < MAX_MEMO_DESCRIPTIONS:
+            self._memo[key] = category_id
+        return category_id
+
+
+def iter_statement_rows(path: str, fmt: str, default_currency: str, result: ImportResult) -> Iterator[StatementRow]:
+    if fmt in ("ofx", "qfx"):
+        return iter_ofx_rows(path, default_currency, result)
+    return iter_csv_rows(path, default_currency, result)
+
+
+def write_staging_csv(rows: Iterator[StatementRow], mapper: CategoryMapper, result: ImportResult,
+                      progress: Optional[dict] = None) -> IO[bytes]:
+    """Write staged rows (absolute amounts, mapped categories) into a spooled CSV for COPY"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+b")
+    writer = csv.writer(codecs.getwriter("utf-8")(spooled))
+    for external_id, transaction_date, amount, currency, description in rows:
+        category_id = mapper.map(description, amount > 0)
+        if category_id is None:
+            result.skipped += 1
+            continue
+        writer.writerow((external_id, transaction_date.isoformat(), abs(amount), currency[:10], description, category_id))
+        result.parsed += 1
+        if progress is not None and result.parsed % 1000 == 0:
+            progress["rows"] = result.parsed
+    spooled.seek(0)
+    return spooled
+
+
+def merge_staged_rows(db: Session, staged: IO[bytes], user_id: int) -> Tuple[int, int]:
+    """COPY staged rows into a temp table and merge them into transactions; returns (rows inserted, probable duplicates)"""
+    db.execute(text(
+        "CREATE TEMP TABLE import_staging ("
+        " external_id VARCHAR(64), transaction_date TIMESTAMPTZ, amount NUMERIC(10, 2),"
+        " currency VARCHAR(10), description TEXT, category_id INTEGER"
+        ") ON COMMIT DROP"
+    ))
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY import_staging (external_id, transaction_date, amount, currency, description, category_id) "
+            "FROM STDIN WITH (FORMAT csv)",
+            staged
+        )
+    finally:
+        cursor.close()
+    db.execute(text(
+        "DELETE FROM import_staging s WHERE EXISTS ("
+        "  SELECT 1 FROM transactions t WHERE t.user_id = :user_id AND t.external_id = s.external_id"
+        ")"
+    ), {"user_id": user_id})
+    # Pair the new rows with rows entered in the bot, n-th with n-th per (date, amount, currency)
+    probable_duplicates = db.execute(text(
+        "DELETE FROM import_staging d USING ("
+        "  SELECT staged.row_ctid FROM ("
+        "    SELECT s.ctid AS row_ctid, CAST(s.transaction_date AS date) AS day, s.amount, s.currency,"
+        "           row_number() OVER ("
+        "             PARTITION BY CAST(s.transaction_date AS date), s.amount, s.currency ORDER BY s.external_id"
+        "           ) AS n"
+        "    FROM import_staging s"
+        "  ) staged"
+        "  JOIN ("
+        "    SELECT CAST(t.transaction_date AS date) AS day, t.amount, t.currency, count(*) AS entered"
+        "    FROM transactions t"
+        "    WHERE t.user_id = :user_id"
+        "      AND (t.external_id IS NULL OR t.external_id LIKE 'entry:%' OR t.external_id LIKE 'recurring:%')"
+        "      AND t.transaction_date >= (SELECT min(transaction_date) FROM import_staging) - interval '1 day'"
+        "      AND t.transaction_date <= (SELECT max(transaction_date) FROM import_staging) + interval '1 day'"
+        "    GROUP BY 1, 2, 3"
+        "  ) entered ON entered.day = staged.day AND entered.amount = staged.amount"
+        "    AND entered.currency = staged.currency AND staged.n <= entered.entered"
+        ") matched "
+        "WHERE d.ctid = matched.row_ctid"
+    ), {"user_id": user_id}).rowcount
+    inserted = db.execute(text(
+        "INSERT INTO transactions (amount, currency, description, transaction_date, user_id, category_id, external_id, created_at) "
+        "SELECT DISTINCT ON (s.external_id) s.amount, s.currency, s.description, s.transaction_date, :user_id, s.category_id, s.external_id, now() "
+        "FROM import_staging s "
+        "ORDER BY s.external_id "
+        "ON CONFLICT DO NOTHING"
+    ), {"user_id": user_id}).rowcount
+    if inserted:
+        notify_changed(db, user_id, TRANSACTION)
+    db.commit()
+    return inserted, probable_duplicates
+
+
+def import_statement(db: Session, path: str, fmt: str, user_id: int, default_currency: str,
+                     categories: Sequence[Tuple[int, str, str, CategoryType]], matcher: CategoryMatcher,
+                     progress: Optional[dict] = None) -> ImportResult:
+    """Parse, stage and merge one statement file for a user/group"""
+    result = ImportResult()
+    mapper = CategoryMapper(matcher, categories)
+    if progress is not None:
+        progress["stage"] = "parsing"
+    staged = write_staging_csv(iter_statement_rows(path, fmt, default_currency, result), mapper, result, progress)
+    try:
+        if progress is not None:
+            progress["rows"] = result.parsed
+            progress["stage"] = "merging"
+        if result.parsed:
+            result.inserted, result.probable_duplicates = merge_staged_rows(db, staged, user_id)
+    finally:
+        staged.close()
+    if progress is not None:
+        progress["stage"] = "done"
+    return result
@@ -46,6 +46,11 @@ Ready to track your expenses? Use the menu below to manage your finances.""",
         "settings": "⚙️ Settings",
         "balance_settings": "💼 Balance Settings",
         "select_primary_income_category": "Select primary income category:",
+        "digest_settings": "📬 Digests",
+        "digest_settings_text": "📬 **Digests**\n\nGet a summary of the previous week every Monday and of the previous month on the 1st.",
+        "digest_weekly": "Weekly digest",
+        "digest_monthly": "Monthly digest",
+        "digest_no_activity": "No transactions were recorded in this period.",
         
         # Settings
         "settings_menu": "",
@@ -77,6 +82,9 @@ Ready to track your expenses? Use the menu below to manage your finances.""",
         "select_category": "Select a category:",
         "enter_amount": "Please enter the amount:",
         "category": "Category",
+        "currency": "Currency",
+        "batch_added": "✅ Added {count} transaction(s):",
+        "batch_unparsed": "⚠️ Not recognized (use \"category amount [today|yesterday|DD.MM]\"):",
         "income": "Income",
         "expense": "Expense",
         "transaction_added": """✅ Transaction added successfully!
@@ -84,6 +92,7 @@ Ready to track your expenses? Use the menu below to manage your finances.""",
 Amount: {currency_symbol} {amount:,.2f}
 Category: {category_icon} {category_name}
 Type: {transaction_type}""",
+        "duplicate_transaction": "⚠️ This transaction was already recorded a moment ago.",
         
         # Categories
         "manage_categories_menu": "",
@@ -106,6 +115,62 @@ Type: {transaction_type}""",
         "monthly_expense_breakdown": "Monthly Expense Breakdown",
         "category_breakdown": "📋 Category Breakdown",
         "custom_period": "📅 Custom Period",
+        "compare_periods": "🔀 Compare Periods",
+        "compare_month": "This month vs last month",
+        "compare_year": "This year vs last year",
+        "compare_title": "🔀 {current} vs {previous}",
+        "compare_no_data": "No transactions in either period.",
+        "compare_new": "new",
+        "biggest_movers": "Biggest Changes",
+        "show_chart": "📊 Show Chart",
+        "category_pie_title": "Expenses by Category - {period}",
+        "income_vs_expense_title": "Income vs Expenses - {year}",
+        "balance_trend_title": "Balance Trend ({currency})",
+        "chart_unavailable": "Chart is not available right now. Please try again later.",
+        "heavy_lane_busy": "⏳ Too many exports, imports, charts and voice messages are being processed. Please try again in a minute.",
+        "chart_no_data": "Not enough data to draw a chart.",
+
+        # Export
+        "export_usage": "📤 **Export**\n\nUsage: `/export [period] [format]`\nPeriod: today, week, month, year, all (default: month)\nFormat: csv, xlsx (default: csv)",
+        "export_caption": "📤 {count} transactions ({period})",
+        "export_failed": "❌ Export could not be created. The file may exceed Telegram's 50 MB limit; try a shorter period.",
+        "export_xlsx_unavailable": "XLSX export is not available on this server. Use csv instead.",
+
+        # Category aliases
+        "aliases_title": "Category aliases",
+        "aliases_empty": "No aliases yet.",
+        "aliases_usage": "Aliases are extra words that pick a category in voice and text input. Set them with `/alias <category> = <word>, <word>`, e.g. `/alias Transport = uber, metro`",
+        "aliases_updated": "🏷️ Aliases for {category_name}: {aliases}",
+
+        # Search
+        "search_usage": "Search your transactions by description: `/search <text>`, for example `/search taxi airport`",
+        "search_results": "Search: {query}",
+        "search_no_results": "Nothing found.",
+
+        # Recurring transactions
+        "recurring_title": "Recurring transactions",
+        "recurring_empty": "No recurring transactions yet.",
+        "recurring_usage": "Add one with `/recurring <category> <amount> <schedule>`, for example:\n`/recurring rent 500 monthly 1`\n`/recurring netflix 10 weekly fri`\n`/recurring salary 3000 monthly 25`",
+        "recurring_added": "🔁 Recurring transaction added: {rule}",
+        "recurring_daily": "every day",
+        "recurring_weekly": "every {day}",
+        "recurring_monthly": "monthly on day {day}",
+        "weekday_0": "Monday",
+        "weekday_1": "Tuesday",
+        "weekday_2": "Wednesday",
+        "weekday_3": "Thursday",
+        "weekday_4": "Friday",
+        "weekday_5": "Saturday",
+        "weekday_6": "Sunday",
+
+        # Statement import
+        "import_started": "📥 Statement received, starting import...",
+        "import_parsing": "📥 Reading statement... {rows:,} rows",
+        "import_merging": "📥 Saving {rows:,} rows...",
+        "import_done": "✅ Import finished\n\nAdded: {inserted}\nAlready imported: {duplicates}\nAlready entered in the bot: {probable_duplicates}\nSkipped (unreadable): {skipped}",
+        "import_failed": "❌ The statement could not be imported. Send a CSV with date/amount/description columns or an OFX file.",
+        "import_unsupported": "Only CSV and OFX/QFX statements can be imported.",
+        "import_too_large": "The file is too large. Telegram lets bots download files up to 20 MB.",
         
         # Balance
         "balance": "💰 Balance",
@@ -129,6 +194,11 @@ Type: {transaction_type}""",
 /start - Start the bot and see main menu
 /help - Show this help message
 /balance - Show current balance summary
+/export - Export transactions (CSV/XLSX)
+/recurring - Manage recurring transactions (rent, subscriptions, salary)
+/search - Search transactions by description
+/alias - Extra words that pick a category in voice/text input
+Send a CSV/OFX bank statement as a file to import it
 
 **Transaction Management:**
 💰 Add income or expense transactions
@@ -309,6 +379,11 @@ Need help? Just use /start to see the main menu!""",
         "settings": "⚙️ Настройки",
         "balance_settings": "💼 Настройки баланса",
         "select_primary_income_category": "Выберите основную категорию дохода:",
+        "digest_settings": "📬 Сводки",
+        "digest_settings_text": "📬 **Сводки**\n\nПолучайте итоги прошлой недели каждый понедельник и прошлого месяца 1-го числа.",
+        "digest_weekly": "Еженедельная сводка",
+        "digest_monthly": "Ежемесячная сводка",
+        "digest_no_activity": "За этот период не записано ни одной транзакции.",
         
         # Settings
         "settings_menu": "",
@@ -340,6 +415,9 @@ Need help? Just use /start to see the main menu!""",
         "select_category": "Выберите категорию:",
         "enter_amount": "Пожалуйста, введите сумму:",
         "category": "Категория",
+        "currency": "Валюта",
+        "batch_added": "✅ Добавлено транзакций: {count}",
+        "batch_unparsed": "⚠️ Не распознано (формат \"категория сумма [сегодня|вчера|ДД.ММ]\"):",
         "income": "Доход",
         "expense": "Расход",
         "transaction_added": """✅ Транзакция успешно добавлена!
@@ -347,6 +425,7 @@ Need help? Just use /start to see the main menu!""",
 Сумма: {currency_symbol} {amount:,.2f}
 Категория: {category_icon} {category_name}
 Тип: {transaction_type}""",
+        "duplicate_transaction": "⚠️ Эта транзакция уже записана только что.",
         
         # Categories
         "manage_categories_menu": "",
@@ -369,6 +448,62 @@ Need help? Just use /start to see the main menu!""",
         "monthly_expense_breakdown": "Помесячная разбивка расходов",
         "category_breakdown": "📋 Разбивка по категориям",
         "custom_period": "📅 Произвольный период",
+        "compare_periods": "🔀 Сравнение периодов",
+        "compare_month": "Этот месяц и прошлый",
+        "compare_year": "Этот год и прошлый",
+        "compare_title": "🔀 {current} и {previous}",
+        "compare_no_data": "Нет транзакций ни в одном из периодов.",
+        "compare_new": "новое",
+        "biggest_movers": "Самые большие изменения",
+        "show_chart": "📊 Показать график",
+        "category_pie_title": "Расходы по категориям - {period}",
+        "income_vs_expense_title": "Доходы и расходы - {year}",
+        "balance_trend_title": "Динамика баланса ({currency})",
+        "chart_unavailable": "График сейчас недоступен. Попробуйте позже.",
+        "heavy_lane_busy": "⏳ Сейчас обрабатывается слишком много экспортов, импортов, графиков и голосовых сообщений. Попробуйте через минуту.",
+        "chart_no_data": "Недостаточно данных для построения графика.",
+
+        # Export
+        "export_usage": "📤 **Экспорт**\n\nИспользование: `/export [период] [формат]`\nПериод: today, week, month, year, all (по умолчанию: month)\nФормат: csv, xlsx (по умолчанию: csv)",
+        "export_caption": "📤 Транзакций: {count} ({period})",
+        "export_failed": "❌ Не удалось создать экспорт. Возможно, файл превышает лимит Telegram 50 МБ; выберите период короче.",
+        "export_xlsx_unavailable": "Экспорт в XLSX недоступен на этом сервере. Используйте csv.",
+
+        # Category aliases
+        "aliases_title": "Синонимы категорий",
+        "aliases_empty": "Синонимов пока нет.",
+        "aliases_usage": "Синонимы — дополнительные слова, по которым категория выбирается в голосовом и текстовом вводе. Задать: `/alias <категория> = <слово>, <слово>`, например `/alias Транспорт = такси, метро`",
+        "aliases_updated": "🏷️ Синонимы для {category_name}: {aliases}",
+
+        # Search
+        "search_usage": "Поиск транзакций по описанию: `/search <текст>`, например `/search такси аэропорт`",
+        "search_results": "Поиск: {query}",
+        "search_no_results": "Ничего не найдено.",
+
+        # Recurring transactions
+        "recurring_title": "Регулярные транзакции",
+        "recurring_empty": "Регулярных транзакций пока нет.",
+        "recurring_usage": "Добавить: `/recurring <категория> <сумма> <расписание>`, например:\n`/recurring аренда 500 monthly 1`\n`/recurring netflix 10 weekly пт`\n`/recurring зарплата 3000 monthly 25`",
+        "recurring_added": "🔁 Регулярная транзакция добавлена: {rule}",
+        "recurring_daily": "каждый день",
+        "recurring_weekly": "еженедельно, {day}",
+        "recurring_monthly": "ежемесячно, {day}-го числа",
+        "weekday_0": "понедельник",
+        "weekday_1": "вторник",
+        "weekday_2": "среда",
+        "weekday_3": "четверг",
+        "weekday_4": "пятница",
+        "weekday_5": "суббота",
+        "weekday_6": "воскресенье",
+
+        # Statement import
+        "import_started": "📥 Выписка получена, начинаю импорт...",
+        "import_parsing": "📥 Читаю выписку... {rows:,} строк",
+        "import_merging": "📥 Сохраняю {rows:,} строк...",
+        "import_done": "✅ Импорт завершен\n\nДобавлено: {inserted}\nУже были импортированы: {duplicates}\nУже внесены в боте: {probable_duplicates}\nПропущено (не распознано): {skipped}",
+        "import_failed": "❌ Не удалось импортировать выписку. Отправьте CSV с колонками дата/сумма/описание или файл OFX.",
+        "import_unsupported": "Импортировать можно только выписки CSV и OFX/QFX.",
+        "import_too_large": "Файл слишком большой. Боты Telegram могут скачивать файлы до 20 МБ.",
         
         # Balance
         "balance": "💰 Баланс",
@@ -392,6 +527,11 @@ Need help? Just use /start to see the main menu!""",
 /start - Запустить бота и показать главное меню
 /help - Показать это сообщение помощи
 /balance - Показать текущую сводку баланса
+/export - Экспорт транзакций (CSV/XLSX)
+/recurring - Регулярные транзакции (аренда, подписки, зарплата)
+/search - Поиск транзакций по описанию
+/alias - Синонимы категорий для голосового/текстового ввода
+Отправьте выписку банка (CSV/OFX) файлом, чтобы импортировать ее
 
 **Управление транзакциями:**
 💰 Добавлять транзакции доходов и расходов
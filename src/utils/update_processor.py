@@ -0,0 +1,206 @@
+"""
+Update processor for the Expense Tracker Bot
+
+Updates are processed concurrently (up to CONCURRENT_UPDATES at a time), so a
+slow voice transcription or yearly report no longer holds up other users. The
+updates of one chat still run strictly in arrival order: keypad taps build an
+amount digit by digit and conversation state lives in user_data.
+
+While an update of a chat is running, later updates of that chat are queued
+behind it and run by the same task once it finishes. A busy chat therefore
+occupies a single concurrency slot instead of parking queued taps on slots
+other chats could use. Each update runs with its own database session
+(``update_session``), so concurrent updates never share one.
+
+Updates are split into two lanes. Keypad, menu and navigation updates run in
+the fast lane described above. Heavy updates (voice, exports, imports,
+charts; the bot decides via ``is_heavy``) are handed to a bounded queue served
+by HEAVY_WORKERS worker tasks and give their fast-lane slot back right away,
+so a burst of heavy work cannot crowd out taps from other chats. A heavy
+update that was queued behind a running fast-lane update is checked when its
+turn comes and moves to the heavy lane together with the rest of the chat's
+queue. When the heavy queue is full the update is dropped and ``on_rejected``
+tells the user.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from src.database.session import update_session
+
+logger = logging.getLogger(__name__)
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    __slots__ = (
+        "_pending", "processed", "serialized", "max_queued",
+        "is_heavy", "on_rejected", "heavy_workers", "_heavy_queue", "_workers",
+        "heavy_processed", "heavy_rejected", "heavy_handoffs", "heavy_running", "heavy_max_depth",
+        "heavy_wait_total", "heavy_wait_max",
+    )
+
+    def __init__(self, max_concurrent_updates: int, heavy_workers: int = 2, heavy_queue_size: int = 32,
+                 is_heavy: Optional[Callable[[Update], bool]] = None,
+                 on_rejected: Optional[Callable[[Update], Awaitable[Any]]] = None):
+        super().__init__(max_concurrent_updates)
+        # chat key -> (update, coroutine) pairs waiting behind the chat's running update
+        self._pending: Dict[Hashable, deque] = {}
+        self.processed = 0
+        self.serialized = 0
+        self.max_queued = 0
+
+        self.is_heavy = is_heavy
+        self.on_rejected = on_rejected
+        self.heavy_workers = heavy_workers
+        self._heavy_queue: asyncio.Queue = asyncio.Queue(maxsize=heavy_queue_size)
+        self._workers: List[asyncio.Task] = []
+        self.heavy_processed = 0
+        self.heavy_rejected = 0
+        self.heavy_handoffs = 0
+        self.heavy_running = 0
+        self.heavy_max_depth = 0
+        self.heavy_wait_total = 0.0
+        self.heavy_wait_max = 0.0
+
+    @staticmethod
+    def chat_key(update: object) -> Optional[Hashable]:
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat is not None:
+            return update.effective_chat.id
+        if update.effective_user is not None:
+            return ("user", update.effective_user.id)
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self.chat_key(update)
+        if key is None:
+            await self._run(coroutine)
+            return
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.append((update, coroutine))
+            self.serialized += 1
+            self.max_queued = max(self.max_queued, len(pending))
+            return
+
+        if self._is_heavy(update):
+            if await self._enqueue_heavy(key, update, coroutine):
+                # Later updates of the chat wait behind the heavy one, in the same lane
+                self._pending[key] = deque()
+            return
+
+        self._pending[key] = deque()
+        await self._run_chat(key, coroutine)
+
+    def _is_heavy(self, update: object) -> bool:
+        return bool(self._workers) and self.is_heavy is not None and self.is_heavy(update)
+
+    async def _run_chat(self, key: Hashable, coroutine: Awaitable[Any], heavy: bool = False):
+        """Run ``coroutine`` and then everything queued behind it for the chat
+
+        In the fast lane a queued heavy update hands the chat over to the heavy
+        lane: it and the rest of the queue continue in a heavy worker.
+        """
+        pending = self._pending[key]
+        handed_off = False
+        try:
+            await self._run(coroutine)
+            while pending:
+                update, coroutine = pending.popleft()
+                if not heavy and self._is_heavy(update):
+                    if await self._enqueue_heavy(key, update, coroutine):
+                        self.heavy_handoffs += 1
+                        handed_off = True
+                        return
+                    continue
+                await self._run(coroutine)
+        finally:
+            if not handed_off:
+                del self._pending[key]
+                for _, leftover in pending:  # only left behind on cancellation (shutdown)
+                    leftover.close()
+
+    async def _run(self, coroutine: Awaitable[Any]):
+        self.processed += 1
+        try:
+            with update_session():
+                await coroutine
+        except Exception as e:
+            # Application.process_update already routes handler errors; this guards the chat's queue
+            logger.error(f"Update processing failed: {e}")
+
+    async def _enqueue_heavy(self, key: Hashable, update: Update, coroutine: Awaitable[Any]) -> bool:
+        """Queue ``coroutine`` for the heavy lane; False when the lane is full and the update was dropped"""
+        try:
+            self._heavy_queue.put_nowait((key, coroutine, time.monotonic()))
+        except asyncio.QueueFull:
+            coroutine.close()
+            self.heavy_rejected += 1
+            logger.warning(f"Heavy lane full ({self._heavy_queue.qsize()} queued), rejecting update {update.update_id}")
+            if self.on_rejected is not None:
+                try:
+                    await self.on_rejected(update)
+                except Exception as e:
+                    logger.error(f"Could not notify about rejected update: {e}")
+            return False
+        self.heavy_max_depth = max(self.heavy_max_depth, self._heavy_queue.qsize())
+        return True
+
+    async def _heavy_worker(self):
+        while True:
+            key, coroutine, queued_at = await self._heavy_queue.get()
+            waited = time.monotonic() - queued_at
+            self.heavy_wait_total += waited
+            self.heavy_wait_max = max(self.heavy_wait_max, waited)
+            self.heavy_processed += 1
+            self.heavy_running += 1
+            try:
+                await self._run_chat(key, coroutine, heavy=True)
+            finally:
+                self.heavy_running -= 1
+                self._heavy_queue.task_done()
+
+    async def initialize(self) -> None:
+        self._workers = [
+            asyncio.create_task(self._heavy_worker(), name=f"heavy-lane-{number}")
+            for number in range(self.heavy_workers)
+        ]
+
+    async def shutdown(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while not self._heavy_queue.empty():
+            key, coroutine, _ = self._heavy_queue.get_nowait()
+            coroutine.close()
+            for _, leftover in self._pending.pop(key, ()):
+                leftover.close()
+
+    def stats(self) -> dict:
+        return {
+            "processed": self.processed,
+            "serialized": self.serialized,
+            "max_queued": self.max_queued,
+            "busy_chats": len(self._pending),
+            "heavy": self.heavy_stats(),
+        }
+
+    def heavy_stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "queued": self._heavy_queue.qsize(),
+            "running": self.heavy_running,
+            "max_depth": self.heavy_max_depth,
+            "processed": self.heavy_processed,
+            "rejected": self.heavy_rejected,
+            "handoffs": self.heavy_handoffs,
+            "avg_wait_ms": round(self.heavy_wait_total / self.heavy_processed * 1000, 1) if self.heavy_processed else 0.0,
+            "max_wait_ms": round(self.heavy_wait_max * 1000, 1),
+        }
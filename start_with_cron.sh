@@ -1,10 +1,8 @@
 #!/bin/bash
 
-# Start cron daemon in background
-cron
-
-# Add cron job to update exchange rates every hour
-echo "0 * * * * cd /app && python update_exchange_rates.py >> /var/log/exchange_rates.log 2>&1" | crontab -
+# Exchange rates are refreshed hourly by the bot itself, on the elected leader replica
+# only (see LEADER_CHECK_INTERVAL); a per-container cron entry would run on every replica.
+# update_exchange_rates.py remains available for manual refreshes.
 
 # Start the main application
 exec python main.py
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Batch entry parser test for the Expense Tracker Bot
+
+Parses multi-line messages against a compiled category matcher and checks
+amounts, dates and categories, and that ordinary chatter with a number in it
+("a 5", "по 2") is not taken for an entry.
+"""
+
+import asyncio
+import logging
+import sys
+from datetime import date
+from src.utils.batch_entry import MAX_BATCH_LINES, parse_batch
+from src.utils.category_matcher import CategoryMatcher
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FOOD, TRANSPORT, SALARY = 1, 2, 3
+DEFAULT_FOOD, DEFAULT_SALARY = 14, 11
+TODAY = date(2026, 10, 19)
+# Names of the categories every new user gets (src/database/init_db.py), keyed by id
+DEFAULT_CATEGORIES = [
+    (11, "income", ("Salary", "Зарплата")),
+    (12, "income", ("Freelance", "Фриланс")),
+    (13, "income", ("Other Income", "Прочие доходы")),
+    (DEFAULT_FOOD, "expense", ("Food & Dining", "Еда и рестораны")),
+    (15, "expense", ("Transportation", "Транспорт")),
+    (16, "expense", ("Shopping", "Покупки")),
+    (17, "expense", ("Healthcare", "Здоровье")),
+    (18, "expense", ("Other Expenses", "Прочие расходы")),
+]
+
+
+class BatchEntryTester:
+    def __init__(self):
+        self.test_results = []
+        self.errors = []
+        self.matcher = CategoryMatcher([
+            (FOOD, "expense", ("Food", "Продукты")),
+            (TRANSPORT, "expense", ("Transport", "Транспорт", "taxi")),
+            (SALARY, "income", ("Salary", "Зарплата")),
+        ])
+        self.default_matcher = CategoryMatcher(DEFAULT_CATEGORIES)
+
+    def log_test(self, test_name: str, success: bool, message: str = ""):
+        """Log test result"""
+        status = "✅ PASS" if success else "❌ FAIL"
+        logger.info(f"{status} - {test_name}: {message}")
+        self.test_results.append({"test": test_name, "success": success, "message": message})
+        if not success:
+            self.errors.append(f"{test_name}: {message}")
+
+    def parse(self, text: str, matcher: CategoryMatcher = None):
+        parsed, unparsed = parse_batch(text, matcher or self.matcher, TODAY)
+        return [(row.category_id, row.amount, row.selected_date) for row in parsed], unparsed
+
+    def test_lines(self):
+        parsed, unparsed = self.parse("food 120\ntaxi 45,50 yesterday\n3000 зарплата 01.10\n\n")
+        expected = [
+            (FOOD, 120.0, TODAY),
+            (TRANSPORT, 45.5, date(2026, 10, 18)),
+            (SALARY, 3000.0, date(2026, 10, 1)),
+        ]
+        self.log_test("Parses every line", parsed == expected and not unparsed, str(parsed))
+
+    def test_rejected_lines(self):
+        parsed, unparsed = self.parse("food\ntaxi 0\nfood 5 25.12\nfood 5 31.02\nunknown 12")
+        self.log_test("Rejects lines without amount, future or invalid dates, unknown categories",
+                      not parsed and len(unparsed) == 5, str(parsed))
+
+    def test_chatter(self):
+        for text in ("a 5", "or 2", "по 2", "see you at 7", "буду через 10"):
+            parsed, unparsed = self.parse(text)
+            self.log_test(f"Chatter {text!r} is not an entry", not parsed and unparsed == [text], str(parsed))
+        # One letter away from "food": the voice matcher's fuzzy fallback would take these
+        for text in ("good 5", "mood 10", "wood 3", "foot 2"):
+            parsed, unparsed = self.parse(text, self.default_matcher)
+            self.log_test(f"Near miss {text!r} is not an entry", not parsed and unparsed == [text], str(parsed))
+
+    def test_default_categories(self):
+        parsed, unparsed = self.parse("food 120\ntaxi 45 yesterday\nsalary 3000", self.default_matcher)
+        self.log_test("Unknown line is reported, the rest parsed",
+                      parsed == [(DEFAULT_FOOD, 120.0, TODAY), (DEFAULT_SALARY, 3000.0, TODAY)]
+                      and unparsed == ["taxi 45 yesterday"], f"{parsed} {unparsed}")
+        parsed, unparsed = self.parse("еда 100", self.default_matcher)
+        self.log_test("Short word of a category name", parsed == [(DEFAULT_FOOD, 100.0, TODAY)], str(parsed))
+
+    def test_line_limit(self):
+        parsed, unparsed = self.parse("\n".join(["food 1"] * (MAX_BATCH_LINES + 2)))
+        self.log_test("Line limit", len(parsed) == MAX_BATCH_LINES and len(unparsed) == 2)
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        logger.info("🚀 Starting batch entry tests...")
+        self.test_lines()
+        self.test_rejected_lines()
+        self.test_chatter()
+        self.test_default_categories()
+        self.test_line_limit()
+
+        passed = sum(1 for result in self.test_results if result["success"])
+        logger.info(f"✅ Passed: {passed}/{len(self.test_results)}")
+        for error in self.errors:
+            logger.info(f"  - {error}")
+        return not self.errors
+
+
+async def main():
+    """Main test function"""
+    tester = BatchEntryTester()
+    success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
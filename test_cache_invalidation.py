@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Cross-replica cache invalidation test for the Expense Tracker Bot
+
+Builds two Application instances against one database, each with its own
+caches and invalidation listener (started from post_init like the bot does),
+then writes through one "replica" and checks that the other evicts the
+affected entries while the writer keeps its own.
+"""
+
+import asyncio
+import logging
+import random
+import sys
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+from telegram.ext import Application
+from src.database.session import get_session
+from src.models.user import User
+from src.models.category import Category, CategoryType
+from src.models.transaction import Transaction
+from src.handlers.transaction import TransactionHandler
+from src.utils.category_matcher import CategoryMatcherCache
+from src.utils.invalidation import ORIGIN_KEY, CacheInvalidationListener
+from src.utils.recent_transactions import RecentTransactionsCache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROPAGATION_TIMEOUT = 3.0
+
+
+class Replica:
+    """One Application with the per-process caches a bot replica keeps"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.recent = RecentTransactionsCache()
+        self.matchers = CategoryMatcherCache()
+        self.listener = CacheInvalidationListener(self.recent, self.matchers, origin=name)
+        self.application = (
+            Application.builder()
+            .token("123456:TEST")
+            .post_init(lambda application: self.listener.start())
+            .post_shutdown(lambda application: self.listener.stop())
+            .build()
+        )
+
+    def session(self):
+        db = get_session()
+        db.info[ORIGIN_KEY] = self.name
+        return db
+
+    def warm(self, user: User):
+        db = get_session()
+        try:
+            self.recent.load(user.telegram_id, user.id, "en", "USD", [])
+            self.matchers.get(db, user.id)
+        finally:
+            db.close()
+
+    def has_recent(self, user: User) -> bool:
+        return self.recent.get(user.telegram_id) is not None
+
+    def has_matcher(self, user: User) -> bool:
+        return user.id in self.matchers._matchers
+
+
+class CacheInvalidationTester:
+    def __init__(self):
+        self.test_results = []
+        self.errors = []
+        self.a = Replica("replica-a")
+        self.b = Replica("replica-b")
+        self.user = None
+
+    def log_test(self, test_name: str, success: bool, message: str = ""):
+        """Log test result"""
+        status = "✅ PASS" if success else "❌ FAIL"
+        logger.info(f"{status} - {test_name}: {message}")
+        self.test_results.append({"test": test_name, "success": success, "message": message})
+        if not success:
+            self.errors.append(f"{test_name}: {message}")
+
+    async def wait_for(self, condition) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + PROPAGATION_TIMEOUT
+        while not condition():
+            if loop.time() > deadline:
+                return False
+            await asyncio.sleep(0.01)
+        return True
+
+    def create_user(self):
+        db = self.a.session()
+        try:
+            # Negative ids never collide with real Telegram users
+            user = User(telegram_id=-random.randint(10 ** 9, 10 ** 12), first_name="invalidation-test")
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+            db.expunge(user)
+            self.user = user
+        finally:
+            db.close()
+
+    def warm_caches(self):
+        self.a.warm(self.user)
+        self.b.warm(self.user)
+
+    async def test_transaction_write(self):
+        self.warm_caches()
+        db = self.a.session()
+        try:
+            category = Category(name_en="Test", name_ru="Тест", icon="🧪",
+                                category_type=CategoryType.EXPENSE, user_id=self.user.id)
+            db.add(category)
+            db.flush()
+            db.add(Transaction(amount=Decimal("12.50"), currency="USD", description="invalidation",
+                               user_id=self.user.id, category_id=category.id))
+            db.commit()
+        finally:
+            db.close()
+        evicted = await self.wait_for(lambda: not self.b.has_recent(self.user) and not self.b.has_matcher(self.user))
+        self.log_test("Transaction write evicts other replica", evicted, str(self.b.listener.stats()))
+        self.log_test("Writer keeps its own caches", self.a.has_recent(self.user) and self.a.has_matcher(self.user),
+                      str(self.a.listener.stats()))
+
+    async def test_category_write(self):
+        self.warm_caches()
+        db = self.b.session()
+        try:
+            category = db.query(Category).filter(Category.user_id == self.user.id).first()
+            category.aliases = "lab, test"
+            db.commit()
+        finally:
+            db.close()
+        evicted = await self.wait_for(lambda: not self.a.has_matcher(self.user))
+        self.log_test("Category write evicts other replica", evicted and not self.a.has_recent(self.user))
+
+    async def test_settings_write(self):
+        self.warm_caches()
+        db = self.a.session()
+        try:
+            user = db.query(User).filter(User.id == self.user.id).first()
+            user.preferred_currency = "EUR"
+            db.commit()
+        finally:
+            db.close()
+        evicted = await self.wait_for(lambda: not self.b.has_recent(self.user))
+        # Settings do not affect category matching
+        self.log_test("Settings write evicts other replica", evicted and self.b.has_matcher(self.user))
+
+    async def test_batch_entry(self):
+        """Batch entry inserts with a Core statement, outside the ORM flush"""
+        self.warm_caches()
+        handler = TransactionHandler()
+        handler.db.info[ORIGIN_KEY] = self.a.name
+        update = MagicMock()
+        update.effective_chat.type = "private"
+        update.effective_user.id = self.user.telegram_id
+        update.message.text = "test 7\ntest 3 yesterday"
+        update.message.reply_text = AsyncMock()
+        try:
+            handled = await handler.handle_batch_text(update, None)
+        finally:
+            handler.db.close()
+        evicted = await self.wait_for(lambda: not self.b.has_recent(self.user))
+        self.log_test("Batch entry evicts other replica", handled and evicted and self.a.has_recent(self.user))
+
+    async def test_rollback_is_silent(self):
+        self.warm_caches()
+        received = self.b.listener.received
+        db = self.a.session()
+        try:
+            user = db.query(User).filter(User.id == self.user.id).first()
+            user.preferred_language = "ru"
+            db.flush()
+            db.rollback()
+        finally:
+            db.close()
+        await asyncio.sleep(0.3)
+        self.log_test("Rolled back write publishes nothing",
+                      self.b.listener.received == received and self.b.has_recent(self.user))
+
+    def cleanup(self):
+        if self.user is None:
+            return
+        db = get_session()
+        try:
+            db.query(Transaction).filter(Transaction.user_id == self.user.id).delete()
+            db.query(Category).filter(Category.user_id == self.user.id).delete()
+            db.query(User).filter(User.id == self.user.id).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        logger.info("🚀 Starting cache invalidation tests...")
+        for replica in (self.a, self.b):
+            await replica.application.post_init(replica.application)
+        try:
+            self.create_user()
+            await self.test_transaction_write()
+            await self.test_category_write()
+            await self.test_settings_write()
+            await self.test_batch_entry()
+            await self.test_rollback_is_silent()
+        except Exception as e:
+            self.log_test("Cache invalidation", False, str(e))
+        finally:
+            self.cleanup()
+            for replica in (self.a, self.b):
+                await replica.application.post_shutdown(replica.application)
+
+        passed = sum(1 for result in self.test_results if result["success"])
+        logger.info(f"✅ Passed: {passed}/{len(self.test_results)}")
+        for error in self.errors:
+            logger.info(f"  - {error}")
+        return not self.errors
+
+
+async def main():
+    """Main test function"""
+    tester = CacheInvalidationTester()
+    success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
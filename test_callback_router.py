@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Callback router test for the Expense Tracker Bot
+
+Registers exact and prefixed routes the way the bot does and checks which
+handler each callback_data reaches and with which arguments.
+"""
+
+import asyncio
+import logging
+import sys
+from unittest.mock import MagicMock
+from src.utils.callback_router import CallbackRouter
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class CallbackRouterTester:
+    def __init__(self):
+        self.test_results = []
+        self.errors = []
+        self.calls = []
+        self.router = CallbackRouter()
+        self.router.exact("main_menu", self.record("main_menu"))
+        self.router.exact("add_expense", self.record("add_type"), transaction_type="expense")
+        self.router.prefix("edit_transaction_", self.record("edit"), param="transaction_id", converter=int)
+        self.router.prefix("edit_transaction_amount_", self.record("edit_amount"), param="transaction_id", converter=int)
+        self.router.prefix("lang_", self.record("language"), param="language")
+
+    def log_test(self, test_name: str, success: bool, message: str = ""):
+        """Log test result"""
+        status = "✅ PASS" if success else "❌ FAIL"
+        logger.info(f"{status} - {test_name}: {message}")
+        self.test_results.append({"test": test_name, "success": success, "message": message})
+        if not success:
+            self.errors.append(f"{test_name}: {message}")
+
+    def record(self, name: str):
+        async def handler(update, context, **kwargs):
+            self.calls.append((name, kwargs))
+        return handler
+
+    async def dispatch(self, data: str):
+        self.calls.clear()
+        update = MagicMock()
+        update.callback_query.data = data
+        routed = await self.router.dispatch(update, None)
+        return routed, self.calls[0] if self.calls else None
+
+    async def test_exact(self):
+        routed, call = await self.dispatch("main_menu")
+        self.log_test("Exact route", routed and call == ("main_menu", {}), str(call))
+        routed, call = await self.dispatch("add_expense")
+        self.log_test("Exact route defaults", call == ("add_type", {"transaction_type": "expense"}), str(call))
+
+    async def test_longest_prefix(self):
+        routed, call = await self.dispatch("edit_transaction_42")
+        self.log_test("Prefix route", call == ("edit", {"transaction_id": 42}), str(call))
+        routed, call = await self.dispatch("edit_transaction_amount_42")
+        self.log_test("Longest prefix wins", call == ("edit_amount", {"transaction_id": 42}), str(call))
+        routed, call = await self.dispatch("lang_ru")
+        self.log_test("String parameter", call == ("language", {"language": "ru"}), str(call))
+
+    async def test_unrouted(self):
+        unrouted = self.router.unrouted
+        routed, call = await self.dispatch("main_men")
+        self.log_test("Unknown data is not routed", not routed and call is None and self.router.unrouted == unrouted + 1)
+
+    async def test_bad_parameter(self):
+        try:
+            await self.dispatch("edit_transaction_abc")
+            self.log_test("Bad parameter raises", False, "no error")
+        except ValueError:
+            self.log_test("Bad parameter raises", not self.calls)
+
+    async def test_stats(self):
+        stats = self.router.stats()
+        self.log_test("Route stats", stats.get("edit_transaction_*", {}).get("calls") == 1
+                      and stats.get("edit_transaction_*", {}).get("errors") == 1, str(stats))
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        logger.info("🚀 Starting callback router tests...")
+        await self.test_exact()
+        await self.test_longest_prefix()
+        await self.test_unrouted()
+        await self.test_bad_parameter()
+        await self.test_stats()
+
+        passed = sum(1 for result in self.test_results if result["success"])
+        logger.info(f"✅ Passed: {passed}/{len(self.test_results)}")
+        for error in self.errors:
+            logger.info(f"  - {error}")
+        return not self.errors
+
+
+async def main():
+    """Main test function"""
+    tester = CallbackRouterTester()
+    success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
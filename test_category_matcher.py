@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Category matcher test for the Expense Tracker Bot
+
+Compiles a matcher over a typical category set and checks exact matches
+(names, aliases, inflected forms, one word of a multi-word name), the
+edit-distance fallback for recognition errors and the category type filter.
+"""
+
+import asyncio
+import logging
+import sys
+from src.utils.category_matcher import CategoryMatcher, stem
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FOOD, TRANSPORT, CAFES, HEALTH, SALARY, GIFTS = 1, 2, 3, 4, 5, 6
+CATEGORIES = [
+    (FOOD, "expense", ("Food", "Продукты", "groceries", "silpo")),
+    (TRANSPORT, "expense", ("Transport", "Транспорт", "taxi")),
+    (CAFES, "expense", ("Cafes and restaurants", "Кафе и рестораны")),
+    (HEALTH, "expense", ("Health", "Здоровье")),
+    (SALARY, "income", ("Salary", "Зарплата")),
+    (GIFTS, "income", ("Gifts", "Подарки")),
+]
+
+
+class CategoryMatcherTester:
+    def __init__(self):
+        self.test_results = []
+        self.errors = []
+        self.matcher = CategoryMatcher(CATEGORIES)
+
+    def log_test(self, test_name: str, success: bool, message: str = ""):
+        """Log test result"""
+        status = "✅ PASS" if success else "❌ FAIL"
+        logger.info(f"{status} - {test_name}: {message}")
+        self.test_results.append({"test": test_name, "success": success, "message": message})
+        if not success:
+            self.errors.append(f"{test_name}: {message}")
+
+    def check(self, test_name: str, cases):
+        """``cases`` maps text to the expected category id (None: no match)"""
+        wrong = {text: self.matcher.match(text) for text, expected in cases.items() if self.matcher.match(text) != expected}
+        self.log_test(test_name, not wrong, f"unexpected: {wrong}" if wrong else f"{len(cases)} cases")
+
+    def test_stems(self):
+        self.log_test("Stems", stem("Здоровье") == stem("здоровья") == "здоров" and stem("taxis") == "taxi")
+
+    def test_exact(self):
+        self.check("Names and aliases", {
+            "food": FOOD, "Transport": TRANSPORT, "silpo": FOOD, "taxi": TRANSPORT, "salary": SALARY,
+        })
+        self.check("Inflected forms", {"продуктов": FOOD, "здоровья": HEALTH, "зарплату": SALARY})
+        self.check("Within a sentence", {
+            "купил продукты в магазине": FOOD, "taxi to the airport": TRANSPORT, "ужин ресторан": CAFES,
+        })
+
+    def test_fuzzy(self):
+        self.check("Recognition errors", {"тронспорт": TRANSPORT, "зорплата": SALARY, "groceris": FOOD, "подарок": GIFTS})
+        self.check("Short words never match", {"a": None, "or": None, "по": None, "tax": None})
+
+    def test_category_type(self):
+        matcher = self.matcher
+        self.log_test("Type filter", matcher.match("salary", "income") == SALARY and matcher.match("salary", "expense") is None
+                      and matcher.match("food", "income") is None)
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        logger.info("🚀 Starting category matcher tests...")
+        self.test_stems()
+        self.test_exact()
+        self.test_fuzzy()
+        self.test_category_type()
+
+        passed = sum(1 for result in self.test_results if result["success"])
+        logger.info(f"✅ Passed: {passed}/{len(self.test_results)}")
+        for error in self.errors:
+            logger.info(f"  - {error}")
+        return not self.errors
+
+
+async def main():
+    """Main test function"""
+    tester = CategoryMatcherTester()
+    success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Duplicate transaction suppression test for the Expense Tracker Bot
+
+Checks which inserts share a fingerprint (a double tap) and which do not (a
+different date, amount or category), and the sliding window of RecentWrites
+with explicit clocks.
+"""
+
+import asyncio
+import logging
+import sys
+from datetime import date
+from decimal import Decimal
+from src.utils.dedup import RecentWrites, transaction_fingerprint
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TODAY = date(2026, 10, 19)
+YESTERDAY = date(2026, 10, 18)
+NOW = 1_760_000_000.0
+
+
+class DedupTester:
+    def __init__(self):
+        self.test_results = []
+        self.errors = []
+
+    def log_test(self, test_name: str, success: bool, message: str = ""):
+        """Log test result"""
+        status = "✅ PASS" if success else "❌ FAIL"
+        logger.info(f"{status} - {test_name}: {message}")
+        self.test_results.append({"test": test_name, "success": success, "message": message})
+        if not success:
+            self.errors.append(f"{test_name}: {message}")
+
+    def test_fingerprint(self):
+        key, external_id = transaction_fingerprint(7, 12.5, 3, "USD", TODAY, now=NOW)
+        same_key, same_external_id = transaction_fingerprint(7, Decimal("12.50"), 3, "USD", TODAY, now=NOW + 1)
+        self.log_test("Repeat shares the fingerprint", key == same_key and external_id == same_external_id, external_id)
+        self.log_test("external_id fits the column", len(transaction_fingerprint(
+            2 ** 31 - 1, Decimal("99999999.99"), 2 ** 31 - 1, "USD", TODAY, now=NOW)[1]) <= 64)
+
+        variants = {
+            "date": transaction_fingerprint(7, 12.5, 3, "USD", YESTERDAY, now=NOW),
+            "amount": transaction_fingerprint(7, 12.51, 3, "USD", TODAY, now=NOW),
+            "category": transaction_fingerprint(7, 12.5, 4, "USD", TODAY, now=NOW),
+            "currency": transaction_fingerprint(7, 12.5, 3, "EUR", TODAY, now=NOW),
+        }
+        same = [name for name, (other_key, other_external_id) in variants.items()
+                if other_key == key or other_external_id == external_id]
+        self.log_test("Different date, amount, category or currency is not a repeat", not same, str(same))
+
+    def test_window(self):
+        writes = RecentWrites(window=10)
+        first = writes.claim("a", now=0)
+        repeat = writes.claim("a", now=5)
+        later = writes.claim("a", now=10)
+        self.log_test("Window suppresses repeats until it passes", first and not repeat and later and writes.suppressed == 1)
+
+        writes.release("a")
+        self.log_test("Released claim can be taken again", writes.claim("a", now=11))
+
+    def test_bounded(self):
+        writes = RecentWrites(window=60, max_entries=3)
+        for key in "abcd":
+            writes.claim(key, now=0)
+        self.log_test("Oldest claim is dropped at the size limit", len(writes._seen) == 3 and writes.claim("a", now=1))
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        logger.info("🚀 Starting dedup tests...")
+        self.test_fingerprint()
+        self.test_window()
+        self.test_bounded()
+
+        passed = sum(1 for result in self.test_results if result["success"])
+        logger.info(f"✅ Passed: {passed}/{len(self.test_results)}")
+        for error in self.errors:
+            logger.info(f"  - {error}")
+        return not self.errors
+
+
+async def main():
+    """Main test function"""
+    tester = DedupTester()
+    success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Recent transactions buffer test for the Expense Tracker Bot
+
+Feeds RecentBuffer and RecentTransactionsCache with transient Transaction
+objects (no database) and checks ordering, eviction of the oldest rows, the
+"complete" flag that decides whether a buffer can answer, and the LRU over
+users.
+"""
+
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.models.category import Category, CategoryType
+from src.models.transaction import Transaction
+from src.utils.recent_transactions import BUFFER_SIZE, RECENT_LIMIT, RecentBuffer, RecentTransactionsCache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+START = datetime(2026, 10, 1, 12, 0)
+CATEGORY = Category(id=1, name_en="Food", name_ru="Продукты", icon="🍔", category_type=CategoryType.EXPENSE)
+
+
+def make_transaction(transaction_id: int) -> Transaction:
+    """Transaction ``transaction_id``, dated that many hours after START"""
+    return Transaction(
+        id=transaction_id, amount=Decimal("1.00"), currency="USD", description=f"row {transaction_id}",
+        transaction_date=START + timedelta(hours=transaction_id), category=CATEGORY,
+    )
+
+
+class RecentTransactionsTester:
+    def __init__(self):
+        self.test_results = []
+        self.errors = []
+
+    def log_test(self, test_name: str, success: bool, message: str = ""):
+        """Log test result"""
+        status = "✅ PASS" if success else "❌ FAIL"
+        logger.info(f"{status} - {test_name}: {message}")
+        self.test_results.append({"test": test_name, "success": success, "message": message})
+        if not success:
+            self.errors.append(f"{test_name}: {message}")
+
+    @staticmethod
+    def ids(buffer: RecentBuffer):
+        return [row[1] for row in buffer.rows]
+
+    def test_ordering(self):
+        buffer = RecentBuffer(1, "en", "USD", complete=True)
+        for transaction_id in (2, 5, 1, 4, 3):
+            buffer.put(START + timedelta(hours=transaction_id), transaction_id, f"row {transaction_id}")
+        buffer.put(START + timedelta(hours=10), 1, "row 1 edited")
+        self.log_test("Newest first, edits move rows", self.ids(buffer) == [1, 5, 4, 3, 2], str(self.ids(buffer)))
+
+    def test_eviction(self):
+        buffer = RecentBuffer(1, "en", "USD", complete=True)
+        for transaction_id in range(1, BUFFER_SIZE + 3):
+            buffer.put(START + timedelta(hours=transaction_id), transaction_id, "")
+        kept = self.ids(buffer)
+        self.log_test("Full buffer evicts the oldest", kept == list(range(BUFFER_SIZE + 2, 2, -1)) and not buffer.complete,
+                      str(kept))
+        buffer.put(START, 0, "")
+        self.log_test("Row older than everything kept is ignored", 0 not in self.ids(buffer) and len(buffer.rows) == BUFFER_SIZE)
+
+    def test_usable(self):
+        partial = RecentBuffer(1, "en", "USD", complete=False)
+        for transaction_id in range(RECENT_LIMIT - 1):
+            partial.put(START + timedelta(hours=transaction_id), transaction_id, "")
+        complete = RecentBuffer(1, "en", "USD", complete=True)
+        complete.put(START, 1, "")
+        self.log_test("Usable only with enough rows or all of them", not partial.usable() and complete.usable())
+        partial.drop(0)
+        self.log_test("Drop removes a row", 0 not in self.ids(partial))
+
+    def test_cache(self):
+        cache = RecentTransactionsCache(max_users=2)
+        for telegram_id, user_id in ((101, 1), (102, 2)):
+            cache.load(telegram_id, user_id, "en", "USD", [make_transaction(2), make_transaction(1)])
+        lines = cache.get(101)
+        self.log_test("Cache answers from the buffer", lines is not None and len(lines) == 2 and "Food" in lines[0])
+        cache.put(101, make_transaction(3), CATEGORY)
+        self.log_test("Insert shows up first", "row 3" in cache.get(101)[0])
+
+        # 101 was used last, so loading a third user evicts 102
+        cache.load(103, 3, "en", "USD", [])
+        self.log_test("LRU evicts the least recently used user", cache.get(102) is None and cache.get(101) is not None)
+        cache.invalidate_user(1)
+        self.log_test("Invalidate by user id", cache.get(101) is None and cache.get(103) == [], str(cache.stats()))
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        logger.info("🚀 Starting recent transactions tests...")
+        self.test_ordering()
+        self.test_eviction()
+        self.test_usable()
+        self.test_cache()
+
+        passed = sum(1 for result in self.test_results if result["success"])
+        logger.info(f"✅ Passed: {passed}/{len(self.test_results)}")
+        for error in self.errors:
+            logger.info(f"  - {error}")
+        return not self.errors
+
+
+async def main():
+    """Main test function"""
+    tester = RecentTransactionsTester()
+    success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
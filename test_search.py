@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Search query builder test for the Expense Tracker Bot
+
+Checks how free text from /search is turned into the prefix-matching
+tsquery: word splitting, lowercasing, Cyrillic, punctuation and tsquery
+operators typed by the user, and the word limit.
+"""
+
+import asyncio
+import logging
+import sys
+from src.utils.search import MAX_QUERY_WORDS, build_tsquery
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CASES = {
+    "taxi": "taxi:*",
+    "Uber  Airport": "uber:* & airport:*",
+    "такс": "такс:*",
+    "кофе, lunch!": "кофе:* & lunch:*",
+    "a&b | !c:*": "a:* & b:* & c:*",
+    "O'Reilly": "o:* & reilly:*",
+    "snake_case": "snake:* & case:*",
+    "42": "42:*",
+    "": None,
+    "  ?! ": None,
+}
+
+
+class SearchTester:
+    def __init__(self):
+        self.test_results = []
+        self.errors = []
+
+    def log_test(self, test_name: str, success: bool, message: str = ""):
+        """Log test result"""
+        status = "✅ PASS" if success else "❌ FAIL"
+        logger.info(f"{status} - {test_name}: {message}")
+        self.test_results.append({"test": test_name, "success": success, "message": message})
+        if not success:
+            self.errors.append(f"{test_name}: {message}")
+
+    def test_build_tsquery(self):
+        for query, expected in CASES.items():
+            built = build_tsquery(query)
+            self.log_test(f"tsquery for {query!r}", built == expected, str(built))
+
+    def test_word_limit(self):
+        built = build_tsquery(" ".join(f"w{i}" for i in range(MAX_QUERY_WORDS + 5)))
+        self.log_test("Word limit", built.count(":*") == MAX_QUERY_WORDS, built)
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        logger.info("🚀 Starting search tests...")
+        self.test_build_tsquery()
+        self.test_word_limit()
+
+        passed = sum(1 for result in self.test_results if result["success"])
+        logger.info(f"✅ Passed: {passed}/{len(self.test_results)}")
+        for error in self.errors:
+            logger.info(f"  - {error}")
+        return not self.errors
+
+
+async def main():
+    """Main test function"""
+    tester = SearchTester()
+    success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())